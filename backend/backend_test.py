@@ -1,8 +1,9 @@
 import pytest
 import httpx
 import os
+import json
 from fastapi.testclient import TestClient
-from server import app
+from server import app, extract_linkedin_username
 
 client = TestClient(app)
 
@@ -50,6 +51,36 @@ def test_fetch_profile_invalid_url():
     assert response.status_code == 400
     assert "Invalid LinkedIn URL format" in response.json()["detail"]
 
+def test_extract_linkedin_username_is_canonical():
+    assert extract_linkedin_username("https://www.linkedin.com/in/WilliamHGates/?trk=x") == "williamhgates"
+    assert extract_linkedin_username("linkedin.com/in/j%C3%BCrgen") == "jürgen"
+    assert extract_linkedin_username("https://example.com/williamhgates") is None
+
+def test_cache_stats_endpoint():
+    response = client.get("/api/cache/stats")
+    assert response.status_code == 200
+    stats = response.json()["profile_cache"]
+    for counter in ["hits", "misses", "stale"]:
+        assert counter in stats
+
+def test_fetch_profiles_rejects_empty_batch():
+    response = client.post("/api/fetch-profiles", json={"linkedin_urls": []})
+    assert response.status_code == 400
+
+def test_fetch_profiles_streams_ndjson_lines():
+    response = client.post(
+        "/api/fetch-profiles",
+        json={"linkedin_urls": ["invalid-url", "https://example.com/nobody"], "concurrency": 2}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 3
+    assert sorted(line["index"] for line in lines[:2]) == [0, 1]
+    assert all("Invalid LinkedIn URL format" in line["error"] for line in lines[:2])
+    assert lines[-1]["summary"] == {"total": 2, "succeeded": 0, "failed": 2, "persisted": 0}
+
 def test_upload_resume_without_profile():
     # Test uploading resume without analyzing profile first
     with open("test_resume.pdf", "wb") as f:
@@ -0,0 +1,152 @@
+"""
+Vectorised re-scoring of many profiles at once.
+
+extract_columns turns a batch of profile_data dicts into columnar NumPy
+arrays: for every section a presence mask and one column per feature
+declared in the scoring rules (lengths, item counts, keyword hits, flags).
+score_columns then evaluates the compiled rules with array operations and
+produces every section's category scores, the averaged score categories
+and the overall score. The scores are bit-for-bit equal to analyze_profile
+because every float operation is performed in the same order and on the
+same operands as the scalar engine. Feedback text is not produced.
+
+Columns can be stored and re-scored after a threshold change without
+touching the profile dicts again.
+"""
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# SECTIONS is in the order analyze_profile adds them, which fixes the order of the averaging sums
+from rule_engine import CATEGORIES, COMPARISONS, SECTIONS, Condition, Operand, Rule
+from server import profile_section_inputs, scoring_rules
+
+
+def extract_columns(profiles: Iterable[dict], rules=None) -> Dict[str, np.ndarray]:
+    """Build "<section>.present" and "<section>.<feature>" columns for a batch of profile_data dicts"""
+    sections = (rules or scoring_rules).sections
+    absent = {name: sections[name].extract(None) for name in SECTIONS}
+    values = {f"{name}.{feature}": [] for name in SECTIONS for feature in absent[name]}
+    present = {name: [] for name in SECTIONS}
+
+    for profile_data in profiles:
+        inputs = dict(profile_section_inputs(profile_data))
+        for name in SECTIONS:
+            if name in inputs:
+                present[name].append(True)
+                features = sections[name].extract(inputs[name])
+            else:
+                present[name].append(False)
+                features = absent[name]
+            for feature, value in features.items():
+                values[f"{name}.{feature}"].append(value)
+
+    columns = {f"{name}.present": np.array(flags, dtype=bool) for name, flags in present.items()}
+    for column, column_values in values.items():
+        dtype = bool if column_values and type(column_values[0]) is bool else None
+        columns[column] = np.array(column_values, dtype=dtype) if column_values else np.zeros(0)
+    return columns
+
+
+def _f(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _operand(operand: Operand, section: str, columns: dict, scores: dict, score=None) -> np.ndarray:
+    if operand.subject == "category":
+        value = scores[operand.name]
+    elif operand.subject == "score":
+        value = score
+    else:
+        value = columns[f"{section}.{operand.name}"]
+    if operand.divide is not None:
+        value = value / operand.divide
+    if operand.multiply is not None:
+        value = value * operand.multiply
+    if operand.cap is not None:
+        value = np.minimum(operand.cap, value)
+    return value
+
+
+def _condition(condition: Condition, section: str, columns: dict, scores: dict, score=None) -> np.ndarray:
+    if condition.parts is not None:
+        result = _condition(condition.parts[0], section, columns, scores, score)
+        for part in condition.parts[1:]:
+            result = result & _condition(part, section, columns, scores, score)
+        return result
+    value = _operand(condition.subject, section, columns, scores, score)
+    if condition.op is None:
+        return value != 0
+    operand = condition.operand
+    if isinstance(operand, Operand):
+        operand = _operand(operand, section, columns, scores, score)
+    return COMPARISONS[condition.op](value, operand)
+
+
+def _apply(rule: Rule, section: str, columns: dict, scores: dict, n: int):
+    """Evaluate one rule for every row, updating the category column in place of the scalar assignment"""
+    if rule.category is None:
+        return
+    current = scores[rule.category]
+    result = current
+    remaining = np.ones(n, dtype=bool)
+    cases = rule.cases + ([rule.otherwise] if rule.otherwise is not None else [])
+    for condition, points, _ in cases:
+        hit = remaining if condition is None else remaining & _condition(condition, section, columns, scores)
+        remaining = remaining & ~hit
+        if points is None or not hit.any():
+            continue
+        value = _f(_operand(points, section, columns, scores) if isinstance(points, Operand) else points)
+        if rule.add:
+            value = current + value
+        result = np.where(hit, value, result)
+    scores[rule.category] = result
+
+
+def score_section(name: str, columns: dict, rules=None) -> dict:
+    """Category scores and score of one section for every row, mirroring CompiledSection.evaluate"""
+    section = (rules or scoring_rules).sections[name]
+    n = len(columns[f"{name}.present"])
+    scores = {category: np.zeros(n) for category in CATEGORIES}
+    for rule in section.rules:
+        _apply(rule, name, columns, scores, n)
+
+    if section.empty is not None:
+        empty = _condition(section.empty[0], name, columns, {category: np.zeros(n) for category in CATEGORIES})
+        scores = {category: np.where(empty, 0.0, values) for category, values in scores.items()}
+
+    # sum(category_scores.values()) in dict order, starting from 0
+    total = np.zeros(n)
+    for category in CATEGORIES:
+        total = total + scores[category]
+    return {"present": columns[f"{name}.present"], "score": np.minimum(100.0, total), "category_scores": scores}
+
+
+def score_columns(columns: Dict[str, np.ndarray], rules=None) -> dict:
+    """Score every profile in a column batch, mirroring analyze_profile"""
+    sections = {name: score_section(name, columns, rules) for name in SECTIONS}
+    n = len(columns[f"{SECTIONS[0]}.present"])
+
+    # Average each category over the sections present, adding in section order
+    section_count = np.zeros(n)
+    for name in SECTIONS:
+        section_count = section_count + sections[name]["present"]
+    score_categories = {}
+    for category in CATEGORIES:
+        total = np.zeros(n)
+        for name in SECTIONS:
+            section = sections[name]
+            total = total + np.where(section["present"], section["category_scores"][category], 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            score_categories[category] = np.where(section_count > 0, total / section_count, 0.0)
+
+    overall_score = np.zeros(n)
+    for category in CATEGORIES:
+        overall_score = overall_score + score_categories[category]
+
+    return {"overall_score": overall_score, "score_categories": score_categories, "sections": sections}
+
+
+def score_profiles(profiles: Iterable[dict], rules: Optional[object] = None) -> dict:
+    """extract_columns followed by score_columns"""
+    return score_columns(extract_columns(profiles, rules), rules)
@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+
+import server
+from batch_scoring import CATEGORIES, SECTIONS, extract_columns, score_columns, score_profiles
+from keyword_matcher_test import TRICKY_PROFILE
+from perf.corpus import random_profile
+
+
+def assert_same_scores(profiles):
+    batch = score_profiles(profiles)
+    for index, profile in enumerate(profiles):
+        expected = server.analyze_profile(profile)
+        # float.hex compares the exact bits, not just equality within tolerance
+        assert float(batch["overall_score"][index]).hex() == float(expected["overall_score"]).hex()
+        for category in CATEGORIES:
+            assert float(batch["score_categories"][category][index]).hex() == \
+                float(expected["score_categories"][category]).hex()
+        for name in SECTIONS:
+            section = batch["sections"][name]
+            assert bool(section["present"][index]) == (name in expected["sections"])
+            if name in expected["sections"]:
+                assert float(section["score"][index]) == expected["sections"][name]["score"]
+                for category in CATEGORIES:
+                    assert float(section["category_scores"][category][index]) == \
+                        expected["sections"][name]["category_scores"][category]
+
+def test_matches_scalar_path_on_known_profiles():
+    assert_same_scores([
+        server.generate_mock_profile_data("johndoe"),
+        server.generate_mock_profile_data("williamhgates"),
+        TRICKY_PROFILE,
+        {},
+    ])
+
+def test_matches_scalar_path_on_random_profiles():
+    rng = random.Random(11)
+    assert_same_scores([random_profile(rng) for _ in range(2000)])
+
+def test_columns_can_be_rescored_without_profiles():
+    columns = extract_columns([server.generate_mock_profile_data("johndoe")] * 3)
+    assert set(columns) >= {"headline.present", "headline.length", "skills.count", "visuals.banner"}
+    assert columns["visuals.banner"].dtype == np.bool_
+    scores = score_columns(columns)
+    assert scores["overall_score"].shape == (3,)
+    assert len(set(scores["overall_score"].tolist())) == 1
+
+def test_empty_batch():
+    assert score_profiles([])["overall_score"].shape == (0,)
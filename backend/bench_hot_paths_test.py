@@ -0,0 +1,25 @@
+from perf.bench_hot_paths import compare, run
+
+
+def result(ops_per_second, p50_ms):
+    return {"ops_per_second": ops_per_second, "p50_ms": p50_ms}
+
+def test_compare_flags_only_slowdowns_beyond_the_threshold():
+    baseline = {"results": {"a": result(1000, 1.0), "b": result(1000, 1.0), "c": result(1000, 1.0)}}
+    report = {"results": {
+        "a": result(900, 1.1),   # within 15%
+        "b": result(800, 1.0),   # ops/sec down 20%
+        "c": result(1000, 1.3),  # p50 up 30%
+        "new": result(1, 1000),  # not in the baseline
+    }}
+    regressions = compare(report, baseline, threshold=0.15)
+    assert [regression.split(":")[0] for regression in regressions] == ["b", "c"]
+    assert compare(report, baseline, threshold=0.5) == []
+
+def test_run_reports_every_metric_for_selected_cases():
+    report = run(["generate_content_suggestions"], min_time=0.01, min_runs=3)
+    assert list(report["results"]) == ["generate_content_suggestions/typical"]
+    stats = report["results"]["generate_content_suggestions/typical"]
+    assert stats["runs"] >= 3
+    assert stats["p50_ms"] <= stats["p99_ms"]
+    assert stats["ops_per_second"] > 0 and stats["peak_memory_kb"] > 0
@@ -0,0 +1,207 @@
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Count-based circuit breaker for calls to one upstream.
+
+    While closed, the outcomes of the last `window` calls are kept. Once at
+    least min_calls are recorded, the circuit opens when the failure rate
+    reaches failure_rate or the share of calls slower than slow_call_seconds
+    reaches slow_call_rate. While open, allow() refuses every call for
+    open_seconds; then up to half_open_calls probes are let through, and the
+    circuit closes if they all succeed or opens again on the first bad one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 3,
+        enabled: bool = True,
+        on_transition: Optional[Callable[[str, str, str], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.enabled = enabled
+        self.on_transition = on_transition
+        self.clock = clock
+        self.state = CLOSED
+        # (failed, slow) per call, oldest first
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probes_issued = 0
+        self._probes_succeeded = 0
+        self.transitions: List[dict] = []
+        self.stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    def _transition(self, state: str, reason: str):
+        previous, self.state = self.state, state
+        self._outcomes.clear()
+        self._failures = self._slow = 0
+        self._probes_issued = self._probes_succeeded = 0
+        if state == OPEN:
+            self._opened_at = self.clock()
+            self.stats["opened"] += 1
+            logger.warning(f"Circuit {self.name} opened: {reason}")
+        else:
+            logger.info(f"Circuit {self.name} {previous} -> {state}: {reason}")
+        self.transitions.append({"from": previous, "to": state, "reason": reason, "at": time.time()})
+        del self.transitions[:-20]
+        if self.on_transition is not None:
+            self.on_transition(self.name, previous, state)
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; every allowed call must be followed by record() or release()"""
+        if not self.enabled:
+            return True
+        if self.state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, f"probing after {self.open_seconds:g}s open")
+        if self.state == OPEN or (self.state == HALF_OPEN and self._probes_issued >= self.half_open_calls):
+            self.stats["rejected"] += 1
+            return False
+        if self.state == HALF_OPEN:
+            self._probes_issued += 1
+        return True
+
+    def release(self):
+        """Give back an allowed call that ended without an upstream outcome (e.g. cancelled)"""
+        if self.enabled and self.state == HALF_OPEN and self._probes_issued > self._probes_succeeded:
+            self._probes_issued -= 1
+
+    def record(self, seconds: float, failed: bool, slow_call_seconds: Optional[float] = None):
+        """Record a call's outcome; slow_call_seconds overrides the threshold for this call"""
+        if not self.enabled:
+            return
+        slow = seconds >= (slow_call_seconds if slow_call_seconds is not None else self.slow_call_seconds)
+        self.stats["calls"] += 1
+        self.stats["failures"] += failed
+        self.stats["slow_calls"] += slow
+
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._transition(OPEN, "probe failed" if failed else f"probe took {seconds:.2f}s")
+            else:
+                self._probes_succeeded += 1
+                if self._probes_succeeded >= self.half_open_calls:
+                    self._transition(CLOSED, f"{self._probes_succeeded} probes succeeded")
+            return
+        if self.state == OPEN:
+            # A call allowed before the circuit opened finished late
+            return
+
+        if len(self._outcomes) == self._outcomes.maxlen:
+            old_failed, old_slow = self._outcomes[0]
+            self._failures -= old_failed
+            self._slow -= old_slow
+        self._outcomes.append((failed, slow))
+        self._failures += failed
+        self._slow += slow
+
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        if self._failures / calls >= self.failure_rate:
+            self._transition(OPEN, f"{self._failures}/{calls} recent calls failed")
+        elif self._slow / calls >= self.slow_call_rate:
+            self._transition(OPEN, f"{self._slow}/{calls} recent calls were slow")
+
+    def get_stats(self) -> dict:
+        calls = len(self._outcomes)
+        stats = {
+            **self.stats,
+            "name": self.name,
+            "enabled": self.enabled,
+            "state": self.state,
+            "window_calls": calls,
+            "window_failure_rate": round(self._failures / calls, 4) if calls else 0.0,
+            "window_slow_rate": round(self._slow / calls, 4) if calls else 0.0,
+            "transitions": list(self.transitions),
+        }
+        if self.state == OPEN:
+            stats["retry_in_seconds"] = round(max(0.0, self._opened_at + self.open_seconds - self.clock()), 3)
+        return stats
+
+
+class AdaptiveTimeout:
+    """
+    Timeout derived from recently observed latencies.
+
+    The timeout is the given percentile of the last `window` call latencies
+    times multiplier, kept within [minimum, maximum]. Calls that time out
+    count as a sample at the timeout, so the timeout widens again when the
+    upstream slows down. Until min_samples latencies are known, maximum is
+    used.
+    """
+
+    def __init__(self, maximum: float, minimum: float = 1.0, percentile: float = 0.99, multiplier: float = 2.0,
+                 window: int = 200, min_samples: int = 20, enabled: bool = True):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._current = maximum
+        self._dirty = False
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def observe(self, seconds: float):
+        self._latencies.append(seconds)
+        self._dirty = True
+
+    def latency_percentile(self, fraction: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    def current(self) -> float:
+        if not self.enabled or self.samples < self.min_samples:
+            return self.maximum
+        if self._dirty:
+            observed = self.latency_percentile(self.percentile)
+            self._current = min(self.maximum, max(self.minimum, observed * self.multiplier))
+            self._dirty = False
+        return self._current
+
+    def get_stats(self) -> dict:
+        p50, p95, p99 = (self.latency_percentile(fraction) for fraction in (0.5, 0.95, 0.99))
+        return {
+            "enabled": self.enabled,
+            "timeout_seconds": round(self.current(), 3),
+            "samples": self.samples,
+            "p50_seconds": round(p50, 4) if p50 is not None else None,
+            "p95_seconds": round(p95, 4) if p95 is not None else None,
+            "p99_seconds": round(p99, 4) if p99 is not None else None,
+        }
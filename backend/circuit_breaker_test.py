@@ -0,0 +1,202 @@
+import asyncio
+
+import httpx
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+from linkedin_client import LinkedInClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock, **kwargs):
+    transitions = []
+    options = dict(window=10, min_calls=4, failure_rate=0.5, slow_call_seconds=2, slow_call_rate=0.75,
+                   open_seconds=30, half_open_calls=2)
+    options.update(kwargs)
+    breaker = CircuitBreaker("test", clock=clock, on_transition=lambda *args: transitions.append(args[1:]),
+                             **options)
+    return breaker, transitions
+
+def test_opens_on_failure_rate_once_enough_calls_are_seen():
+    breaker, transitions = make_breaker(FakeClock())
+    for failed in (True, True, False):
+        assert breaker.allow()
+        breaker.record(0.1, failed)
+    assert breaker.state == CLOSED
+
+    breaker.allow()
+    breaker.record(0.1, False)
+    assert breaker.state == OPEN
+    assert transitions == [(CLOSED, OPEN)]
+    assert not breaker.allow()
+    assert breaker.get_stats()["rejected"] == 1
+
+def test_opens_on_slow_calls():
+    breaker, _ = make_breaker(FakeClock())
+    for _ in range(4):
+        breaker.allow()
+        breaker.record(3.0, False)
+    assert breaker.state == OPEN
+
+def test_old_outcomes_leave_the_window():
+    breaker, _ = make_breaker(FakeClock(), window=4, min_calls=4)
+    for failed in (True, False, False, False, True, False, False, False):
+        breaker.allow()
+        breaker.record(0.1, failed)
+    assert breaker.state == CLOSED
+    assert breaker.get_stats()["window_failure_rate"] == 0.25
+
+def test_half_open_probes_close_the_circuit():
+    clock = FakeClock()
+    breaker, transitions = make_breaker(clock, min_calls=1)
+    breaker.allow()
+    breaker.record(0.1, True)
+
+    clock.now = 30
+    assert breaker.allow() and breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only half_open_calls probes are in flight at once
+    assert not breaker.allow()
+    breaker.record(0.1, False)
+    breaker.record(0.1, False)
+    assert breaker.state == CLOSED
+    assert transitions == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+
+def test_failed_probe_reopens_and_released_probes_are_reissued():
+    clock = FakeClock()
+    breaker, _ = make_breaker(clock, min_calls=1)
+    breaker.allow()
+    breaker.record(0.1, True)
+
+    clock.now = 30
+    assert breaker.allow() and breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record(5.0, False)
+    assert breaker.state == OPEN
+    assert breaker.get_stats()["retry_in_seconds"] == 30
+
+def test_disabled_breaker_always_allows():
+    breaker, _ = make_breaker(FakeClock(), min_calls=1, enabled=False)
+    breaker.record(0.1, True)
+    assert breaker.allow() and breaker.state == CLOSED
+
+def test_adaptive_timeout_follows_latency_percentile_within_bounds():
+    timeouts = AdaptiveTimeout(maximum=10, minimum=0.5, percentile=0.9, multiplier=2, min_samples=10)
+    assert timeouts.current() == 10
+    for latency in [0.1] * 9 + [0.4]:
+        timeouts.observe(latency)
+    assert timeouts.current() == pytest.approx(0.8)
+    for _ in range(10):
+        timeouts.observe(0.01)
+    assert timeouts.current() == 0.5
+    for _ in range(20):
+        timeouts.observe(8)
+    assert timeouts.current() == 10
+
+def test_client_short_circuits_while_open_and_uses_adaptive_timeout():
+    seen = []
+
+    def handler(request):
+        seen.append(request.extensions["timeout"]["read"])
+        return httpx.Response(503)
+
+    breaker = CircuitBreaker("linkedin", window=5, min_calls=3, failure_rate=1.0)
+    timeouts = AdaptiveTimeout(maximum=7, min_samples=1)
+    linkedin = LinkedInClient(base_url="https://linkedin.test", headers={}, warmup=False,
+                              transport=httpx.MockTransport(handler), breaker=breaker, read_timeouts=timeouts)
+
+    async def run():
+        statuses = [(await linkedin.get_profile_details("user")).status_code for _ in range(3)]
+        with pytest.raises(CircuitOpenError):
+            await linkedin.get_profile_details("user")
+        await linkedin.close()
+        return statuses
+
+    assert asyncio.run(run()) == [503, 503, 503]
+    assert len(seen) == 3 and seen[0] == 7
+    assert breaker.state == OPEN
+    assert timeouts.get_stats()["samples"] == 0
+
+def test_open_circuit_falls_back_to_mock_data_and_is_reported(monkeypatch):
+    from fastapi.testclient import TestClient
+    from prometheus_client import REGISTRY
+
+    import server
+
+    breaker = CircuitBreaker("linkedin_api", min_calls=1, open_seconds=60)
+    breaker.allow()
+    breaker.record(0.1, True)
+    monkeypatch.setattr(server.linkedin_client, "breaker", breaker)
+    monkeypatch.setattr(server, "linkedin_breaker", breaker)
+    before = REGISTRY.get_sample_value("linkedin_analyzer_profile_fallbacks_total", {"reason": "circuit_open"}) or 0
+
+    profile, cacheable = asyncio.run(server.load_linkedin_profile("someone"))
+    assert not cacheable and profile["public_identifier"] == "someone"
+    assert REGISTRY.get_sample_value("linkedin_analyzer_profile_fallbacks_total", {"reason": "circuit_open"}) == before + 1
+
+    stats = TestClient(server.app).get("/api/upstream/stats").json()["linkedin_api"]
+    assert stats["circuit_breaker"]["state"] == OPEN
+    assert stats["read_timeout"]["timeout_seconds"] <= server.linkedin_read_timeouts.maximum
+
+def test_timeouts_widen_the_adaptive_timeout_and_probes_get_the_maximum():
+    latency = {"seconds": 3.0}
+    seen = []
+
+    def handler(request):
+        read = request.extensions["timeout"]["read"]
+        seen.append(read)
+        if read < latency["seconds"]:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json={})
+
+    clock = FakeClock()
+    breaker = CircuitBreaker("linkedin", window=5, min_calls=2, failure_rate=1.0, open_seconds=30,
+                             half_open_calls=1, clock=clock)
+    timeouts = AdaptiveTimeout(maximum=10, minimum=1, percentile=0.99, multiplier=2, window=20, min_samples=20)
+    for _ in range(20):
+        timeouts.observe(0.2)
+    linkedin = LinkedInClient(base_url="https://linkedin.test", headers={}, warmup=False,
+                              transport=httpx.MockTransport(handler), breaker=breaker, read_timeouts=timeouts)
+
+    async def call():
+        try:
+            return (await linkedin.get_profile_details("user")).status_code
+        except httpx.ReadTimeout:
+            return "timeout"
+
+    async def run():
+        # The upstream slowed from 0.2s to 3s: timeouts feed back until calls fit again
+        widening = [await call() for _ in range(2)]
+        assert breaker.state == OPEN
+        # A probe runs with the maximum, not the timeout learned from healthy traffic
+        for _ in range(20):
+            timeouts.observe(0.2)
+        assert timeouts.current() == 1
+        clock.now = 30
+        probe = await call()
+        await linkedin.close()
+        return widening, probe
+
+    assert asyncio.run(run()) == (["timeout", "timeout"], 200)
+    assert seen == [1, 2, 10]
+    assert breaker.state == CLOSED
+
+def test_slow_calls_are_judged_against_the_adaptive_timeout():
+    breaker = CircuitBreaker("linkedin", window=4, min_calls=4, slow_call_seconds=5, slow_call_rate=0.75)
+    timeouts = AdaptiveTimeout(maximum=10, minimum=1, min_samples=1)
+    linkedin = LinkedInClient(base_url="https://linkedin.test", headers={}, warmup=False,
+                              breaker=breaker, read_timeouts=timeouts)
+    assert linkedin.slow_call_seconds(httpx.Timeout(1.0)) == 0.5
+    assert linkedin.slow_call_seconds(httpx.Timeout(30.0)) == 5
+    for _ in range(4):
+        breaker.allow()
+        breaker.record(0.8, False, linkedin.slow_call_seconds(httpx.Timeout(1.0)))
+    assert breaker.state == OPEN
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("process", "thread", "inline")
+
+
+class ComputeOverloaded(Exception):
+    """Raised when the compute queue already holds max_queue pending calls"""
+
+
+def _timed_call(fn, *args):
+    """Run fn in the worker and report how long the call itself took"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def _ready():
+    return os.getpid()
+
+
+class ComputePool:
+    """
+    Runs CPU-bound stages (analysis, PDF parsing, resume optimisation) off the
+    event loop.
+
+    kind selects a process pool (parallel across cores), a thread pool or
+    inline execution on the loop. At most max_queue calls may be pending at
+    once. Further calls fail fast with ComputeOverloaded instead of queueing
+    without bound. Per-stage counts and timings separate time spent waiting
+    for a worker from time spent running.
+    """
+
+    def __init__(self, kind: str = "process", max_workers: Optional[int] = None, max_queue: int = 64,
+                 initializer: Optional[Callable] = None, mp_context: str = "spawn"):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind {kind!r}, expected one of {EXECUTOR_KINDS}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self.mp_context = mp_context
+        self.pending = 0
+        self.stages = {}
+        self._executor: Optional[Executor] = None
+
+    def _create_executor(self) -> Optional[Executor]:
+        if self.kind == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.mp_context),
+                initializer=self.initializer
+            )
+        if self.kind == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="compute",
+                initializer=self.initializer
+            )
+        return None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self._executor is None and self.kind != "inline":
+            self._executor = self._create_executor()
+        return self._executor
+
+    async def start(self):
+        """Create the executor and wait until every worker has run its initializer"""
+        executor = self._get_executor()
+        if executor is None:
+            if self.initializer:
+                self.initializer()
+            return
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        await asyncio.gather(*[loop.run_in_executor(executor, _ready) for _ in range(self.max_workers)])
+        logger.info(f"Compute pool ready: {self.max_workers} {self.kind} workers "
+                    f"in {time.perf_counter() - started:.2f}s")
+
+    def shutdown(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def run(self, stage: str, fn: Callable, *args):
+        """Run fn(*args) on the pool, recording timings under stage"""
+        if self.pending >= self.max_queue:
+            self._stage(stage)["rejected"] += 1
+            raise ComputeOverloaded(f"Compute queue is full ({self.max_queue} pending)")
+
+        self.pending += 1
+        queued = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                result, run_seconds = _timed_call(fn, *args)
+            else:
+                loop = asyncio.get_running_loop()
+                result, run_seconds = await loop.run_in_executor(executor, _timed_call, fn, *args)
+        except BrokenExecutor:
+            # A worker died (e.g. OOM-killed); replace the pool for later calls
+            logger.error(f"Compute pool broken while running {stage}, recreating it")
+            self._executor = None
+            self._stage(stage)["errors"] += 1
+            raise
+        except Exception:
+            self._stage(stage)["errors"] += 1
+            raise
+        finally:
+            self.pending -= 1
+
+        total_seconds = time.perf_counter() - queued
+        self._record(stage, total_seconds - run_seconds, run_seconds)
+        return result
+
+    def _stage(self, stage: str) -> dict:
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = {
+                "count": 0, "errors": 0, "rejected": 0,
+                "wait_seconds": 0.0, "run_seconds": 0.0, "max_run_seconds": 0.0
+            }
+        return stats
+
+    def _record(self, stage: str, wait_seconds: float, run_seconds: float):
+        stats = self._stage(stage)
+        stats["count"] += 1
+        stats["wait_seconds"] += wait_seconds
+        stats["run_seconds"] += run_seconds
+        stats["max_run_seconds"] = max(stats["max_run_seconds"], run_seconds)
+
+    def get_stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "max_queue": self.max_queue,
+            "stages": {
+                stage: {
+                    **stats,
+                    "avg_run_seconds": stats["run_seconds"] / stats["count"] if stats["count"] else 0.0
+                }
+                for stage, stats in self.stages.items()
+            }
+        }
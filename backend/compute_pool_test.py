@@ -0,0 +1,80 @@
+import asyncio
+import math
+import threading
+
+import pytest
+
+from compute_pool import ComputeOverloaded, ComputePool
+
+
+def test_inline_pool_runs_on_the_loop_thread_and_records_timings():
+    pool = ComputePool(kind="inline")
+
+    async def run():
+        return await pool.run("square", pow, 7, 2)
+
+    assert asyncio.run(run()) == 49
+    stats = pool.get_stats()["stages"]["square"]
+    assert stats["count"] == 1
+    assert stats["errors"] == 0
+    assert stats["run_seconds"] >= 0
+
+def test_thread_pool_runs_off_the_loop_thread():
+    pool = ComputePool(kind="thread", max_workers=2)
+
+    async def run():
+        await pool.start()
+        return threading.get_ident(), await pool.run("ident", threading.get_ident)
+
+    try:
+        loop_thread, worker_thread = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert loop_thread != worker_thread
+
+def test_process_pool_runs_in_a_worker_process():
+    pool = ComputePool(kind="process", max_workers=1)
+
+    async def run():
+        await pool.start()
+        return await pool.run("factorial", math.factorial, 20)
+
+    try:
+        assert asyncio.run(run()) == math.factorial(20)
+    finally:
+        pool.shutdown()
+
+def test_queue_depth_limit_rejects_excess_calls():
+    pool = ComputePool(kind="thread", max_workers=1, max_queue=2)
+    release = threading.Event()
+
+    async def run():
+        blocked = [asyncio.create_task(pool.run("wait", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(ComputeOverloaded):
+            await pool.run("wait", release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+    stats = pool.get_stats()
+    assert stats["pending"] == 0
+    assert stats["stages"]["wait"]["rejected"] == 1
+    assert stats["stages"]["wait"]["count"] == 2
+
+def test_errors_are_counted_and_propagated():
+    pool = ComputePool(kind="inline")
+
+    async def run():
+        await pool.run("parse", int, "not a number")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+    assert pool.get_stats()["stages"]["parse"]["errors"] == 1
+
+def test_unknown_executor_kind_is_rejected():
+    with pytest.raises(ValueError):
+        ComputePool(kind="gpu")
@@ -0,0 +1,57 @@
+import io
+import json
+
+import PyPDF2
+
+import server
+from perf.corpus import CorpusGenerator, analysed_document, upsert_documents, write_ndjson
+
+
+def test_records_depend_only_on_seed_and_index():
+    first = list(CorpusGenerator(seed=3).records(5))
+    assert list(CorpusGenerator(seed=3).records(2, start=3)) == first[3:]
+    assert CorpusGenerator(seed=4).api_response(0) != first[0]["api_response"]
+
+def test_profiles_have_the_mapped_schema():
+    generator = CorpusGenerator(seed=1)
+    reference = server.map_api_response_to_profile_data({}, "someone")
+    for index in range(50):
+        profile = generator.profile(index)
+        assert set(profile) == set(reference)
+        assert profile == server.map_api_response_to_profile_data(generator.api_response(index), f"synthetic-1-{index}")
+        server.analyze_profile(profile)
+
+def test_resumes_span_the_requested_pages(tmp_path):
+    generator = CorpusGenerator(seed=1)
+    text = generator.resume_text(7, pages=4)
+    pdf = PyPDF2.PdfReader(io.BytesIO(generator.resume_pdf(7, pages=4)))
+    assert len(pdf.pages) == 4
+    assert "EXPERIENCE" in text and text.splitlines()[1] in server.extract_pdf_text(generator.resume_pdf(7, pages=4))
+
+    output = io.StringIO()
+    assert write_ndjson(generator, 3, 0, output, tmp_path, ["txt"]) == 3
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert open(records[0]["resumes"]["txt"]).read() == generator.resume_text(0)
+    assert analysed_document(records[0])["profile_id"] == analysed_document(records[0])["profile_id"]
+
+def test_reseeding_replaces_documents_instead_of_duplicating_them():
+    class Collection:
+        def __init__(self):
+            self.docs = {}
+
+        def bulk_write(self, requests, ordered=True):
+            matched = upserted = 0
+            for request in requests:
+                key = request._filter["profile_id"]
+                matched += key in self.docs
+                upserted += key not in self.docs
+                self.docs[key] = request._doc
+            return type("Result", (), {"matched_count": matched, "upserted_count": upserted})()
+
+    generator = CorpusGenerator(seed=2)
+    collection = Collection()
+    first = [analysed_document(record) for record in generator.records(4)]
+    assert upsert_documents(collection, first) == 4
+    assert upsert_documents(collection, [analysed_document(record) for record in generator.records(4)]) == 4
+    assert len(collection.docs) == 4
+    assert {doc["username"] for doc in collection.docs.values()} == {record["username"] for record in generator.records(4)}
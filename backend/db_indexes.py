@@ -0,0 +1,51 @@
+"""
+Indexes and read projections for the analysis collections.
+
+Every query the API runs against profile_analyses and resume_analyses is
+served by one of the indexes below; db_indexes_test.py checks the query
+plans against a live MongoDB and fails on any COLLSCAN.
+"""
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "profile_analyses": [
+        IndexModel([("profile_id", ASCENDING)], unique=True, name="profile_id_unique"),
+        # Equality on linkedin_url, newest first
+        IndexModel([("linkedin_url", ASCENDING), ("created_at", DESCENDING)], name="linkedin_url_created_at"),
+        # Equality on the canonical username, newest first (previous analysis lookups)
+        IndexModel([("username", ASCENDING), ("created_at", DESCENDING)], name="username_created_at"),
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+    ],
+    "resume_analyses": [
+        IndexModel([("profile_id", ASCENDING)], unique=True, name="profile_id_unique"),
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+    ],
+}
+
+# upload_resume only needs the mapped profile and its analysis, not the
+# suggestions or the Mongo _id
+PROFILE_FOR_RESUME_PROJECTION = {"_id": 0, "profile_data": 1, "analysis_results": 1}
+
+# Incremental re-analysis only needs the previous section results
+PREVIOUS_SECTIONS_PROJECTION = {"_id": 0, "analysis_results.sections": 1}
+
+# Stored results served by the GET endpoints; the resume text itself stays in Mongo
+STORED_PROFILE_PROJECTION = {
+    "_id": 0, "profile_id": 1, "linkedin_url": 1, "profile_data": 1,
+    "analysis_results": 1, "content_suggestions": 1, "created_at": 1
+}
+STORED_RESUME_ANALYSIS_PROJECTION = {
+    "_id": 0, "profile_id": 1, "optimized_sections": 1, "branding_plan": 1, "created_at": 1
+}
+
+
+async def ensure_indexes(db):
+    """Create the analysis collection indexes; existing identical indexes are left alone"""
+    for collection_name, indexes in INDEXES.items():
+        names = await db[collection_name].create_indexes(indexes)
+        logger.info(f"Ensured indexes on {collection_name}: {', '.join(names)}")
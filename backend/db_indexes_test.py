@@ -0,0 +1,119 @@
+import asyncio
+import os
+import uuid
+from typing import List
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from db_indexes import (INDEXES, PREVIOUS_SECTIONS_PROJECTION, PROFILE_FOR_RESUME_PROJECTION,
+                        STORED_PROFILE_PROJECTION, STORED_RESUME_ANALYSIS_PROJECTION,
+                        ensure_indexes)
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+
+
+def plan_stages(plan) -> List[str]:
+    """Every stage name in an explain() plan tree, including nested input stages"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+class FakeCollection:
+    def __init__(self):
+        self.indexes = []
+
+    async def create_indexes(self, indexes):
+        self.indexes.extend(indexes)
+        return [index.document["name"] for index in indexes]
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+async def query_plans(db):
+    """Winning plan of every query shape the API runs against the analysis collections"""
+    profile_id = "profile-42"
+    return {
+        "profile by id": (await db.profile_analyses.find(
+            {"profile_id": profile_id}, PROFILE_FOR_RESUME_PROJECTION
+        ).explain())["queryPlanner"]["winningPlan"],
+        "stored profile": (await db.profile_analyses.find(
+            {"profile_id": profile_id}, STORED_PROFILE_PROJECTION
+        ).explain())["queryPlanner"]["winningPlan"],
+        "stored resume analysis": (await db.resume_analyses.find(
+            {"profile_id": profile_id}, STORED_RESUME_ANALYSIS_PROJECTION
+        ).explain())["queryPlanner"]["winningPlan"],
+        "profiles by url": (await db.profile_analyses.find(
+            {"linkedin_url": "https://www.linkedin.com/in/user-42/"}
+        ).explain())["queryPlanner"]["winningPlan"],
+        "previous analysis": (await db.profile_analyses.find(
+            {"username": "user-42"}, PREVIOUS_SECTIONS_PROJECTION
+        ).sort("created_at", -1).limit(1).explain())["queryPlanner"]["winningPlan"],
+        "latest profiles": (await db.profile_analyses.find().sort("created_at", -1).limit(20).explain())[
+            "queryPlanner"]["winningPlan"],
+        "resume upsert": (await db.command({
+            "explain": {
+                "update": "resume_analyses",
+                "updates": [{"q": {"profile_id": profile_id}, "u": {"$set": {"resume_text": ""}}, "upsert": True}]
+            },
+            "verbosity": "queryPlanner"
+        }))["queryPlanner"]["winningPlan"],
+    }
+
+def test_profile_id_indexes_are_unique():
+    db = FakeDatabase()
+    asyncio.run(ensure_indexes(db))
+    assert set(db) == set(INDEXES)
+    for collection in db.values():
+        documents = {index.document["name"]: index.document for index in collection.indexes}
+        assert documents["profile_id_unique"]["unique"] is True
+        assert "created_at" in documents
+    names = {index.document["name"] for index in db["profile_analyses"].indexes}
+    assert {"linkedin_url_created_at", "username_created_at"} <= names
+
+def test_plan_stages_walks_nested_plans():
+    plan = {"stage": "PROJECTION_SIMPLE", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}
+    assert plan_stages(plan) == ["PROJECTION_SIMPLE", "FETCH", "IXSCAN"]
+    assert plan_stages({"queryPlan": {"stage": "COLLSCAN"}}) == ["COLLSCAN"]
+
+def test_no_query_plan_uses_a_collection_scan():
+    async def run():
+        client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=1000)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            client.close()
+            pytest.skip(f"MongoDB is not reachable at {MONGO_URL}")
+
+        db = client[f"test_indexes_{uuid.uuid4().hex[:8]}"]
+        try:
+            await ensure_indexes(db)
+            # Running twice must be a no-op, as it is on every startup
+            await ensure_indexes(db)
+            await db.profile_analyses.insert_many([
+                {"profile_id": f"profile-{i}", "linkedin_url": f"https://www.linkedin.com/in/user-{i}/",
+                 "username": f"user-{i}", "profile_data": {}, "analysis_results": {}, "created_at": f"2024-01-{i % 28 + 1:02d}"}
+                for i in range(200)
+            ])
+            await db.resume_analyses.insert_many([
+                {"profile_id": f"profile-{i}", "created_at": "2024-01-01"} for i in range(200)
+            ])
+            return await query_plans(db)
+        finally:
+            await client.drop_database(db.name)
+            client.close()
+
+    for name, plan in asyncio.run(run()).items():
+        assert "COLLSCAN" not in plan_stages(plan), f"{name} scans the whole collection: {plan}"
@@ -0,0 +1,93 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+import server
+from perf.fake_linkedin_api import Latency, StubConfig, create_app
+
+
+def get(app, path="/profile-details", **params):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+            return await client.get(path, params=params)
+
+    return asyncio.run(run())
+
+def test_latency_distributions_parse_and_respect_their_cap():
+    rng = random.Random(1)
+    assert Latency("constant:0.05").sample(rng) == 0.05
+    assert all(0.01 <= Latency("uniform:min=0.01,max=0.02").sample(rng) <= 0.02 for _ in range(100))
+    assert max(Latency("pareto:scale=0.05,alpha=1.1,max=2").sample(rng) for _ in range(1000)) <= 2
+    with pytest.raises(ValueError):
+        Latency("lognormal:median=0.2")
+    with pytest.raises(ValueError):
+        Latency("gaussian:mean=1")
+    with pytest.raises(ValueError):
+        StubConfig(server_error_rate=0.6, rate_limit_rate=0.6)
+
+def test_serves_corpus_profiles_and_injected_errors():
+    app = create_app(seed=1, corpus_size=10)
+    ok = get(app, linkedin_id="synthetic-1-3")
+    assert ok.status_code == 200 and ok.json()["experience"] is not None
+
+    app.state.config.update({"server_error_rate": 1})
+    assert get(app, linkedin_id="someone").status_code in (500, 502, 503)
+
+    app.state.config.update({"server_error_rate": 0, "rate_limit_rate": 1, "retry_after": 2.5})
+    limited = get(app, linkedin_id="someone")
+    assert limited.status_code == 429 and limited.headers["retry-after"] == "2.5"
+
+def test_quota_is_reported_in_headers_and_enforced():
+    now = [0.0]
+    app = create_app(config=StubConfig(quota=2, quota_window=60), clock=lambda: now[0])
+    remaining = [get(app, linkedin_id="a").headers["x-ratelimit-requests-remaining"] for _ in range(2)]
+    assert remaining == ["1", "0"]
+    exhausted = get(app, linkedin_id="a")
+    assert exhausted.status_code == 429 and exhausted.headers["retry-after"] == "60"
+    now[0] = 61
+    assert get(app, linkedin_id="a").status_code == 200
+
+def test_config_can_be_changed_while_running():
+    app = create_app()
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+            bad = await client.post("/__config", json={"colour": "red"})
+            changed = await client.post("/__config", json={"latency": "constant:0", "malformed_rate": 1})
+            return bad.status_code, changed.json()
+
+    status, config = asyncio.run(run())
+    assert status == 400
+    assert config["malformed_rate"] == 1.0 and config["latency"] == "constant:0"
+
+def test_timeouts_hang_until_the_client_gives_up():
+    app = create_app(config=StubConfig(timeout_rate=1, timeout_seconds=30))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+            await asyncio.wait_for(client.get("/profile-details", params={"linkedin_id": "a"}), 0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+    assert app.state.stats["timeouts"] == 1
+
+def test_malformed_payloads_exercise_every_backend_fallback(monkeypatch):
+    app = create_app(config=StubConfig(malformed_rate=1))
+    monkeypatch.setattr(server.linkedin_client, "transport", httpx.ASGITransport(app=app))
+    monkeypatch.setattr(server.linkedin_client, "_client", None)
+    monkeypatch.setattr(server.linkedin_client, "breaker", None)
+    before = {reason: REGISTRY.get_sample_value("linkedin_analyzer_profile_fallbacks_total", {"reason": reason}) or 0
+              for reason in ["api_error", "unexpected_payload", "mapping_error"]}
+
+    async def run():
+        results = [await server.load_linkedin_profile(f"user{i}") for i in range(30)]
+        await server.linkedin_client.close()
+        return results
+
+    results = asyncio.run(run())
+    mocked = [profile for profile, _ in results if profile["first_name"] in ("John", "Bill")]
+    assert len(mocked) == 30
+    for reason, count in before.items():
+        assert REGISTRY.get_sample_value("linkedin_analyzer_profile_fallbacks_total", {"reason": reason}) > count
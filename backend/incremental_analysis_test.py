@@ -0,0 +1,115 @@
+import asyncio
+import copy
+import json
+import random
+
+import pytest
+
+import server
+from perf.corpus import random_profile
+from write_behind import WriteBehindBuffer
+
+
+def stored(analysis):
+    """The section results as they come back from Mongo"""
+    return json.loads(json.dumps(analysis))["sections"]
+
+@pytest.fixture
+def always_incremental(monkeypatch):
+    monkeypatch.setattr(server, "INCREMENTAL_MIN_CHARS", 0)
+
+def test_unchanged_profile_reuses_the_incremental_sections(always_incremental):
+    profile = server.generate_mock_profile_data("johndoe")
+    full = server.analyze_profile(profile)
+    incremental, reused = server.analyze_profile_incremental(profile, stored(full))
+    assert reused == len(server.INCREMENTAL_SECTIONS)
+    assert incremental == full
+    assert {name for name, section in full["sections"].items() if "fingerprint" in section} == {"about", "skills"}
+
+def test_only_edited_sections_are_rescored(always_incremental, monkeypatch):
+    profile = server.generate_mock_profile_data("johndoe")
+    previous = stored(server.analyze_profile(profile))
+    edited = copy.deepcopy(profile)
+    edited["skills"] = edited["skills"][:3]
+    expected = server.analyze_profile(edited)
+
+    evaluated = []
+    for name, section in server.scoring_rules.current().items():
+        monkeypatch.setattr(section, "evaluate", lambda value, name=name, evaluate=section.evaluate:
+                            evaluated.append(name) or evaluate(value))
+
+    incremental, reused = server.analyze_profile_incremental(edited, previous)
+    assert "about" not in evaluated and "skills" in evaluated
+    assert reused == 1
+    assert incremental == expected
+
+def test_rules_change_invalidates_every_fingerprint(always_incremental, monkeypatch):
+    profile = server.generate_mock_profile_data("johndoe")
+    previous = stored(server.analyze_profile(profile))
+    monkeypatch.setattr(server.scoring_rules, "version", "edited-rules")
+    assert server.analyze_profile_incremental(profile, previous)[1] == 0
+
+def test_incremental_matches_full_on_random_edits(always_incremental):
+    rng = random.Random(15)
+    for _ in range(300):
+        before, after = random_profile(rng), random_profile(rng)
+        # Keep some sections of the earlier profile so part of the analysis is reusable
+        for key in rng.sample(sorted(before), k=len(before) // 2):
+            after[key] = before[key]
+        previous = stored(server.analyze_profile(before))
+        incremental, reused = server.analyze_profile_incremental(after, previous)
+        assert json.dumps(incremental) == json.dumps(server.analyze_profile(after))
+        assert 0 <= reused <= len(server.INCREMENTAL_SECTIONS)
+
+def test_small_profiles_skip_the_previous_analysis_lookup(monkeypatch):
+    monkeypatch.setattr(server.compute_pool, "kind", "inline")
+    lookups = []
+
+    async def find_previous_sections(username):
+        lookups.append(username)
+
+    monkeypatch.setattr(server, "find_previous_sections", find_previous_sections)
+    profile = server.generate_mock_profile_data("johndoe")
+    large = dict(profile, about="Led a team that increased revenue. " * 200)
+
+    async def run():
+        return await server.analyze_profile_here(profile, "johndoe"), await server.analyze_profile_here(large, "big")
+
+    (analysis, reused), _ = asyncio.run(run())
+    assert lookups == ["big"] and reused == 0
+    assert not any("fingerprint" in section for section in analysis["sections"].values())
+
+def test_previous_sections_are_found_by_username_including_queued_writes(monkeypatch):
+    class Collection:
+        def __init__(self):
+            self.queries = []
+
+        async def find_one(self, filter, projection=None, sort=None):
+            self.queries.append(filter)
+            return None
+
+        async def insert_many(self, docs, ordered=True):
+            pass
+
+    collection = Collection()
+    writes = WriteBehindBuffer(collection, "profile_id", enabled=True)
+    monkeypatch.setattr(server, "profile_writes", writes)
+    monkeypatch.setattr(server, "db", type("Database", (), {"profile_analyses": collection})())
+    sections = {"about": {"score": 5, "fingerprint": "f"}}
+
+    async def run():
+        await writes.start()
+        for created_at, about_score in (("2024-01-01", 1), ("2024-01-02", 5)):
+            await writes.insert({"profile_id": created_at, "username": "johndoe", "created_at": created_at,
+                                 "linkedin_url": "http://linkedin.com/in/johndoe",
+                                 "analysis_results": {"sections": {"about": {"score": about_score,
+                                                                             "fingerprint": "f"}}}})
+        queued = await server.find_previous_sections("johndoe")
+        missing = await server.find_previous_sections("someone-else")
+        await writes.close()
+        return queued, missing
+
+    writes.flush_interval = 60
+    queued, missing = asyncio.run(run())
+    assert queued == sections and missing is None
+    assert collection.queries == [{"username": "someone-else"}]
@@ -0,0 +1,306 @@
+"""
+Background job queue with visibility timeouts, on Redis or an in-process stand-in.
+
+Pending jobs are members of a sorted set scored by the time they become
+visible. A worker claims the oldest visible job by taking its lease key
+(SET NX with the visibility timeout) and pushing its score past the
+timeout, so a job whose worker dies becomes visible again once the lease
+expires, and is picked up by any worker on any node. Failed attempts are
+retried after retry_delay until max_attempts; finished jobs keep their
+result for result_ttl seconds.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class PermanentJobError(Exception):
+    """A job failure that retrying cannot fix, e.g. a missing profile"""
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp is not None else None
+
+
+def job_summary(job: dict) -> dict:
+    """Public view of a job record, as served by GET /api/jobs/{job_id}"""
+    summary = {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "created_at": _isoformat(job["created_at"]),
+        "started_at": _isoformat(job["started_at"]),
+        "finished_at": _isoformat(job["finished_at"]),
+        "timings": job["timings"],
+    }
+    if job["status"] == SUCCEEDED:
+        summary["result"] = job["result"]
+    if job["error"] is not None:
+        summary["error"] = job["error"]
+    return summary
+
+
+class JobQueue:
+    """Jobs, their uploads and leases in a redis.asyncio client (or memory_redis.MemoryRedis)"""
+
+    def __init__(self, redis, prefix: str = "linkedin_analyzer:jobs", visibility_timeout: float = 300.0,
+                 max_attempts: int = 3, retry_delay: float = 5.0, result_ttl: float = 86400.0,
+                 clock: Callable[[], float] = time.time):
+        self.redis = redis
+        self.prefix = prefix
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.result_ttl = result_ttl
+        self.clock = clock
+        self._pending = f"{prefix}:pending"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    async def _save(self, job: dict, ttl: float):
+        await self.redis.set(self._job_key(job["job_id"]), orjson.dumps(job), px=int(ttl * 1000))
+
+    def _active_ttl(self) -> float:
+        # Long enough to outlive every attempt and retry delay, plus the result TTL
+        return (self.visibility_timeout + self.retry_delay) * self.max_attempts + self.result_ttl
+
+    async def enqueue(self, kind: str, payload: dict, upload: Optional[bytes] = None) -> dict:
+        now = self.clock()
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "kind": kind,
+            "status": QUEUED,
+            "payload": payload,
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "timings": {},
+            "result": None,
+            "error": None,
+        }
+        if upload is not None:
+            await self.redis.set(f"{self._job_key(job['job_id'])}:upload", upload, px=int(self._active_ttl() * 1000))
+        await self._save(job, self._active_ttl())
+        await self.redis.zadd(self._pending, {job["job_id"]: now})
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        data = await self.redis.get(self._job_key(job_id))
+        return orjson.loads(data) if data is not None else None
+
+    async def get_upload(self, job_id: str) -> Optional[bytes]:
+        return await self.redis.get(f"{self._job_key(job_id)}:upload")
+
+    async def claim(self, batch: int = 10) -> Optional[Tuple[dict, str]]:
+        """Lease the oldest visible job; returns (job, lease token) or None when nothing is visible"""
+        now = self.clock()
+        for member in await self.redis.zrangebyscore(self._pending, "-inf", now, start=0, num=batch):
+            job_id = member.decode() if isinstance(member, bytes) else member
+            lease = uuid.uuid4().hex
+            if not await self.redis.set(f"{self._job_key(job_id)}:lease", lease, nx=True,
+                                        px=int(self.visibility_timeout * 1000)):
+                # Another worker claimed it first
+                continue
+            await self.redis.zadd(self._pending, {job_id: now + self.visibility_timeout}, xx=True)
+
+            job = await self.get(job_id)
+            if job is None or job["status"] in FINISHED:
+                await self._forget(job_id)
+                continue
+            if job["attempts"] >= job["max_attempts"]:
+                # Its last worker never reported back before the visibility timeout
+                await self._finish(job, FAILED, error=f"Timed out after {job['attempts']} attempts")
+                continue
+
+            job["status"] = RUNNING
+            job["attempts"] += 1
+            job["started_at"] = now
+            job["timings"]["queued_seconds"] = round(now - job["created_at"], 4)
+            await self._save(job, self._active_ttl())
+            return job, lease
+        return None
+
+    async def _holds_lease(self, job_id: str, lease: str) -> bool:
+        current = await self.redis.get(f"{self._job_key(job_id)}:lease")
+        return current is not None and current.decode() == lease
+
+    async def extend(self, job_id: str, lease: str) -> bool:
+        """Renew a lease for another visibility timeout; False if it already expired"""
+        if not await self._holds_lease(job_id, lease):
+            return False
+        await self.redis.set(f"{self._job_key(job_id)}:lease", lease, px=int(self.visibility_timeout * 1000))
+        await self.redis.zadd(self._pending, {job_id: self.clock() + self.visibility_timeout}, xx=True)
+        return True
+
+    async def _forget(self, job_id: str):
+        await self.redis.zrem(self._pending, job_id)
+        await self.redis.delete(f"{self._job_key(job_id)}:lease", f"{self._job_key(job_id)}:upload")
+
+    async def _finish(self, job: dict, status: str, result: Any = None, error: Optional[str] = None):
+        job["status"] = status
+        job["result"] = result
+        job["error"] = error
+        job["finished_at"] = self.clock()
+        await self._save(job, self.result_ttl)
+        await self._forget(job["job_id"])
+
+    async def complete(self, job: dict, lease: str, result: Any) -> bool:
+        """Store the result; False if the lease expired and the job now belongs to another worker"""
+        if not await self._holds_lease(job["job_id"], lease):
+            logger.warning(f"Dropping result of job {job['job_id']}, its lease expired")
+            return False
+        await self._finish(job, SUCCEEDED, result=result)
+        return True
+
+    async def fail(self, job: dict, lease: str, error: str, retry: bool = True) -> bool:
+        """Record a failed attempt, queueing another one unless retry is False or attempts are used up"""
+        if not await self._holds_lease(job["job_id"], lease):
+            logger.warning(f"Dropping failure of job {job['job_id']}, its lease expired")
+            return False
+        if not retry or job["attempts"] >= job["max_attempts"]:
+            await self._finish(job, FAILED, error=error)
+            return True
+        job["status"] = QUEUED
+        job["error"] = error
+        await self._save(job, self._active_ttl())
+        await self.redis.zadd(self._pending, {job["job_id"]: self.clock() + self.retry_delay * job["attempts"]})
+        await self.redis.delete(f"{self._job_key(job['job_id'])}:lease")
+        return True
+
+    async def get_stats(self) -> dict:
+        return {"pending": await self.redis.zcard(self._pending), "visibility_timeout": self.visibility_timeout,
+                "max_attempts": self.max_attempts}
+
+
+class JobContext:
+    """What a handler gets: the job, its upload and a timer for its stages"""
+
+    def __init__(self, job: dict, upload: Optional[bytes]):
+        self.job = job
+        self.payload = job["payload"]
+        self.upload = upload
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(time.perf_counter() - start, 4)
+
+
+class JobWorkerPool:
+    """
+    concurrency workers claiming jobs from a JobQueue and running the handler
+    for their kind. While a handler runs its lease is renewed every third of
+    the visibility timeout, so only a dead worker lets it expire. A handler
+    running past the visibility timeout is cancelled and the attempt counts
+    as failed.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Callable[[JobContext], Awaitable[Any]]],
+                 concurrency: int = 2, poll_interval: float = 0.2):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"succeeded": 0, "failed": 0, "retried": 0, "timed_out": 0, "running": 0}
+
+    def start(self):
+        if self._tasks or self.concurrency <= 0:
+            return
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def close(self):
+        """Stop the workers; jobs they were running become visible again after the visibility timeout"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            try:
+                claimed = await self.queue.claim()
+            except Exception as e:
+                logger.warning(f"Could not claim a job: {str(e)}")
+                claimed = None
+            if claimed is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._process(*claimed)
+
+    async def _heartbeat(self, job: dict, lease: str):
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            try:
+                if not await self.queue.extend(job["job_id"], lease):
+                    logger.warning(f"Lost the lease of job {job['job_id']} while running it")
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew the lease of job {job['job_id']}: {str(e)}")
+
+    async def _process(self, job: dict, lease: str):
+        handler = self.handlers.get(job["kind"])
+        self.stats["running"] += 1
+        started = time.perf_counter()
+        context = None
+        heartbeat = asyncio.create_task(self._heartbeat(job, lease))
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler for job kind {job['kind']!r}")
+            context = JobContext(job, await self.queue.get_upload(job["job_id"]))
+            result = await asyncio.wait_for(handler(context), self.queue.visibility_timeout)
+        except PermanentJobError as e:
+            outcome = (str(e), False)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            outcome = (f"Timed out after {self.queue.visibility_timeout:g}s", True)
+        except Exception as e:
+            logger.error(f"Job {job['job_id']} attempt {job['attempts']} failed: {str(e)}")
+            outcome = (f"{type(e).__name__}: {str(e)}", True)
+        else:
+            outcome = None
+        finally:
+            heartbeat.cancel()
+            self.stats["running"] -= 1
+
+        job["timings"]["run_seconds"] = round(time.perf_counter() - started, 4)
+        if context is not None:
+            job["timings"]["stages"] = context.stages
+        try:
+            if outcome is None:
+                await self.queue.complete(job, lease, result)
+                self.stats["succeeded"] += 1
+            else:
+                error, retry = outcome
+                await self.queue.fail(job, lease, error, retry)
+                will_retry = retry and job["status"] == QUEUED
+                self.stats["retried" if will_retry else "failed"] += 1
+        except Exception as e:
+            # The lease runs out and the job is retried elsewhere
+            logger.error(f"Could not record the outcome of job {job['job_id']}: {str(e)}")
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "workers": len(self._tasks)}
@@ -0,0 +1,296 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import server
+from job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobWorkerPool, PermanentJobError, job_summary
+from memory_redis import MemoryRedis
+from perf.load_test import in_process_client
+from write_behind import WriteBehindBuffer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_queue(**kwargs):
+    clock = FakeClock()
+    return JobQueue(MemoryRedis(clock), clock=clock, **kwargs), clock
+
+
+def test_claimed_job_completes_with_its_result():
+    queue, clock = make_queue()
+
+    async def run():
+        job = await queue.enqueue("resume", {"profile_id": "p1"}, b"resume bytes")
+        clock.now += 2
+        claimed, lease = await queue.claim()
+        claimed_status = claimed["status"]
+        nothing_else = await queue.claim()
+        upload = await queue.get_upload(job["job_id"])
+        assert await queue.complete(claimed, lease, {"score": 7})
+        return claimed_status, claimed, nothing_else, upload, await queue.get(job["job_id"]), await queue.get_stats()
+
+    claimed_status, claimed, nothing_else, upload, stored, stats = asyncio.run(run())
+    assert claimed_status == RUNNING and claimed["attempts"] == 1
+    assert claimed["timings"]["queued_seconds"] == 2
+    assert nothing_else is None and upload == b"resume bytes"
+    summary = job_summary(stored)
+    assert summary["status"] == SUCCEEDED and summary["result"] == {"score": 7} and "error" not in summary
+    assert summary["finished_at"] is not None and stats["pending"] == 0
+
+def test_failed_attempts_are_retried_after_a_delay_until_max_attempts():
+    queue, clock = make_queue(max_attempts=2, retry_delay=5)
+
+    async def run():
+        job = await queue.enqueue("resume", {})
+        claimed, lease = await queue.claim()
+        await queue.fail(claimed, lease, "upstream error")
+        hidden = await queue.claim()
+        clock.now += 5
+        claimed, lease = await queue.claim()
+        await queue.fail(claimed, lease, "upstream error again")
+        return hidden, claimed["attempts"], await queue.get(job["job_id"])
+
+    hidden, attempts, stored = asyncio.run(run())
+    assert hidden is None and attempts == 2
+    assert stored["status"] == FAILED and stored["error"] == "upstream error again"
+
+def test_expired_lease_makes_the_job_visible_to_another_worker():
+    queue, clock = make_queue(visibility_timeout=30, max_attempts=2)
+
+    async def run():
+        job = await queue.enqueue("resume", {})
+        first, first_lease = await queue.claim()
+        clock.now += 29
+        assert await queue.claim() is None
+        clock.now += 2
+        second, second_lease = await queue.claim()
+        # The first worker finishing late must not overwrite the second attempt
+        late = await queue.complete(first, first_lease, {"from": "first"})
+        clock.now += 31
+        # The second worker died too, and there are no attempts left
+        expired = await queue.claim()
+        return late, second["attempts"], expired, await queue.get(job["job_id"])
+
+    late, attempts, expired, stored = asyncio.run(run())
+    assert late is False and attempts == 2 and expired is None
+    assert stored["status"] == FAILED and stored["error"] == "Timed out after 2 attempts"
+
+def test_worker_pool_runs_handlers_and_records_stage_timings():
+    queue = JobQueue(MemoryRedis(), retry_delay=0)
+    calls = []
+
+    async def handler(context):
+        calls.append(context.payload["n"])
+        if context.payload["n"] == 2 and calls.count(2) == 1:
+            raise ConnectionError("flaky")
+        if context.payload["n"] == 3:
+            raise PermanentJobError("bad input")
+        with context.stage("work"):
+            await asyncio.sleep(0)
+        return {"double": context.payload["n"] * 2, "upload": context.upload.decode()}
+
+    async def run():
+        pool = JobWorkerPool(queue, {"double": handler}, concurrency=2, poll_interval=0.01)
+        jobs = [await queue.enqueue("double", {"n": n}, f"upload {n}".encode()) for n in (1, 2, 3)]
+        pool.start()
+        try:
+            for _ in range(200):
+                stored = [await queue.get(job["job_id"]) for job in jobs]
+                if all(job["status"] in (SUCCEEDED, FAILED) for job in stored):
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.close()
+        return stored, pool.get_stats()
+
+    (one, two, three), stats = asyncio.run(run())
+    assert one["result"] == {"double": 2, "upload": "upload 1"} and "work" in one["timings"]["stages"]
+    assert one["timings"]["run_seconds"] >= 0
+    assert two["status"] == SUCCEEDED and two["attempts"] == 2
+    assert three["status"] == FAILED and three["error"] == "bad input" and three["attempts"] == 1
+    assert stats["succeeded"] == 2 and stats["retried"] == 1 and stats["failed"] == 1 and stats["workers"] == 0
+
+def test_worker_pool_gives_up_on_handlers_past_the_visibility_timeout():
+    queue = JobQueue(MemoryRedis(), visibility_timeout=0.05, max_attempts=1)
+
+    async def handler(context):
+        await asyncio.sleep(1)
+
+    async def run():
+        pool = JobWorkerPool(queue, {"slow": handler}, concurrency=1, poll_interval=0.01)
+        job = await queue.enqueue("slow", {})
+        pool.start()
+        try:
+            for _ in range(100):
+                stored = await queue.get(job["job_id"])
+                if stored["status"] == FAILED:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.close()
+        return stored, pool.get_stats()
+
+    stored, stats = asyncio.run(run())
+    assert stored["status"] == FAILED and stored["error"].startswith("Timed out")
+    assert stats["timed_out"] == 1
+
+def test_timed_out_attempts_keep_their_lease_and_are_retried_after_the_delay():
+    queue = JobQueue(MemoryRedis(), visibility_timeout=0.1, max_attempts=2, retry_delay=0.2)
+    calls = []
+
+    async def handler(context):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return "done"
+
+    async def run():
+        pool = JobWorkerPool(queue, {"slow": handler}, concurrency=2, poll_interval=0.01)
+        job = await queue.enqueue("slow", {})
+        pool.start()
+        try:
+            retried = None
+            for _ in range(200):
+                stored = await queue.get(job["job_id"])
+                if retried is None and stored["status"] == QUEUED and stored["attempts"] == 1:
+                    retried = stored
+                if stored["status"] in (SUCCEEDED, FAILED):
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.close()
+        return retried, stored, pool.get_stats()
+
+    retried, stored, stats = asyncio.run(run())
+    assert retried["error"] == "Timed out after 0.1s"
+    assert stored["status"] == SUCCEEDED and stored["attempts"] == 2 and stored["result"] == "done"
+    # The second attempt waited for the timeout and retry_delay, not just for the lease to lapse
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.1 + 0.2
+    assert stats["timed_out"] == 1 and stats["retried"] == 1 and stats["succeeded"] == 1
+
+def test_finished_jobs_are_swept_from_memory_redis_without_being_read():
+    queue, clock = make_queue(result_ttl=60)
+
+    async def run():
+        for n in range(20):
+            await queue.enqueue("resume", {"n": n}, b"resume bytes")
+            claimed, lease = await queue.claim()
+            await queue.complete(claimed, lease, {"n": n})
+        held = len(queue.redis)
+        clock.now += 60 + queue.redis.sweep_interval
+        job = await queue.enqueue("resume", {"n": 20}, b"resume bytes")
+        return held, job
+
+    held, job = asyncio.run(run())
+    assert held == 21
+    # The new job's record and upload, and the pending set
+    assert len(queue.redis) == 3
+    assert queue.redis.ttl(queue._job_key(job["job_id"])) is not None
+
+@pytest.fixture
+def isolated_server(monkeypatch):
+    monkeypatch.setattr(server, "db", server.db)
+    monkeypatch.setattr(server.profile_writes, "collection", server.profile_writes.collection)
+    monkeypatch.setattr(server.profile_cache, "collection", server.profile_cache.collection)
+    monkeypatch.setattr(server.resume_cache.texts, "collection", server.resume_cache.texts.collection)
+    monkeypatch.setattr(server.resume_cache.results, "collection", server.resume_cache.results.collection)
+    monkeypatch.setattr(server.linkedin_client, "transport", None)
+    monkeypatch.setattr(server.compute_pool, "kind", "inline")
+    monkeypatch.setattr(server, "resume_jobs", JobQueue(MemoryRedis()))
+    monkeypatch.setattr(server.resume_job_workers, "queue", server.resume_jobs)
+    monkeypatch.setattr(server.resume_job_workers, "poll_interval", 0.01)
+    monkeypatch.setattr(server, "JOB_EVENTS_POLL_INTERVAL", 0.01)
+
+def test_resume_jobs_wait_for_profiles_queued_in_another_process(monkeypatch):
+    class Collection:
+        def __init__(self):
+            self.docs = {}
+
+        async def find_one(self, filter, projection=None):
+            doc = self.docs.get(filter["profile_id"])
+            return dict(doc) if doc is not None else None
+
+        async def insert_many(self, docs, ordered=True):
+            self.docs.update((doc["profile_id"], doc) for doc in docs)
+
+    collection = Collection()
+    # The API process buffers the profile; the worker process only sees what reached Mongo
+    api_writes = WriteBehindBuffer(collection, "profile_id", enabled=True, flush_interval=60)
+    monkeypatch.setattr(server, "profile_writes", WriteBehindBuffer(collection, "profile_id"))
+
+    async def optimize_and_store_resume(profile_id, profile, resume_text, resume_hash):
+        return {"profile_id": profile_id}
+
+    async def read_resume_bytes(filename, content):
+        return content.decode(), "resume-hash"
+
+    monkeypatch.setattr(server, "read_resume_bytes", read_resume_bytes)
+    monkeypatch.setattr(server, "optimize_and_store_resume", optimize_and_store_resume)
+    queue = JobQueue(MemoryRedis(), retry_delay=0.05)
+
+    async def run():
+        await api_writes.start()
+        await api_writes.insert({"profile_id": "p1", "profile_data": {}, "analysis_results": {}})
+        job = await queue.enqueue("resume", {"profile_id": "p1", "filename": "resume.txt"}, b"Python engineer")
+        pool = JobWorkerPool(queue, {"resume": server.run_resume_job}, concurrency=1, poll_interval=0.01)
+        pool.start()
+        try:
+            for _ in range(100):
+                stored = await queue.get(job["job_id"])
+                if stored["attempts"] == 1 and stored["status"] == QUEUED:
+                    await api_writes.close()
+                if stored["status"] in (SUCCEEDED, FAILED):
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.close()
+            await api_writes.close()
+        return stored
+
+    stored = asyncio.run(run())
+    assert stored["status"] == SUCCEEDED and stored["attempts"] == 2, stored
+    assert stored["result"] == {"profile_id": "p1"}
+
+def test_async_resume_upload_returns_202_and_a_pollable_job(isolated_server):
+    async def run():
+        async with in_process_client(seed=1, corpus_size=10, api_config=None, use_mongo=False) as client:
+            response = await client.post("/api/fetch-profile",
+                                         json={"linkedin_url": "https://www.linkedin.com/in/someone/"})
+            profile_id = response.json()["profile_id"]
+            accepted = await client.post(
+                "/api/upload-resume?async=true",
+                data={"profile_id": profile_id},
+                files={"file": ("resume.txt", b"Python engineer with AWS and Kubernetes experience", "text/plain")},
+            )
+            missing = await client.post("/api/upload-resume?async=true", data={"profile_id": "nope"},
+                                        files={"file": ("resume.txt", b"text", "text/plain")})
+            for _ in range(200):
+                job = (await client.get(accepted.headers["location"])).json()
+                if job["status"] in (SUCCEEDED, FAILED):
+                    break
+                await asyncio.sleep(0.01)
+            events = await client.get(accepted.json()["events_url"])
+            unknown = await client.get("/api/jobs/unknown")
+            stats = (await client.get("/api/jobs/stats")).json()
+            stored = await server.db.resume_analyses.find_one({"profile_id": profile_id}, {"_id": 0, "profile_id": 1})
+            return accepted, missing, job, events, unknown, stats, stored
+
+    accepted, missing, job, events, unknown, stats, stored = asyncio.run(run())
+    assert accepted.status_code == 202 and accepted.json()["status"] == QUEUED
+    assert missing.status_code == 404 and unknown.status_code == 404
+    assert job["status"] == SUCCEEDED, job
+    assert set(job["result"]) == {"profile_id", "optimized_sections", "branding_plan"}
+    assert set(job["timings"]["stages"]) == {"load_profile", "parse_resume", "optimize_and_store"}
+    assert events.headers["content-type"].startswith("text/event-stream")
+    last_event = events.text.strip().split("\n\n")[-1]
+    assert last_event.startswith("event: succeeded")
+    assert json.loads(last_event.split("data: ", 1)[1])["job_id"] == job["job_id"]
+    assert stats["resume"]["workers"]["succeeded"] == 1 and stored is not None
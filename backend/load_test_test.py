@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+import server
+from perf.load_test import in_process_client, parse_mix, run_load
+from perf.memory_store import MemoryCollection
+
+
+@pytest.fixture
+def isolated_server(monkeypatch):
+    """Let the harness swap the server's collections and API transport, then put them back"""
+    monkeypatch.setattr(server, "db", server.db)
+    monkeypatch.setattr(server.profile_writes, "collection", server.profile_writes.collection)
+    monkeypatch.setattr(server.profile_cache, "collection", server.profile_cache.collection)
+    monkeypatch.setattr(server.resume_cache.texts, "collection", server.resume_cache.texts.collection)
+    monkeypatch.setattr(server.resume_cache.results, "collection", server.resume_cache.results.collection)
+    monkeypatch.setattr(server.linkedin_client, "transport", None)
+    monkeypatch.setattr(server.compute_pool, "kind", "inline")
+
+def test_in_process_run_reports_every_endpoint(isolated_server):
+    async def run():
+        async with in_process_client(seed=1, corpus_size=50, api_config=None, use_mongo=False) as client:
+            report = await run_load(client, parse_mix(None), rate=0, concurrency=4, duration=1.5, corpus_size=50)
+            return report, len(server.db.profile_analyses)
+
+    report, stored = asyncio.run(run())
+    assert report["overall"]["errors"] == 0
+    assert set(report["endpoints"]) == {"fetch_profile", "upload_resume", "get_profile"}
+    assert stored == report["endpoints"]["fetch_profile"]["statuses"]["200"]
+    assert report["event_loop_lag"]["samples"] > 0
+    overall = report["overall"]
+    assert overall["p50_ms"] <= overall["p95_ms"] <= overall["p99_ms"] <= overall["max_ms"]
+
+def test_memory_collection_supports_the_server_queries():
+    async def run():
+        collection = MemoryCollection("profile_analyses")
+        await collection.create_index("profile_id", unique=True)
+        for profile_id, created_at in [("a", "1"), ("b", "2")]:
+            await collection.insert_one({"profile_id": profile_id, "linkedin_url": "u", "created_at": created_at,
+                                         "analysis_results": {"sections": created_at}})
+        latest = await collection.find_one({"linkedin_url": "u"}, {"_id": 0, "analysis_results.sections": 1},
+                                           sort=[("created_at", -1)])
+        await collection.update_one({"profile_id": "c"}, {"$set": {"x": 1}}, upsert=True)
+        await collection.update_one({"profile_id": "c"}, {"$set": {"x": 2}}, upsert=True)
+        return latest, await collection.find_one({"profile_id": "c"}, {"_id": 0, "x": 1}), len(collection)
+
+    assert asyncio.run(run()) == ({"analysis_results": {"sections": "2"}}, {"x": 2}, 3)
+
+def test_parse_mix_rejects_unknown_endpoints():
+    assert parse_mix(["fetch_profile=3", "get_profile"]) == {"fetch_profile": 3.0, "get_profile": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix(["delete_everything=1"])
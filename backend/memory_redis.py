@@ -0,0 +1,203 @@
+"""
+In-process stand-in for the redis.asyncio client.
+
+Covers the commands the shared cache and the job queue use: GET, SET with
+NX and expiry, DEL, the sorted-set commands ZADD, ZRANGEBYSCORE, ZREM and
+ZCARD. Lua scripts cannot run here, so register_script returns a Python
+port of each script the app registers: the cache's lock release and the
+rate limiter's bucket scripts. It backs the job queue of a single-process
+deployment without REDIS_URL, and the tests. Expired keys are dropped
+when read and by a sweep, run from the writes at most once every
+sweep_interval seconds, so keys that are never read again (finished job
+records, uploads, leases) do not accumulate.
+"""
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+
+from rate_limiter import ACQUIRE_SCRIPT, UPDATE_QUOTA_SCRIPT
+from redis_cache import RELEASE_LOCK_SCRIPT
+
+
+class MemoryRedis:
+    """
+    redis.asyncio stand-in. Setting down = True makes every command fail
+    with a ConnectionError, like an unreachable server.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sweep_interval: float = 60.0):
+        self.clock = clock
+        self.sweep_interval = sweep_interval
+        self.down = False
+        self._next_sweep = clock() + sweep_interval
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._sorted_sets: Dict[str, Dict[bytes, float]] = {}
+        # Hashes written by the rate limiter scripts: name -> (fields, expires at)
+        self._hashes: Dict[str, Tuple[Dict[str, str], Optional[float]]] = {}
+
+    def _check(self):
+        if self.down:
+            raise RedisConnectionError("Error connecting to MemoryRedis")
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def _sweep(self):
+        """Drop every expired string and hash, if sweep_interval has passed since the last sweep"""
+        now = self.clock()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        for store in (self._data, self._hashes):
+            expired = [name for name, (_, expires) in store.items() if expires is not None and now >= expires]
+            for name in expired:
+                del store[name]
+
+    def __len__(self) -> int:
+        """Number of keys held, expired or not (test helper)"""
+        return len(self._data) + len(self._sorted_sets) + len(self._hashes)
+
+    def _live(self, name: str) -> Optional[bytes]:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        if entry[1] is not None and self.clock() >= entry[1]:
+            del self._data[name]
+            return None
+        return entry[0]
+
+    def ttl(self, name: str) -> Optional[float]:
+        """Seconds until name expires, None without an expiry (test helper)"""
+        entry = self._data.get(name)
+        return entry[1] - self.clock() if entry and entry[1] is not None else None
+
+    async def get(self, name: str) -> Optional[bytes]:
+        self._check()
+        return self._live(name)
+
+    async def set(self, name: str, value, ex: Optional[float] = None, px: Optional[int] = None, nx: bool = False):
+        self._check()
+        self._sweep()
+        if nx and self._live(name) is not None:
+            return None
+        expires = ex if ex is not None else (px / 1000 if px is not None else None)
+        self._data[name] = (self._encode(value), self.clock() + expires if expires is not None else None)
+        return True
+
+    async def delete(self, *names: str) -> int:
+        self._check()
+        deleted = 0
+        for name in names:
+            deleted += self._live(name) is not None
+            self._data.pop(name, None)
+            deleted += self._sorted_sets.pop(name, None) is not None
+            deleted += self._hashes.pop(name, None) is not None
+        return deleted
+
+    async def zadd(self, name: str, mapping: Dict, xx: bool = False) -> int:
+        self._check()
+        members = self._sorted_sets.setdefault(name, {})
+        added = 0
+        for member, score in mapping.items():
+            member = self._encode(member)
+            if xx and member not in members:
+                continue
+            added += member not in members
+            members[member] = float(score)
+        return added
+
+    async def zrangebyscore(self, name: str, min, max, start: Optional[int] = None,
+                            num: Optional[int] = None) -> List[bytes]:
+        self._check()
+        low, high = float(min), float(max)
+        matches = sorted((score, member) for member, score in self._sorted_sets.get(name, {}).items()
+                         if low <= score <= high)
+        members = [member for _, member in matches]
+        if start is not None:
+            members = members[start:start + num if num is not None and num >= 0 else None]
+        return members
+
+    async def zrem(self, name: str, *members) -> int:
+        self._check()
+        existing = self._sorted_sets.get(name, {})
+        return sum(existing.pop(self._encode(member), None) is not None for member in members)
+
+    async def zcard(self, name: str) -> int:
+        self._check()
+        return len(self._sorted_sets.get(name, {}))
+
+    def _hash(self, name: str) -> Dict[str, str]:
+        entry = self._hashes.get(name)
+        if entry is not None and entry[1] is not None and self.clock() >= entry[1]:
+            entry = None
+        if entry is None:
+            entry = self._hashes[name] = ({}, None)
+        return entry[0]
+
+    def _expire(self, name: str, seconds: float):
+        self._sweep()
+        self._hashes[name] = (self._hash(name), self.clock() + seconds)
+
+    def _release_lock(self, keys, args):
+        if self._live(keys[0]) == self._encode(args[0]):
+            self._data.pop(keys[0], None)
+            return 1
+        return 0
+
+    def _acquire(self, keys, args):
+        """rate_limiter.ACQUIRE_SCRIPT"""
+        now = self.clock()
+        buckets, quota = self._hash(keys[0]), self._hash(keys[1])
+        count = int(args[0])
+        tokens, wait, longest = [], 0.0, 1.0
+        for i in range(1, count + 1):
+            limit, seconds = float(args[2 * i - 1]), float(args[2 * i])
+            available = float(buckets.get(f"tokens:{i}", limit))
+            updated = float(buckets.get(f"updated:{i}", now))
+            available = min(limit, available + max(0.0, now - updated) * limit / seconds)
+            if available < 1:
+                wait = max(wait, (1 - available) * seconds / limit)
+            tokens.append(available)
+            longest = max(longest, seconds)
+        remaining = int(quota.get("remaining", -1))
+        reset_at = float(quota.get("reset_at", 0))
+        if reset_at <= now:
+            remaining = -1
+        if remaining == 0:
+            wait = max(wait, reset_at - now)
+        if wait == 0:
+            tokens = [available - 1 for available in tokens]
+            if remaining > 0:
+                quota["remaining"] = str(remaining - 1)
+        for i, available in enumerate(tokens, 1):
+            buckets[f"tokens:{i}"], buckets[f"updated:{i}"] = str(available), str(now)
+        if count > 0:
+            self._expire(keys[0], math.ceil(longest * 2))
+        return str(wait).encode()
+
+    def _update_quota(self, keys, args):
+        """rate_limiter.UPDATE_QUOTA_SCRIPT"""
+        quota = self._hash(keys[0])
+        quota["remaining"], quota["reset_at"] = str(args[0]), str(self.clock() + float(args[1]))
+        self._expire(keys[0], math.ceil(float(args[1])) + 1)
+
+    def register_script(self, script: str):
+        ports = {RELEASE_LOCK_SCRIPT: self._release_lock, ACQUIRE_SCRIPT: self._acquire,
+                 UPDATE_QUOTA_SCRIPT: self._update_quota}
+        if script not in ports:
+            raise ResponseError("MemoryRedis has no Python port of this script")
+        port = ports[script]
+
+        async def run(keys=(), args=()):
+            self._check()
+            return port(keys, args)
+
+        return run
+
+    async def aclose(self):
+        pass
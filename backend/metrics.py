@@ -0,0 +1,126 @@
+"""
+Prometheus metrics for the analysis API.
+
+With several uvicorn workers, point PROMETHEUS_MULTIPROC_DIR at an empty
+directory shared by the workers (and clear it on deploy). Every process
+then writes its samples there and /metrics aggregates them with the
+multiprocess collector, whichever worker serves the scrape.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from starlette.responses import Response
+from starlette.routing import Match
+
+# Request stages range from sub-millisecond scoring to multi-second API calls
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = Histogram(
+    "linkedin_analyzer_stage_seconds",
+    "Time spent in each stage of profile and resume processing",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+PARSE_RESUME_SECONDS = Histogram(
+    "linkedin_analyzer_parse_resume_seconds",
+    "Time spent extracting text from an uploaded resume",
+    ["file_type"],
+    buckets=STAGE_BUCKETS,
+)
+MONGO_SECONDS = Histogram(
+    "linkedin_analyzer_mongo_seconds",
+    "Time spent in MongoDB calls",
+    ["collection", "operation"],
+    buckets=STAGE_BUCKETS,
+)
+PROFILE_FALLBACKS = Counter(
+    "linkedin_analyzer_profile_fallbacks_total",
+    "Profiles served from generate_mock_profile_data instead of the LinkedIn API",
+    ["reason"],
+)
+IN_FLIGHT = Gauge(
+    "linkedin_analyzer_requests_in_flight",
+    "Requests currently being processed",
+    ["endpoint"],
+    multiprocess_mode="livesum",
+)
+CIRCUIT_STATE = Gauge(
+    "linkedin_analyzer_circuit_state",
+    "Upstream circuit breaker state: 0 closed, 1 half-open, 2 open",
+    ["circuit"],
+    multiprocess_mode="livemax",
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "linkedin_analyzer_circuit_transitions_total",
+    "Upstream circuit breaker state changes",
+    ["circuit", "state"],
+)
+
+CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+RESUME_FILE_TYPES = {".pdf": "pdf", ".doc": "doc", ".docx": "docx", ".txt": "txt"}
+
+
+def resume_file_type(suffix: str) -> str:
+    """Bounded file_type label for a resume file suffix"""
+    return RESUME_FILE_TYPES.get(suffix.lower(), "other")
+
+
+@contextmanager
+def observe(histogram, **labels):
+    """Time the block into a histogram, including blocks that raise"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+def record_circuit_transition(circuit: str, previous: str, state: str):
+    """CircuitBreaker on_transition listener"""
+    CIRCUIT_STATE.labels(circuit=circuit).set(CIRCUIT_STATE_VALUES[state])
+    CIRCUIT_TRANSITIONS.labels(circuit=circuit, state=state).inc()
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def metrics_response() -> Response:
+    """Current metrics in the Prometheus text format, aggregated across workers when multiprocess"""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_exited():
+    """Drop this process's live gauges from the multiprocess aggregate"""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class InFlightMiddleware:
+    """Raw ASGI middleware keeping IN_FLIGHT per route template, for the whole response including streams"""
+
+    def __init__(self, app, router):
+        self.app = app
+        self.router = router
+
+    def _endpoint(self, scope) -> str:
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "other")
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with IN_FLIGHT.labels(endpoint=self._endpoint(scope)).track_inprogress():
+            await self.app(scope, receive, send)
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import httpx
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import server
+from metrics import resume_file_type
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_api_failures_count_as_fallbacks(monkeypatch):
+    async def failing_fetch(username):
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(server.linkedin_client, "get_profile_details", failing_fetch)
+    fallbacks = sample("linkedin_analyzer_profile_fallbacks_total", reason="api_error")
+    fetches = sample("linkedin_analyzer_stage_seconds_count", stage="rapidapi_fetch")
+
+    profile_data, from_api = asyncio.run(server.load_linkedin_profile("johndoe"))
+
+    assert from_api is False
+    assert sample("linkedin_analyzer_profile_fallbacks_total", reason="api_error") == fallbacks + 1
+    assert sample("linkedin_analyzer_stage_seconds_count", stage="rapidapi_fetch") == fetches + 1
+
+def test_unmappable_responses_count_as_fallbacks_and_are_not_cacheable(monkeypatch):
+    async def unmappable_fetch(username, priority=None):
+        return httpx.Response(200, json={"experience": [None]})
+
+    monkeypatch.setattr(server.linkedin_client, "get_profile_details", unmappable_fetch)
+    fallbacks = sample("linkedin_analyzer_profile_fallbacks_total", reason="mapping_error")
+
+    profile_data, from_api = asyncio.run(server.load_linkedin_profile("johndoe"))
+
+    assert from_api is False and profile_data == server.generate_mock_profile_data("johndoe")
+    assert sample("linkedin_analyzer_profile_fallbacks_total", reason="mapping_error") == fallbacks + 1
+
+def test_metrics_endpoint_and_in_flight_by_route(monkeypatch):
+    class Profiles:
+        async def find_one(self, query, projection=None):
+            return None
+
+    monkeypatch.setattr(server.profile_writes, "collection", Profiles())
+    client = TestClient(server.app)
+    assert client.get("/api/profiles/abc").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'linkedin_analyzer_mongo_seconds_count{collection="profile_analyses",operation="find"}' in response.text
+    assert sample("linkedin_analyzer_requests_in_flight", endpoint="/api/profiles/{profile_id}") == 0
+    assert 'linkedin_analyzer_requests_in_flight{endpoint="/metrics"} 1.0' in response.text
+
+def test_resume_file_type_labels_are_bounded():
+    assert resume_file_type(".PDF") == "pdf"
+    assert resume_file_type(".exe") == "other"
+
+def test_multiprocess_workers_are_aggregated(tmp_path):
+    record = (
+        "from metrics import PROFILE_FALLBACKS, STAGE_SECONDS\n"
+        "PROFILE_FALLBACKS.labels(reason='api_error').inc()\n"
+        "STAGE_SECONDS.labels(stage='analyze_profile').observe(0.002)\n"
+    )
+    scrape = "from metrics import metrics_response\nprint(metrics_response().body.decode())\n"
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": BACKEND_DIR}
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", record], env=env, check=True)
+    output = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True).stdout
+
+    assert 'linkedin_analyzer_profile_fallbacks_total{reason="api_error"} 2.0' in output
+    assert 'linkedin_analyzer_stage_seconds_count{stage="analyze_profile"} 2.0' in output
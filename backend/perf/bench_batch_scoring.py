@@ -0,0 +1,74 @@
+"""
+Profiles/second of batch_scoring against the scalar analyze_profile.
+
+Feature columns are extracted from a pool of distinct profiles and tiled up
+to each batch size, so the 1M case does not need a million dicts in memory.
+Extraction is timed separately: it is paid once per stored profile, while
+score_columns is what re-runs after a threshold change.
+
+    cd backend && python -m perf.bench_batch_scoring --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+import server
+from batch_scoring import extract_columns, score_columns
+from perf.corpus import random_profile
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds else float("inf")
+
+
+def run(sizes, pool_size: int, scalar_sample: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    pool = [random_profile(rng) for _ in range(pool_size)]
+
+    started = time.perf_counter()
+    for profile in pool[:scalar_sample]:
+        server.analyze_profile(profile)
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pool_columns = extract_columns(pool)
+    extract_seconds = time.perf_counter() - started
+
+    results = []
+    for size in sizes:
+        repeats = -(-size // pool_size)
+        columns = {name: np.tile(values, repeats)[:size] for name, values in pool_columns.items()}
+        started = time.perf_counter()
+        score_columns(columns)
+        seconds = time.perf_counter() - started
+        results.append({"profiles": size, "seconds": round(seconds, 4), "profiles_per_second": _rate(size, seconds)})
+
+    return {
+        "benchmark": "batch_scoring",
+        "scalar_analyze_profile_per_second": _rate(scalar_sample, scalar_seconds),
+        "extract_columns_per_second": _rate(pool_size, extract_seconds),
+        "score_columns": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--pool-size", type=int, default=10_000)
+    parser.add_argument("--scalar-sample", type=int, default=10_000)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.pool_size, min(args.scalar_sample, args.pool_size))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
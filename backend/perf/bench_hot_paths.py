@@ -0,0 +1,190 @@
+"""
+Offline benchmarks for the analysis and resume-optimisation hot paths.
+
+Every case is generated deterministically and runs in-process, with no
+Mongo or network: analyze_profile over small, typical and huge profiles,
+optimize_linkedin_sections over 1, 10 and 100 page resumes, PDF text
+extraction (the CPU work of parse_resume) over generated PDFs and
+generate_content_suggestions. Each case reports ops/sec, p50/p99 latency
+and the tracemalloc peak of one call.
+
+Save a baseline, then compare later runs against it; the run exits with
+status 1 when a case is slower than the baseline by more than --threshold.
+
+    cd backend && python -m perf.bench_hot_paths --save perf/baseline.json
+    cd backend && python -m perf.bench_hot_paths --compare perf/baseline.json --threshold 0.15
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("COMPUTE_EXECUTOR", "inline")
+
+import server
+from perf.pdf import text_to_pdf
+
+SKILL_WORDS = ["Python", "Leadership", "SQL", "Product Design", "Sales", "Cloud", "Data Analysis",
+               "Communication", "Finance", "Machine Learning", "Kubernetes", "Negotiation"]
+DESCRIPTION_WORDS = ["Led", "built", "a", "team", "that", "increased", "revenue", "by", "20%", "and",
+                     "launched", "the", "platform", "for", "customers", "across", "regions"]
+
+
+def small_profile() -> dict:
+    return {"headline": "Engineer", "skills": ["Python"]}
+
+
+def typical_profile() -> dict:
+    return server.generate_mock_profile_data("johndoe")
+
+
+def huge_profile(seed: int = 17) -> dict:
+    """Hundreds of experiences and skills with long descriptions"""
+    rng = random.Random(seed)
+    profile = typical_profile()
+    profile["about"] = " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(2000))
+    profile["experience"] = [
+        {
+            "title": rng.choice(["Software Engineer", "Product Manager", "Data Scientist"]),
+            "company": f"Company {i}",
+            "description": " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(120)),
+        }
+        for i in range(300)
+    ]
+    profile["skills"] = [f"{rng.choice(SKILL_WORDS)} {i}" for i in range(500)]
+    profile["certifications"] = [{"name": f"Certification {i}"} for i in range(50)]
+    profile["recommendations"] = [{"text": "Great colleague"} for _ in range(80)]
+    return profile
+
+
+def resume_text(pages: int) -> str:
+    return server.get_sample_resume_text() * pages
+
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    """Benchmark name -> zero-argument callable, with all inputs prepared up front"""
+    profiles = {"small": small_profile(), "typical": typical_profile(), "huge": huge_profile()}
+    cases = {}
+    for name, profile in profiles.items():
+        cases[f"analyze_profile/{name}"] = lambda profile=profile: server.analyze_profile(profile)
+
+    typical = profiles["typical"]
+    for pages in (1, 10, 100):
+        text = resume_text(pages)
+        cases[f"optimize_linkedin_sections/{pages}_pages"] = \
+            lambda text=text: server.optimize_linkedin_sections(typical, text)
+
+    sample = server.get_sample_resume_text()
+    lines_per_page = len(sample.splitlines())
+    for pages in (1, 10, server.UPLOAD_MAX_PDF_PAGES):
+        pdf = text_to_pdf(sample * pages, lines_per_page)
+        cases[f"parse_resume/pdf_{pages}_pages"] = \
+            lambda pdf=pdf: server.extract_pdf_text(pdf, server.UPLOAD_MAX_PDF_PAGES)
+
+    analysis = server.analyze_profile(typical)
+    cases["generate_content_suggestions/typical"] = \
+        lambda: server.generate_content_suggestions(typical, analysis)
+    return cases
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn: Callable[[], object], min_time: float, min_runs: int, warmup: int = 3) -> dict:
+    """Time individual calls for at least min_time seconds and min_runs calls"""
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_runs or time.perf_counter() - started < min_time:
+        call_started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - call_started)
+    total = sum(timings)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "runs": len(timings),
+        "ops_per_second": round(len(timings) / total, 2),
+        "p50_ms": round(_percentile(timings, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(timings, 0.99) * 1000, 4),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def run(selected: Optional[List[str]] = None, min_time: float = 1.0, min_runs: int = 5) -> dict:
+    results = {}
+    for name, fn in build_cases().items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        results[name] = measure(fn, min_time, min_runs)
+    return {
+        "benchmark": "hot_paths",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scorer_version": server.SCORER_VERSION,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """Regressions of more than threshold (a fraction) in ops/sec or p50 against the baseline"""
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        if result["ops_per_second"] < previous["ops_per_second"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['ops_per_second']} ops/s vs baseline {previous['ops_per_second']} ops/s"
+            )
+        elif result["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {result['p50_ms']} ms vs baseline {previous['p50_ms']} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", nargs="+", help="Only run benchmarks whose name contains one of these")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to spend timing each benchmark")
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--save", help="Write the report to this file as the new baseline")
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("BENCH_REGRESSION_THRESHOLD", "0.15")),
+                        help="Allowed slowdown as a fraction of the baseline (default 0.15)")
+    args = parser.parse_args(argv)
+
+    report = run(args.filter, args.min_time, args.min_runs)
+    output = json.dumps(report, indent=2)
+    if args.save:
+        with open(args.save, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
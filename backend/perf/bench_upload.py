@@ -0,0 +1,107 @@
+"""
+Peak memory per resume upload through parse_resume.
+
+Each case runs in a fresh process, with an empty memory-only resume cache
+so the upload is parsed rather than looked up, and ru_maxrss reflects that
+upload alone:
+the report gives the RSS before the upload, the peak during it and the
+tracemalloc peak of Python allocations.
+
+    cd backend && python -m perf.bench_upload --pages 1 10 50
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("COMPUTE_EXECUTOR", "inline")
+os.environ.setdefault("RESUME_CACHE_MONGO", "false")
+
+from starlette.datastructures import UploadFile
+
+from perf.pdf import text_to_pdf
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _run_case(kind: str, pages: int, queue):
+    import server
+    from resume_cache import ResumeCache
+
+    # An empty, memory-only resume cache: every case parses, and nothing waits on Mongo or Redis
+    server.resume_cache = ResumeCache()
+
+    text = server.get_sample_resume_text()
+    lines_per_page = len(text.splitlines())
+    if kind == "pdf":
+        content, filename = text_to_pdf(text * pages, lines_per_page), "resume.pdf"
+    else:
+        content, filename = (text * pages).encode(), "resume.txt"
+
+    rss_before = _rss_mb()
+    tracemalloc.start()
+    started = time.perf_counter()
+    upload = UploadFile(io.BytesIO(content), filename=filename, size=len(content))
+    try:
+        extracted = asyncio.run(server.parse_resume(upload))
+        error = None
+    except Exception as e:
+        extracted, error = "", f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put({
+        "kind": kind,
+        "pages": pages,
+        "upload_bytes": len(content),
+        "text_chars": len(extracted),
+        "seconds": round(elapsed, 4),
+        "rss_before_mb": round(rss_before, 1),
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "peak_rss_delta_mb": round(_rss_mb() - rss_before, 1),
+        "traced_peak_mb": round(traced_peak / (1024 * 1024), 2),
+        "error": error,
+    })
+
+
+def run(kinds, page_counts) -> list:
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for kind in kinds:
+        for pages in page_counts:
+            queue = context.Queue()
+            process = context.Process(target=_run_case, args=(kind, pages, queue))
+            process.start()
+            results.append(queue.get())
+            process.join()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--kinds", nargs="+", default=["pdf", "txt"], choices=["pdf", "txt"])
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = {"benchmark": "upload", "results": run(args.kinds, args.pages)}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
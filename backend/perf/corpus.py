@@ -0,0 +1,421 @@
+"""
+Seeded synthetic corpus of LinkedIn profiles and matching resumes.
+
+Each profile is generated as a RapidAPI-shaped payload and mapped with
+map_api_response_to_profile_data, so it has exactly the schema the API
+path produces. Section sizes, text lengths and skill popularity follow
+skewed distributions across industries. Every record depends only on
+(seed, index), so any slice of a corpus can be regenerated on its own.
+
+Records are streamed to NDJSON (one profile per line, with the raw API
+payload for fake API servers) or bulk-inserted into profile_analyses as
+analysed documents, upserted by profile_id so reruns replace them.
+Resumes are written as TXT and multi-page PDFs. random_profile gives
+unrealistic profiles for exercising the scorers' edge cases instead.
+
+    cd backend && python -m perf.corpus --count 10000 --ndjson corpus.ndjson --resumes-dir corpus/
+    cd backend && python -m perf.corpus --count 100000 --mongo --batch-size 1000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import textwrap
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import server
+from perf.pdf import LINES_PER_PAGE, text_to_pdf
+
+INDUSTRIES = {
+    "Computer Software": {
+        "titles": ["Software Engineer", "Senior Software Engineer", "Engineering Manager", "Data Scientist",
+                   "Product Manager", "UX Designer", "Site Reliability Engineer"],
+        "skills": ["Python", "JavaScript", "Java", "SQL", "AWS", "React", "Kubernetes", "Docker", "Go",
+                   "Machine Learning", "Software Development", "System Design", "Git", "Node.js", "TypeScript"],
+        "fields": ["Computer Science", "Software Engineering", "Mathematics", "Data Science"],
+    },
+    "Financial Services": {
+        "titles": ["Financial Analyst", "Investment Associate", "Risk Manager", "Portfolio Manager",
+                   "Business Analyst", "Controller"],
+        "skills": ["Financial Modeling", "Excel", "Valuation", "Risk Management", "Finance", "Accounting",
+                   "Bloomberg", "SQL", "Forecasting", "Due Diligence", "Data Analysis"],
+        "fields": ["Finance", "Economics", "Accounting", "Business Administration"],
+    },
+    "Marketing and Advertising": {
+        "titles": ["Marketing Specialist", "Content Writer", "Growth Marketer", "Brand Manager",
+                   "Marketing Director", "SEO Specialist"],
+        "skills": ["Marketing", "SEO", "Content Strategy", "Google Analytics", "Copywriting", "Social Media",
+                   "Brand Management", "Campaign Management", "Design", "Communication"],
+        "fields": ["Marketing", "Communications", "Journalism", "Business Administration"],
+    },
+    "Hospital & Health Care": {
+        "titles": ["Registered Nurse", "Clinical Research Coordinator", "Healthcare Administrator",
+                   "Operations Manager", "Physician Assistant"],
+        "skills": ["Patient Care", "Clinical Research", "Healthcare Management", "EMR", "Compliance",
+                   "Leadership", "Teamwork", "Communication", "Operations"],
+        "fields": ["Nursing", "Public Health", "Biology", "Health Administration"],
+    },
+    "Human Resources": {
+        "titles": ["HR Specialist", "Recruiter", "Talent Acquisition Manager", "HR Business Partner",
+                   "People Operations Manager"],
+        "skills": ["Recruiting", "HR", "Talent Management", "Onboarding", "Employee Relations", "Negotiation",
+                   "Leadership", "Communication", "Workday"],
+        "fields": ["Human Resources", "Psychology", "Business Administration"],
+    },
+    "Retail": {
+        "titles": ["Store Manager", "Sales Executive", "Merchandiser", "Operations Manager",
+                   "Customer Success Manager"],
+        "skills": ["Sales", "Customer Service", "Merchandising", "Inventory Management", "Leadership",
+                   "Negotiation", "Teamwork", "Problem Solving"],
+        "fields": ["Business Administration", "Marketing", "Economics"],
+    },
+}
+# Picked most often first: the corpus is dominated by software, like real traffic
+INDUSTRY_WEIGHTS = [40, 15, 15, 10, 10, 10]
+SOFT_SKILLS = ["Leadership", "Communication", "Teamwork", "Problem Solving", "Project Management",
+               "Public Speaking", "Mentoring", "Time Management"]
+
+FIRST_NAMES = ["Ava", "Noah", "Mia", "Liam", "Zoe", "Ethan", "Priya", "Wei", "Sofia", "Omar", "Hana", "Lucas",
+               "Amara", "Diego", "Ingrid", "Kenji", "Fatima", "Mateo", "Chloe", "Arjun"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Kim", "Nguyen", "Müller", "Okafor", "Rossi", "Silva",
+              "Johansson", "Tanaka", "Haddad", "Kowalski", "Dubois", "O'Brien"]
+COMPANY_PARTS = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay", "Soylent",
+                 "Tyrell", "Cyberdyne", "Wonka", "Aperture", "Massive Dynamic"]
+COMPANY_SUFFIXES = ["Inc.", "Corp", "Labs", "Group", "Technologies", "Partners", "Health", "Systems"]
+SCHOOLS = ["State University", "Institute of Technology", "University of the North", "City College",
+           "Polytechnic University", "School of Business"]
+DEGREES = ["Bachelor of Science", "Bachelor of Arts", "Master of Science", "MBA", "PhD", "Associate Degree"]
+CITIES = [("San Francisco", "California", "US", "United States of America"),
+          ("New York", "New York", "US", "United States of America"),
+          ("London", "", "GB", "United Kingdom"),
+          ("Berlin", "", "DE", "Germany"),
+          ("Bangalore", "Karnataka", "IN", "India"),
+          ("Toronto", "Ontario", "CA", "Canada"),
+          ("Sydney", "New South Wales", "AU", "Australia")]
+VERBS = ["Led", "Built", "Designed", "Launched", "Managed", "Developed", "Increased", "Reduced", "Improved",
+         "Delivered", "Created", "Achieved", "Grew", "Streamlined", "Negotiated", "Mentored"]
+OBJECTS = ["the customer onboarding flow", "a cross-functional team of {n}", "quarterly revenue by {p}%",
+           "infrastructure costs by {p}%", "the analytics platform", "{n} enterprise accounts",
+           "a new pricing strategy", "the hiring process for {n} roles", "release cadence from monthly to weekly",
+           "customer satisfaction scores by {p}%", "a data pipeline processing {n}M events a day",
+           "the company's first mobile app"]
+FILLER = ["with a focus on quality", "in partnership with sales and product", "across three regions",
+          "while cutting support tickets", "using agile practices", "ahead of schedule", "for global clients"]
+ABOUT_OPENERS = ["I am a {title} with {years} years of experience in {industry}.",
+                 "My journey in {industry} started {years} years ago.",
+                 "{title} passionate about {skill} and building great teams.",
+                 "I help organizations grow through {skill}."]
+
+# Vocabulary of random_profile
+RANDOM_WORDS = ["journey", "led", "built", "engineer", "manager", "I am", "I ", "data", "team", "-", "•", "|",
+                "increased", "python", "sales", "design", "x" * 40, "passion", "achieved", "\n"]
+RANDOM_SKILLS = ["Python", "Leadership", "Sales", "Product Design", "HR", "Cooking", "Software Development",
+                 "Communication", "Finance", "Teamwork"]
+
+
+def _count(rng: random.Random, median: float, sigma: float, cap: int) -> int:
+    """Log-normally distributed count: mostly near the median, with a long tail up to cap"""
+    return min(cap, int(rng.lognormvariate(0, sigma) * median))
+
+
+def _sentence(rng: random.Random) -> str:
+    text = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    if rng.random() < 0.4:
+        text += f" {rng.choice(FILLER)}"
+    return text.format(n=rng.randint(2, 250), p=rng.randint(5, 60)) + "."
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _skills(rng: random.Random, industry: dict, count: int) -> List[str]:
+    """Skills drawn with Zipf-like popularity: the first skills of an industry are the most common"""
+    pool = industry["skills"] + [skill for skill in SOFT_SKILLS if skill not in industry["skills"]]
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    chosen = []
+    while len(chosen) < min(count, len(pool)):
+        skill = rng.choices(pool, weights)[0]
+        if skill not in chosen:
+            chosen.append(skill)
+    # Beyond the known pool, long-tail profiles list niche variants
+    chosen.extend(f"{rng.choice(pool)} ({rng.choice(['Advanced', 'Tools', 'Strategy', 'Ops'])} {i})"
+                  for i in range(count - len(chosen)))
+    return chosen
+
+
+class CorpusGenerator:
+    """Deterministic profiles and resumes; record i depends only on (seed, i)"""
+
+    def __init__(self, seed: int = 1):
+        self.seed = seed
+
+    def _rng(self, index: int, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}:{index}")
+
+    def username(self, index: int) -> str:
+        return f"synthetic-{self.seed}-{index}"
+
+    def api_response(self, index: int) -> dict:
+        """RapidAPI-shaped payload for profile index"""
+        rng = self._rng(index, "profile")
+        industry_name = rng.choices(list(INDUSTRIES), INDUSTRY_WEIGHTS)[0]
+        industry = INDUSTRIES[industry_name]
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        city, state, country, country_full_name = rng.choice(CITIES)
+        skills = _skills(rng, industry, _count(rng, 12, 0.8, 400))
+
+        year = 2024
+        experience = []
+        for _ in range(_count(rng, 3, 0.7, 250)):
+            duration = rng.randint(1, 6)
+            start = year - duration
+            experience.append({
+                "company": f"{rng.choice(COMPANY_PARTS)} {rng.choice(COMPANY_SUFFIXES)}",
+                "title": rng.choice(industry["titles"]),
+                "description": "" if rng.random() < 0.15 else _paragraph(rng, _count(rng, 3, 0.8, 40)),
+                "location": f"{city}, {country}",
+                "starts_at": {"month": rng.randint(1, 12), "year": start},
+                "ends_at": None if not experience else {"month": rng.randint(1, 12), "year": year},
+            })
+            year = start
+
+        education = [
+            {
+                "school": f"{rng.choice(['Northern', 'Western', 'Central', 'Pacific', 'Royal'])} {rng.choice(SCHOOLS)}",
+                "degree": rng.choice(DEGREES) if rng.random() < 0.9 else "",
+                "field_of_study": rng.choice(industry["fields"]) if rng.random() < 0.85 else "",
+                "description": _paragraph(rng, rng.randint(0, 3)),
+                "start_date": {"year": year - 4 - 4 * i},
+                "end_date": {"year": year - 4 * i} if rng.random() < 0.9 else {},
+            }
+            for i in range(rng.choices([0, 1, 2, 3], [10, 55, 28, 7])[0])
+        ]
+
+        title = experience[0]["title"] if experience else rng.choice(industry["titles"])
+        headline_parts = [title] + rng.sample(skills, min(len(skills), rng.randint(0, 4)))
+        about = ""
+        if rng.random() < 0.8:
+            opener = rng.choice(ABOUT_OPENERS).format(
+                title=title, years=rng.randint(1, 30), industry=industry_name.lower(),
+                skill=skills[0] if skills else "strategy"
+            )
+            about = opener + " " + _paragraph(rng, _count(rng, 4, 0.9, 60))
+
+        return {
+            "first_name": first,
+            "last_name": last,
+            "full_name": f"{first} {last}",
+            "headline": " | ".join(headline_parts) if rng.random() < 0.95 else "",
+            "summary": about,
+            "country": country,
+            "country_full_name": country_full_name,
+            "city": city,
+            "state": state,
+            "industry": industry_name,
+            "experience": experience,
+            "education": education,
+            "skills": skills,
+        }
+
+    def profile(self, index: int) -> dict:
+        """Mapped profile_data, exactly as the API path stores it"""
+        return server.map_api_response_to_profile_data(self.api_response(index), self.username(index))
+
+    def resume_text(self, index: int, pages: Optional[int] = None) -> str:
+        """Resume matching profile index, padded with extra achievements to roughly `pages` pages"""
+        api_response = self.api_response(index)
+        rng = self._rng(index, "resume")
+        pages = pages or rng.choices([1, 2, 3, 5, 10], [40, 35, 15, 7, 3])[0]
+
+        def wrap(text, prefix=""):
+            return textwrap.wrap(text, 90, initial_indent=prefix, subsequent_indent="  " if prefix else "")
+
+        lines = ["PROFESSIONAL SUMMARY"]
+        lines += wrap(api_response["summary"] or _paragraph(rng, 2)) + ["", "EXPERIENCE"]
+        for experience in api_response["experience"]:
+            starts_at, ends_at = experience["starts_at"], experience["ends_at"]
+            lines.append(f"{experience['title']}, {experience['company']}")
+            lines.append(f"{starts_at['year']} - {ends_at['year'] if ends_at else 'Present'}")
+            for _ in range(rng.randint(2, 5)):
+                lines += wrap(_sentence(rng), "- ")
+            lines.append("")
+        lines.append("EDUCATION")
+        for education in api_response["education"]:
+            lines.append(education["school"])
+            lines.append(" in ".join(part for part in (education["degree"], education["field_of_study"]) if part))
+        lines += ["", "SKILLS"] + wrap(", ".join(api_response["skills"][:40]))
+
+        target = pages * LINES_PER_PAGE
+        if len(lines) < target:
+            lines += ["", "SELECTED ACHIEVEMENTS"]
+            while len(lines) < target:
+                lines += wrap(_sentence(rng), "- ")
+        return "\n".join(lines) + "\n"
+
+    def resume_pdf(self, index: int, pages: Optional[int] = None) -> bytes:
+        return text_to_pdf(self.resume_text(index, pages), LINES_PER_PAGE)
+
+    def records(self, count: int, start: int = 0) -> Iterator[dict]:
+        for index in range(start, start + count):
+            username = self.username(index)
+            api_response = self.api_response(index)
+            yield {
+                "index": index,
+                "username": username,
+                "linkedin_url": f"https://www.linkedin.com/in/{username}/",
+                "api_response": api_response,
+                "profile_data": server.map_api_response_to_profile_data(api_response, username),
+            }
+
+
+def _random_text(rng: random.Random, max_words: int) -> str:
+    return " ".join(rng.choice(RANDOM_WORDS) for _ in range(rng.randint(0, max_words)))
+
+
+def random_profile(rng: random.Random) -> dict:
+    """
+    A profile_data dict built to hit scoring edge cases rather than to look
+    real: missing, empty and None sections, the about/summary alias, repeated
+    skills and separator-only text.
+    """
+    profile = {}
+    if rng.random() < 0.9:
+        profile["headline"] = rng.choice([None, "", _random_text(rng, 12)])
+    about_key = rng.choice(["about", "summary", None])
+    if about_key:
+        profile[about_key] = _random_text(rng, rng.choice([5, 40, 300]))
+    if rng.random() < 0.9:
+        profile["experience"] = [
+            {"title": "Engineer", "description": rng.choice([None, "", _random_text(rng, 20)])}
+            for _ in range(rng.randint(0, 6))
+        ]
+    if rng.random() < 0.9:
+        profile["education"] = [
+            {field: rng.choice(["", "value"]) for field in ["school", "degree", "field_of_study", "start_date", "end_date"]}
+            | {"description": _random_text(rng, 15)}
+            for _ in range(rng.randint(0, 3))
+        ]
+    if rng.random() < 0.9:
+        profile["skills"] = rng.sample(RANDOM_SKILLS, rng.randint(0, len(RANDOM_SKILLS))) * rng.choice([1, 3])
+    for key in ["certifications", "recommendations", "featured", "activity"]:
+        if rng.random() < 0.8:
+            profile[key] = [{}] * rng.randint(0, 7)
+    for key in ["has_profile_image", "has_banner"]:
+        if rng.random() < 0.8:
+            profile[key] = rng.random() < 0.5
+    return profile
+
+
+def analysed_document(record: dict) -> dict:
+    """profile_analyses document shaped like the ones fetch_profile stores"""
+    profile_data = record["profile_data"]
+    analysis_results = server.analyze_profile(profile_data)
+    return {
+        "profile_id": str(uuid.UUID(int=random.Random(record["username"]).getrandbits(128))),
+        "linkedin_url": record["linkedin_url"],
+        "username": record["username"],
+        "profile_data": profile_data,
+        "analysis_results": analysis_results,
+        "content_suggestions": server.generate_content_suggestions(profile_data, analysis_results),
+        "created_at": str(datetime.now()),
+    }
+
+
+def write_ndjson(generator: CorpusGenerator, count: int, start: int, output, resumes_dir: Optional[Path],
+                 formats: List[str]) -> int:
+    written = 0
+    for record in generator.records(count, start):
+        if resumes_dir is not None:
+            record["resumes"] = write_resumes(generator, record, resumes_dir, formats)
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        written += 1
+    return written
+
+
+def write_resumes(generator: CorpusGenerator, record: dict, resumes_dir: Path, formats: List[str]) -> dict:
+    text = generator.resume_text(record["index"])
+    paths = {}
+    if "txt" in formats:
+        path = resumes_dir / f"{record['username']}.txt"
+        path.write_text(text)
+        paths["txt"] = str(path)
+    if "pdf" in formats:
+        path = resumes_dir / f"{record['username']}.pdf"
+        path.write_bytes(text_to_pdf(text, LINES_PER_PAGE))
+        paths["pdf"] = str(path)
+    return paths
+
+
+def upsert_documents(collection, batch: List[dict]) -> int:
+    """
+    Write a batch keyed by profile_id, replacing documents already there:
+    profile ids are deterministic per seed, so a rerun overwrites its corpus
+    instead of failing on duplicate keys
+    """
+    from pymongo import ReplaceOne
+
+    result = collection.bulk_write(
+        [ReplaceOne({"profile_id": doc["profile_id"]}, doc, upsert=True) for doc in batch], ordered=False
+    )
+    return result.upserted_count + result.matched_count
+
+
+def insert_into_mongo(generator: CorpusGenerator, count: int, start: int, batch_size: int) -> int:
+    """Analyse and bulk-upsert profiles into profile_analyses, batch_size documents per bulk_write"""
+    from pymongo import MongoClient
+
+    client = MongoClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    collection = client.get_database(os.environ.get("DB_NAME", "linkedin_analyzer")).profile_analyses
+    written = 0
+    batch = []
+    try:
+        for record in generator.records(count, start):
+            batch.append(analysed_document(record))
+            if len(batch) == batch_size:
+                written += upsert_documents(collection, batch)
+                batch = []
+        if batch:
+            written += upsert_documents(collection, batch)
+    finally:
+        client.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--start", type=int, default=0, help="Index of the first profile (to extend a corpus)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ndjson", help="Stream records to this file ('-' for stdout)")
+    parser.add_argument("--resumes-dir", help="Also write each profile's resume here")
+    parser.add_argument("--formats", nargs="+", default=["txt", "pdf"], choices=["txt", "pdf"])
+    parser.add_argument("--mongo", action="store_true", help="Insert analysed documents into MONGO_URL/DB_NAME")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+    if not args.ndjson and not args.mongo:
+        parser.error("choose --ndjson and/or --mongo")
+
+    generator = CorpusGenerator(args.seed)
+    if args.ndjson:
+        resumes_dir = None
+        if args.resumes_dir:
+            resumes_dir = Path(args.resumes_dir)
+            resumes_dir.mkdir(parents=True, exist_ok=True)
+        if args.ndjson == "-":
+            written = write_ndjson(generator, args.count, args.start, sys.stdout, resumes_dir, args.formats)
+        else:
+            with open(args.ndjson, "w") as output:
+                written = write_ndjson(generator, args.count, args.start, output, resumes_dir, args.formats)
+        print(f"Wrote {written} profiles to {args.ndjson}", file=sys.stderr)
+    if args.mongo:
+        written = insert_into_mongo(generator, args.count, args.start, args.batch_size)
+        print(f"Wrote {written} profile analyses", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
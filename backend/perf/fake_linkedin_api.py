@@ -0,0 +1,283 @@
+"""
+Local stand-in for the RapidAPI LinkedIn profile-details endpoint.
+
+Serves corpus profiles (perf.corpus) as RapidAPI-shaped payloads, so the
+API path maps realistic data without leaving the machine. Usernames of the
+form synthetic-<seed>-<index> return that corpus record; any other username
+maps to a stable corpus index.
+
+Upstream trouble is injected per request, from a seeded RNG:
+
+- latency drawn from a distribution (constant, uniform, exponential,
+  lognormal or pareto, optionally capped with max=)
+- timeouts: the request hangs for timeout_seconds before a 504, so the
+  client's read timeout fires first
+- 429 with Retry-After, and a request quota per window reported in the
+  x-ratelimit-requests-* headers like RapidAPI does
+- 500/502/503 responses
+- malformed payloads: invalid JSON, a JSON list instead of an object, or
+  an object whose fields break the mapping
+
+GET /__config shows the settings and POST /__config changes them while a
+test runs; GET /__stats counts the outcomes. Point the backend at the stub
+with LINKEDIN_API_URL:
+
+    cd backend && python -m perf.fake_linkedin_api --port 8001 \\
+        --latency lognormal:median=0.2,sigma=0.6,max=5 --server-error-rate 0.02 --rate-limit-rate 0.01
+    cd backend && LINKEDIN_API_URL=http://127.0.0.1:8001 uvicorn server:app
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import re
+import time
+from collections import Counter
+from typing import Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from perf.corpus import CorpusGenerator
+
+SYNTHETIC_USERNAME = re.compile(r"^synthetic-(\d+)-(\d+)$")
+MALFORMED_KINDS = ("invalid_json", "wrong_shape", "bad_fields")
+
+
+def corpus_index(username: str, corpus_size: int) -> int:
+    return int.from_bytes(hashlib.sha256(username.encode()).digest()[:8], "big") % corpus_size
+
+
+class Latency:
+    """
+    Latency distribution parsed from "kind:param=value,...", in seconds.
+
+        none | constant:0.05 | uniform:min=0.01,max=0.2 | exponential:mean=0.1
+        lognormal:median=0.2,sigma=0.6 | pareto:scale=0.05,alpha=1.5
+    Every kind accepts max= to cap the tail.
+    """
+
+    PARAMS = {
+        "none": set(),
+        "constant": {"value"},
+        "uniform": {"min", "max"},
+        "exponential": {"mean"},
+        "lognormal": {"median", "sigma"},
+        "pareto": {"scale", "alpha"},
+    }
+
+    def __init__(self, spec: str = "none"):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        if kind not in self.PARAMS:
+            raise ValueError(f"Unknown latency distribution {kind!r}, expected one of {list(self.PARAMS)}")
+        self.kind = kind
+        self.params = {}
+        for part in filter(None, params.split(",")):
+            name, _, value = part.rpartition("=")
+            self.params[name or "value"] = float(value)
+        self.cap = self.params.pop("max", None) if kind != "uniform" else None
+        missing = self.PARAMS[kind] - set(self.params)
+        if missing:
+            raise ValueError(f"Latency {spec!r} is missing {sorted(missing)}")
+
+    def sample(self, rng: random.Random) -> float:
+        p = self.params
+        if self.kind == "none":
+            value = 0.0
+        elif self.kind == "constant":
+            value = p["value"]
+        elif self.kind == "uniform":
+            value = rng.uniform(p["min"], p["max"])
+        elif self.kind == "exponential":
+            value = rng.expovariate(1 / p["mean"])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(p["median"]), p["sigma"])
+        else:
+            value = p["scale"] * rng.paretovariate(p["alpha"])
+        return min(value, self.cap) if self.cap is not None else value
+
+
+class StubConfig:
+    """Fault injection settings; rates are per-request probabilities"""
+
+    FIELDS = {
+        "latency": str,
+        "timeout_rate": float,
+        "timeout_seconds": float,
+        "rate_limit_rate": float,
+        "retry_after": float,
+        "server_error_rate": float,
+        "malformed_rate": float,
+        "quota": int,
+        "quota_window": float,
+    }
+
+    def __init__(self, **settings):
+        self.latency = "none"
+        self.timeout_rate = 0.0
+        self.timeout_seconds = 120.0
+        self.rate_limit_rate = 0.0
+        self.retry_after = 1.0
+        self.server_error_rate = 0.0
+        self.malformed_rate = 0.0
+        # Requests allowed per quota_window seconds; 0 means unlimited
+        self.quota = 0
+        self.quota_window = 60.0
+        self.update(settings)
+
+    def update(self, settings: dict):
+        unknown = set(settings) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown stub settings {sorted(unknown)}")
+        for name, value in settings.items():
+            setattr(self, name, self.FIELDS[name](value))
+        self.latency_distribution = Latency(self.latency)
+        if self.timeout_rate + self.rate_limit_rate + self.server_error_rate + self.malformed_rate > 1:
+            raise ValueError("Fault rates add up to more than 1")
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+def create_app(seed: int = 1, corpus_size: int = 100_000, config: Optional[StubConfig] = None,
+               clock=time.monotonic) -> Starlette:
+    """Fake API app serving corpus seed; config can be changed later through POST /__config"""
+    generator = CorpusGenerator(seed)
+    config = config or StubConfig()
+    rng = random.Random(f"stub:{seed}")
+    stats = Counter()
+    quota = {"window_started": clock(), "used": 0}
+
+    def quota_headers() -> dict:
+        if not config.quota:
+            return {}
+        now = clock()
+        if now - quota["window_started"] >= config.quota_window:
+            quota["window_started"], quota["used"] = now, 0
+        reset = config.quota_window - (now - quota["window_started"])
+        return {
+            "x-ratelimit-requests-limit": str(config.quota),
+            "x-ratelimit-requests-remaining": str(max(0, config.quota - quota["used"])),
+            "x-ratelimit-requests-reset": str(math.ceil(reset)),
+        }
+
+    def api_response(username: str) -> dict:
+        match = SYNTHETIC_USERNAME.match(username)
+        if match and int(match.group(1)) == seed:
+            return generator.api_response(int(match.group(2)))
+        return generator.api_response(corpus_index(username, corpus_size))
+
+    def malformed(username: str) -> Response:
+        kind = rng.choice(MALFORMED_KINDS)
+        stats[f"malformed_{kind}"] += 1
+        if kind == "invalid_json":
+            return Response('{"first_name": "Trunc', media_type="application/json")
+        if kind == "wrong_shape":
+            return JSONResponse([api_response(username)])
+        # Experience entries as strings make the mapping fail on exp.get
+        return JSONResponse({**api_response(username), "experience": ["not", "objects"]})
+
+    async def profile_details(request: Request):
+        stats["requests"] += 1
+        username = request.query_params.get("linkedin_id", "")
+        draw = rng.random()
+
+        if draw < config.timeout_rate:
+            stats["timeouts"] += 1
+            await asyncio.sleep(config.timeout_seconds)
+            return Response(status_code=504)
+        draw -= config.timeout_rate
+
+        await asyncio.sleep(config.latency_distribution.sample(rng))
+
+        headers = quota_headers()
+        if config.quota:
+            if quota["used"] >= config.quota:
+                stats["quota_exhausted"] += 1
+                headers["Retry-After"] = headers["x-ratelimit-requests-reset"]
+                return JSONResponse({"message": "You have exceeded the request quota for your plan"},
+                                    status_code=429, headers=headers)
+            quota["used"] += 1
+            headers["x-ratelimit-requests-remaining"] = str(config.quota - quota["used"])
+
+        if draw < config.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse({"message": "Too many requests"}, status_code=429,
+                                headers={**headers, "Retry-After": f"{config.retry_after:g}"})
+        draw -= config.rate_limit_rate
+        if draw < config.server_error_rate:
+            status = rng.choice([500, 502, 503])
+            stats[f"status_{status}"] += 1
+            return JSONResponse({"message": "Upstream error"}, status_code=status, headers=headers)
+        draw -= config.server_error_rate
+        if draw < config.malformed_rate:
+            response = malformed(username)
+            response.headers.update(headers)
+            return response
+
+        stats["ok"] += 1
+        return JSONResponse(api_response(username), headers=headers)
+
+    async def root(request: Request):
+        return Response(status_code=200)
+
+    async def get_stats(request: Request):
+        return JSONResponse(dict(stats))
+
+    async def stub_config(request: Request):
+        if request.method == "POST":
+            try:
+                config.update(await request.json())
+            except (ValueError, TypeError) as e:
+                return JSONResponse({"detail": str(e)}, status_code=400)
+        return JSONResponse(config.as_dict())
+
+    app = Starlette(routes=[
+        Route("/profile-details", profile_details),
+        Route("/", root, methods=["GET", "HEAD"]),
+        Route("/__stats", get_stats),
+        Route("/__config", stub_config, methods=["GET", "POST"]),
+    ])
+    app.state.stats = stats
+    app.state.config = config
+    return app
+
+
+def add_config_arguments(parser: argparse.ArgumentParser, prefix: str = ""):
+    """Stub settings as command-line flags, shared with perf.load_test (which prefixes them with api-)"""
+    parser.add_argument(f"--{prefix}latency", default="none", help=Latency.__doc__.strip().splitlines()[0])
+    parser.add_argument(f"--{prefix}timeout-rate", type=float, default=0.0)
+    parser.add_argument(f"--{prefix}timeout-seconds", type=float, default=120.0)
+    parser.add_argument(f"--{prefix}rate-limit-rate", type=float, default=0.0)
+    parser.add_argument(f"--{prefix}retry-after", type=float, default=1.0)
+    parser.add_argument(f"--{prefix}server-error-rate", type=float, default=0.0)
+    parser.add_argument(f"--{prefix}malformed-rate", type=float, default=0.0)
+    parser.add_argument(f"--{prefix}quota", type=int, default=0, help="Requests per quota window (0: unlimited)")
+    parser.add_argument(f"--{prefix}quota-window", type=float, default=60.0)
+
+
+def config_from_arguments(args, prefix: str = "") -> StubConfig:
+    attribute_prefix = prefix.replace("-", "_")
+    return StubConfig(**{name: getattr(args, attribute_prefix + name) for name in StubConfig.FIELDS})
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--corpus-size", type=int, default=100_000)
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+    app = create_app(args.seed, args.corpus_size, config_from_arguments(args))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
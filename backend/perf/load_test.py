@@ -0,0 +1,292 @@
+"""
+Async load generator for the API, in-process or over HTTP.
+
+In-process (the default), the harness drives server.app through an ASGI
+transport with its lifespan running, the LinkedIn API replaced by
+perf.fake_linkedin_api and Mongo replaced by perf.memory_store (or a real
+MongoDB with --mongo). With --url it sends real HTTP requests to a running
+server, which should itself point at a fake API (LINKEDIN_API_URL).
+
+With --rate, requests arrive as a Poisson process at that rate (open loop)
+and wait for one of --concurrency slots; latency is measured from the
+scheduled arrival, so queueing behind a slow server is not hidden. With
+--rate 0, --concurrency workers send requests back to back (closed loop).
+
+The report gives per-endpoint and overall throughput, p50/p95/p99/max
+latency, status counts and error rates, plus the event-loop lag seen by a
+10 ms ticker on the harness loop (which in-process is also the app's loop).
+
+    cd backend && python -m perf.load_test --duration 30 --rate 50 --concurrency 32 \\
+        --mix fetch_profile=7 upload_resume=2 get_profile=1 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+from perf.corpus import CorpusGenerator
+from perf.fake_linkedin_api import add_config_arguments, config_from_arguments, create_app
+
+DEFAULT_MIX = {"fetch_profile": 7, "upload_resume": 2, "get_profile": 1}
+
+
+def _percentiles(values: List[float]) -> dict:
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    values = sorted(values)
+
+    def at(fraction):
+        return round(values[min(len(values) - 1, int(fraction * len(values)))] * 1000, 3)
+
+    return {"p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(values[-1] * 1000, 3)}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.queued = 0
+
+    def record(self, endpoint: str, status, seconds: float):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        self.statuses.setdefault(endpoint, Counter())[str(status)] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint, latencies in self.latencies.items():
+            statuses = self.statuses[endpoint]
+            errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "errors": errors,
+                "error_rate": round(errors / len(latencies), 4),
+                "statuses": dict(statuses),
+                **_percentiles(latencies),
+            }
+        everything = [latency for latencies in self.latencies.values() for latency in latencies]
+        errors = sum(endpoint["errors"] for endpoint in endpoints.values())
+        return {
+            "overall": {
+                "requests": len(everything),
+                "throughput_rps": round(len(everything) / elapsed, 2),
+                "errors": errors,
+                "error_rate": round(errors / len(everything), 4) if everything else 0,
+                "queued_for_a_slot": self.queued,
+                **_percentiles(everything),
+            },
+            "endpoints": endpoints,
+        }
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic sleep wakes up, i.e. how long the loop was blocked"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return {"samples": len(self.lags), **_percentiles(self.lags)}
+
+
+class Workload:
+    """Builds and sends one request of each kind against the corpus"""
+
+    def __init__(self, rng: random.Random, generator: CorpusGenerator, corpus_size: int, resumes: List[tuple]):
+        self.rng = rng
+        self.generator = generator
+        self.corpus_size = corpus_size
+        self.resumes = resumes
+        # profile_ids returned by fetch_profile, reused by the other endpoints
+        self.profile_ids = deque(maxlen=1000)
+
+    async def fetch_profile(self, client: httpx.AsyncClient) -> int:
+        username = self.generator.username(self.rng.randrange(self.corpus_size))
+        response = await client.post("/api/fetch-profile",
+                                     json={"linkedin_url": f"https://www.linkedin.com/in/{username}/"})
+        if response.status_code == 200:
+            self.profile_ids.append(response.json()["profile_id"])
+        return response.status_code
+
+    async def upload_resume(self, client: httpx.AsyncClient) -> int:
+        filename, content, content_type = self.rng.choice(self.resumes)
+        response = await client.post(
+            "/api/upload-resume",
+            data={"profile_id": self.rng.choice(self.profile_ids)},
+            files={"file": (filename, content, content_type)},
+        )
+        return response.status_code
+
+    async def get_profile(self, client: httpx.AsyncClient) -> int:
+        response = await client.get(f"/api/profiles/{self.rng.choice(self.profile_ids)}")
+        return response.status_code
+
+    def resolve(self, endpoint: str) -> str:
+        # Until a profile has been stored there is nothing to upload against or read back
+        return endpoint if endpoint == "fetch_profile" or self.profile_ids else "fetch_profile"
+
+
+def build_resumes(generator: CorpusGenerator, count: int = 20) -> List[tuple]:
+    resumes = []
+    for index in range(count):
+        if index % 2:
+            resumes.append((f"resume-{index}.pdf", generator.resume_pdf(index), "application/pdf"))
+        else:
+            resumes.append((f"resume-{index}.txt", generator.resume_text(index).encode(), "text/plain"))
+    return resumes
+
+
+async def run_load(client: httpx.AsyncClient, mix: Dict[str, float], rate: float, concurrency: int,
+                   duration: float, corpus_size: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    generator = CorpusGenerator(seed)
+    workload = Workload(rng, generator, corpus_size, build_resumes(generator))
+    recorder = Recorder()
+    endpoints, weights = list(mix), list(mix.values())
+    slots = asyncio.Semaphore(concurrency)
+    monitor = LoopLagMonitor()
+    loop = asyncio.get_running_loop()
+
+    async def one_request(scheduled: float):
+        endpoint = rng.choices(endpoints, weights)[0]
+        if slots.locked():
+            recorder.queued += 1
+        async with slots:
+            endpoint = workload.resolve(endpoint)
+            try:
+                status = await getattr(workload, endpoint)(client)
+            except Exception as e:
+                status = type(e).__name__
+        recorder.record(endpoint, status, loop.time() - scheduled)
+
+    monitor.start()
+    started = loop.time()
+    deadline = started + duration
+    if rate > 0:
+        tasks = set()
+        scheduled = started
+        while True:
+            scheduled += rng.expovariate(rate)
+            if scheduled >= deadline:
+                break
+            await asyncio.sleep(max(0.0, scheduled - loop.time()))
+            task = asyncio.create_task(one_request(scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    else:
+        async def worker():
+            while loop.time() < deadline:
+                await one_request(loop.time())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = loop.time() - started
+    loop_lag = await monitor.stop()
+
+    return {
+        "benchmark": "load_test",
+        "config": {"mix": mix, "rate": rate, "concurrency": concurrency, "duration": duration,
+                   "corpus_size": corpus_size, "seed": seed},
+        "elapsed_seconds": round(elapsed, 3),
+        **recorder.summary(elapsed),
+        "event_loop_lag": loop_lag,
+    }
+
+
+@asynccontextmanager
+async def in_process_client(seed: int, corpus_size: int, api_config, use_mongo: bool):
+    """Client for server.app with its lifespan running against local stand-ins"""
+    import server
+    from perf.memory_store import use_memory_store
+
+    if not use_mongo:
+        use_memory_store(server)
+    await server.linkedin_client.close()
+    server.linkedin_client.transport = httpx.ASGITransport(app=create_app(seed, corpus_size, api_config))
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            yield client
+
+
+@asynccontextmanager
+async def http_client(url: str, concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        yield client
+
+
+def parse_mix(values: Optional[List[str]]) -> Dict[str, float]:
+    if not values:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for value in values:
+        endpoint, _, weight = value.partition("=")
+        if endpoint not in DEFAULT_MIX:
+            raise ValueError(f"Unknown endpoint {endpoint!r}, expected one of {list(DEFAULT_MIX)}")
+        mix[endpoint] = float(weight or 1)
+    return mix
+
+
+async def main_async(args) -> dict:
+    mix = parse_mix(args.mix)
+    if args.url:
+        context = http_client(args.url, args.concurrency)
+    else:
+        context = in_process_client(args.seed, args.corpus_size, config_from_arguments(args, "api-"), args.mongo)
+    async with context as client:
+        report = await run_load(client, mix, args.rate, args.concurrency, args.duration, args.corpus_size, args.seed)
+    report["target"] = args.url or "in-process"
+    if not args.url:
+        report["fake_api"] = config_from_arguments(args, "api-").as_dict()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server; in-process when omitted")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--rate", type=float, default=50, help="Arrivals per second; 0 for a closed loop")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", nargs="+", help="endpoint=weight for fetch_profile, upload_resume, get_profile")
+    parser.add_argument("--corpus-size", type=int, default=10_000, help="Distinct profiles requested")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mongo", action="store_true", help="In-process, use MONGO_URL instead of the memory store")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    # In-process only: latency and faults of the fake LinkedIn API (see perf.fake_linkedin_api)
+    add_config_arguments(parser, prefix="api-")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(main_async(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
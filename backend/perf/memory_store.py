@@ -0,0 +1,171 @@
+"""
+In-memory stand-in for the motor collections the API uses.
+
+Supports the subset of the collection API the server calls (find_one with
+projection and sort, insert_one, insert_many, update_one with $set and
+upsert, create_index(es)) so load tests can run without a MongoDB. Single
+field equality lookups on indexed fields use a hash index, like Mongo's
+IXSCAN, so lookups stay O(1) as the store grows. The Redis stand-in is
+memory_redis.MemoryRedis.
+"""
+import copy
+import itertools
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+def _get(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _project(doc: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return copy.deepcopy(doc)
+    result = {}
+    for path, include in projection.items():
+        if not include or path == "_id":
+            continue
+        source, target = doc, result
+        parts = path.split(".")
+        for part in parts[:-1]:
+            if not isinstance(source, dict) or part not in source:
+                break
+            source = source[part]
+            target = target.setdefault(part, {})
+        else:
+            if isinstance(source, dict) and parts[-1] in source:
+                target[parts[-1]] = copy.deepcopy(source[parts[-1]])
+    if projection.get("_id", 1) and "_id" in doc:
+        result["_id"] = doc["_id"]
+    return result
+
+
+class MemoryCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self._docs: Dict[Any, dict] = {}
+        self._order = itertools.count()
+        # field -> value -> {_id: doc}; _id is always indexed
+        self._indexes: Dict[str, Dict[Any, Dict[Any, dict]]] = {"_id": {}}
+        self._unique = {"_id"}
+
+    def __len__(self):
+        return len(self._docs)
+
+    async def create_index(self, keys, unique: bool = False, **kwargs) -> str:
+        field = keys if isinstance(keys, str) else keys[0][0]
+        if field not in self._indexes:
+            self._indexes[field] = {}
+            for doc in self._docs.values():
+                self._indexes[field].setdefault(_get(doc, field), {})[doc["_id"]] = doc
+        if unique:
+            self._unique.add(field)
+        return kwargs.get("name", field)
+
+    async def create_indexes(self, indexes: List[IndexModel]) -> List[str]:
+        names = []
+        for index in indexes:
+            document = index.document
+            names.append(await self.create_index(list(document["key"].items()), **{
+                key: value for key, value in document.items() if key != "key"
+            }))
+        return names
+
+    def _insert(self, doc: dict):
+        doc.setdefault("_id", ObjectId())
+        for field in self._unique:
+            if self._indexes[field].get(_get(doc, field)):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {field}")
+        stored = copy.deepcopy(doc)
+        stored["__order"] = next(self._order)
+        self._docs[stored["_id"]] = stored
+        for field, index in self._indexes.items():
+            index.setdefault(_get(stored, field), {})[stored["_id"]] = stored
+
+    def _candidates(self, filter: dict):
+        for field, value in filter.items():
+            if field in self._indexes and not isinstance(value, dict):
+                return list(self._indexes[field].get(value, {}).values())
+        return list(self._docs.values())
+
+    async def insert_one(self, doc: dict):
+        self._insert(doc)
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True):
+        errors = []
+        for position, doc in enumerate(docs):
+            try:
+                self._insert(doc)
+            except DuplicateKeyError as e:
+                errors.append({"index": position, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None):
+        filter = filter or {}
+        matches = [doc for doc in self._candidates(filter)
+                   if all(_get(doc, field) == value for field, value in filter.items())]
+        if not matches:
+            return None
+        matches.sort(key=lambda doc: doc["__order"])
+        for field, direction in reversed(sort or []):
+            matches.sort(key=lambda doc: (_get(doc, field) is not None, _get(doc, field) or 0),
+                         reverse=direction < 0)
+        result = _project(matches[0], projection)
+        result.pop("__order", None)
+        return result
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False):
+        matches = [doc for doc in self._candidates(filter)
+                   if all(_get(doc, field) == value for field, value in filter.items())]
+        if not matches:
+            if upsert:
+                self._insert({**filter, **update.get("$set", {})})
+            return
+        doc = matches[0]
+        for field, index in self._indexes.items():
+            index.get(_get(doc, field), {}).pop(doc["_id"], None)
+        doc.update(copy.deepcopy(update.get("$set", {})))
+        for field, index in self._indexes.items():
+            index.setdefault(_get(doc, field), {})[doc["_id"]] = doc
+
+
+class MemoryDatabase:
+    """Collections are created on first access, like a Mongo database"""
+
+    def __init__(self):
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+def use_memory_store(server_module) -> MemoryDatabase:
+    """Point every collection the server holds at a fresh in-memory database"""
+    db = MemoryDatabase()
+    server_module.db = db
+    server_module.profile_writes.collection = db.profile_analyses
+    if server_module.profile_cache.collection is not None:
+        server_module.profile_cache.collection = db.profile_cache
+    if server_module.resume_cache.texts.collection is not None:
+        server_module.resume_cache.texts.collection = db.resume_texts
+    if server_module.resume_cache.results.collection is not None:
+        server_module.resume_cache.results.collection = db.resume_optimizations
+    return db
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# True while a loader runs as a background refresh rather than for a waiting request
+in_background_refresh: ContextVar[bool] = ContextVar("in_background_refresh", default=False)
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after max_age seconds"""
+
+    def __init__(self, maxsize: int, max_age: float, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.clock = clock
+        self._entries: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_entry(self, key) -> Optional[Tuple[Any, float]]:
+        """Return (value, stored_at) for a live entry, marking it most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.clock() - entry[1] >= self.max_age:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else default
+
+    def set(self, key, value, stored_at: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (value, self.clock() if stored_at is None else stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ProfileCache:
+    """
+    Tiered cache for mapped LinkedIn profile data keyed by canonical username.
+
+    Entries younger than ttl are fresh. Entries between ttl and ttl + stale_ttl
+    are served immediately while a background task refreshes them. The Mongo
+    tier is optional and relies on a TTL index to drop entries past stale_ttl.
+    The optional shared tier (a RedisCache) sits between memory and Mongo, and
+    its lock makes only one worker load a given profile at a time.
+    """
+
+    def __init__(self, collection=None, maxsize: int = 1024, ttl: float = 3600,
+                 stale_ttl: float = 86400, clock: Callable[[], float] = time.time, shared=None):
+        self.collection = collection
+        self.shared = shared
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.memory = TTLCache(maxsize, ttl + stale_ttl, clock)
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "mongo_hits": 0, "refreshes": 0, "refresh_errors": 0}
+        if shared is not None:
+            self.stats["shared_hits"] = 0
+        self._refreshing = {}
+
+    async def ensure_indexes(self):
+        if self.collection is None:
+            return
+        await self.collection.create_index(
+            "fetched_at",
+            expireAfterSeconds=int(self.ttl + self.stale_ttl),
+            name="fetched_at_ttl"
+        )
+
+    async def _get_from_mongo(self, key) -> Optional[Tuple[Any, float]]:
+        if self.collection is None:
+            return None
+        try:
+            doc = await self.collection.find_one({"_id": key}, {"profile_data": 1, "fetched_at": 1})
+        except Exception as e:
+            logger.warning(f"Profile cache read failed for {key}: {str(e)}")
+            return None
+        if not doc:
+            return None
+
+        fetched_at = doc["fetched_at"]
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        return doc["profile_data"], fetched_at.timestamp()
+
+    async def _get_from_shared(self, key) -> Optional[Tuple[Any, float]]:
+        if self.shared is None:
+            return None
+        entry = await self.shared.get(f"profile:{key}")
+        return (entry["profile_data"], entry["fetched_at"]) if entry is not None else None
+
+    async def get(self, key) -> Tuple[Optional[Any], Optional[str]]:
+        """Look up a profile, returning (profile_data, "fresh" | "stale") or (None, None)"""
+        entry = self.memory.get_entry(key)
+        if entry is None:
+            entry = await self._get_from_shared(key)
+            if entry is not None:
+                self.stats["shared_hits"] += 1
+                self.memory.set(key, entry[0], entry[1])
+        if entry is None:
+            entry = await self._get_from_mongo(key)
+            if entry is not None:
+                self.stats["mongo_hits"] += 1
+                self.memory.set(key, entry[0], entry[1])
+
+        if entry is not None:
+            age = self.clock() - entry[1]
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                return entry[0], "fresh"
+            if age < self.ttl + self.stale_ttl:
+                self.stats["stale"] += 1
+                return entry[0], "stale"
+
+        self.stats["misses"] += 1
+        return None, None
+
+    async def set(self, key, profile_data):
+        fetched_at = self.clock()
+        self.memory.set(key, profile_data, fetched_at)
+        if self.shared is not None:
+            await self.shared.set(f"profile:{key}", {"profile_data": profile_data, "fetched_at": fetched_at},
+                                  self.ttl + self.stale_ttl)
+        if self.collection is None:
+            return
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {
+                    "profile_data": profile_data,
+                    "fetched_at": datetime.fromtimestamp(fetched_at, timezone.utc)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Profile cache write failed for {key}: {str(e)}")
+
+    async def get_or_load(self, key, loader: Callable[[], Awaitable[Tuple[Any, bool]]]):
+        """
+        Serve key from the cache or load it.
+
+        The loader returns (profile_data, cacheable). Uncacheable results, such
+        as mock fallbacks, are returned without being stored.
+        """
+        profile_data, state = await self.get(key)
+        if state == "fresh":
+            return profile_data
+        if state == "stale":
+            self.refresh_in_background(key, loader)
+            return profile_data
+
+        profile_data, _ = await self._load(key, loader)
+        return profile_data
+
+    async def _load(self, key, loader):
+        """Run the loader and store a cacheable result; returns (profile_data, stored)"""
+        if self.shared is None or not self.shared.available:
+            return await self._load_here(key, loader)
+        async with self.shared.single_flight(f"profile:{key}"):
+            # Another worker may have loaded it while this one waited for the lock
+            entry = await self._get_from_shared(key)
+            if entry is not None and self.clock() - entry[1] < self.ttl:
+                self.stats["shared_hits"] += 1
+                self.memory.set(key, entry[0], entry[1])
+                return entry[0], False
+            return await self._load_here(key, loader)
+
+    async def _load_here(self, key, loader):
+        profile_data, cacheable = await loader()
+        if cacheable:
+            await self.set(key, profile_data)
+        return profile_data, cacheable
+
+    def refresh_in_background(self, key, loader):
+        if key in self._refreshing:
+            return
+        self._refreshing[key] = asyncio.create_task(self._refresh(key, loader))
+
+    async def _refresh(self, key, loader):
+        in_background_refresh.set(True)
+        try:
+            _, stored = await self._load(key, loader)
+            if stored:
+                self.stats["refreshes"] += 1
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            logger.warning(f"Background refresh failed for {key}: {str(e)}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "size": len(self.memory), "refreshing": len(self._refreshing)}
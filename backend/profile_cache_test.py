@@ -0,0 +1,98 @@
+import asyncio
+
+from profile_cache import ProfileCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, max_age=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, max_age=60, clock=clock)
+    cache.set("a", 1)
+    clock.now += 61
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_profile_cache_miss_then_hit():
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return {"headline": "Engineer"}, True
+
+    cache = ProfileCache(maxsize=10, ttl=60, stale_ttl=600, clock=FakeClock())
+
+    async def run():
+        first = await cache.get_or_load("jane", loader)
+        second = await cache.get_or_load("jane", loader)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == {"headline": "Engineer"}
+    assert len(calls) == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] == 1
+
+def test_profile_cache_serves_stale_and_refreshes_in_background():
+    clock = FakeClock()
+    versions = iter([{"headline": "v1"}, {"headline": "v2"}])
+
+    async def loader():
+        return next(versions), True
+
+    cache = ProfileCache(maxsize=10, ttl=60, stale_ttl=600, clock=clock)
+
+    async def run():
+        await cache.get_or_load("jane", loader)
+        clock.now += 120
+        stale = await cache.get_or_load("jane", loader)
+        await asyncio.gather(*cache._refreshing.values())
+        refreshed = await cache.get_or_load("jane", loader)
+        return stale, refreshed
+
+    stale, refreshed = asyncio.run(run())
+    assert stale == {"headline": "v1"}
+    assert refreshed == {"headline": "v2"}
+    assert cache.stats["stale"] == 1
+    assert cache.stats["refreshes"] == 1
+
+def test_profile_cache_does_not_store_fallback_data():
+    async def loader():
+        return {"headline": "mock"}, False
+
+    cache = ProfileCache(maxsize=10, ttl=60, stale_ttl=600)
+
+    async def run():
+        await cache.get_or_load("jane", loader)
+        await cache.get_or_load("jane", loader)
+
+    asyncio.run(run())
+    assert cache.stats["misses"] == 2
+    assert len(cache.memory) == 0
+
+def test_profile_cache_expires_after_stale_window():
+    clock = FakeClock()
+    cache = ProfileCache(maxsize=10, ttl=60, stale_ttl=600, clock=clock)
+
+    async def run():
+        await cache.set("jane", {"headline": "v1"})
+        clock.now += 700
+        return await cache.get("jane")
+
+    assert asyncio.run(run()) == (None, None)
@@ -0,0 +1,295 @@
+"""
+Outbound rate limiting for a quota-limited upstream API.
+
+Each quota window (e.g. 5 calls per second, 10000 per month) is a token
+bucket. A call takes one token from every bucket or waits; waiting calls
+queue by priority, so interactive requests go ahead of batch analyses and
+background cache refreshes, and give up after max_wait. A priority can be a
+callable, read again each time a token is handed out, for calls whose
+urgency can rise while they wait (a fetch an interactive request joined). The quota the API
+reports in its x-ratelimit-requests-* headers (and Retry-After on 429s) is
+tracked too, so calls pause once the plan's remaining quota is used up.
+
+Bucket state lives in a store: MemoryBucketStore for a single process (and
+tests) or RedisBucketStore to share the limits between uvicorn workers.
+The priority queue itself is per process.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BATCH = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", BACKGROUND: "background"}
+
+# Priority of outbound calls made by the current request or task
+request_priority: ContextVar[int] = ContextVar("outbound_request_priority", default=INTERACTIVE)
+
+# A priority, or a callable returning the current one
+Priority = Union[int, Callable[[], int]]
+
+
+def current_priority(priority: Priority) -> int:
+    return priority() if callable(priority) else priority
+
+
+class RateLimitTimeout(Exception):
+    """No outbound quota became available within the maximum queue wait"""
+
+
+def parse_windows(spec: str) -> List[Tuple[int, float]]:
+    """Parse "limit/seconds,..." (e.g. "5/1,10000/2592000") into (limit, seconds) windows"""
+    windows = []
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        limit, _, seconds = part.partition("/")
+        windows.append((int(limit), float(seconds or 1)))
+    return windows
+
+
+class MemoryBucketStore:
+    """In-process bucket state, for a single worker and for tests"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._buckets: Dict[str, List[Tuple[float, float]]] = {}
+        self._quotas: Dict[str, Tuple[int, float]] = {}
+
+    async def acquire(self, key: str, windows: Sequence[Tuple[int, float]]) -> float:
+        """Take a token from every window and return 0, or return the seconds until one is available"""
+        now = self.clock()
+        previous = self._buckets.get(key) or [(limit, now) for limit, _ in windows]
+        tokens = [min(limit, available + max(0.0, now - updated) * limit / seconds)
+                  for (limit, seconds), (available, updated) in zip(windows, previous)]
+        wait = max([(1 - available) * seconds / limit
+                    for (limit, seconds), available in zip(windows, tokens) if available < 1], default=0.0)
+
+        remaining, reset_at = self._quotas.get(key, (-1, 0.0))
+        if reset_at <= now:
+            remaining = -1
+        if remaining == 0:
+            wait = max(wait, reset_at - now)
+        if wait == 0:
+            tokens = [available - 1 for available in tokens]
+            if remaining > 0:
+                self._quotas[key] = (remaining - 1, reset_at)
+        self._buckets[key] = [(available, now) for available in tokens]
+        return wait
+
+    async def update_quota(self, key: str, remaining: int, reset_seconds: float):
+        """Record the quota the API reported: remaining calls until reset_seconds from now"""
+        self._quotas[key] = (remaining, self.clock() + reset_seconds)
+
+
+# KEYS[1] bucket hash, KEYS[2] reported quota hash
+# ARGV[1] number of windows, then limit and seconds of each window
+ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local count = tonumber(ARGV[1])
+local tokens = {}
+local wait = 0
+local longest = 1
+for i = 1, count do
+  local limit = tonumber(ARGV[2 * i])
+  local seconds = tonumber(ARGV[2 * i + 1])
+  local available = tonumber(redis.call('HGET', KEYS[1], 'tokens:' .. i) or limit)
+  local updated = tonumber(redis.call('HGET', KEYS[1], 'updated:' .. i) or now)
+  available = math.min(limit, available + math.max(0, now - updated) * limit / seconds)
+  if available < 1 then
+    wait = math.max(wait, (1 - available) * seconds / limit)
+  end
+  tokens[i] = available
+  longest = math.max(longest, seconds)
+end
+local remaining = tonumber(redis.call('HGET', KEYS[2], 'remaining') or -1)
+local reset_at = tonumber(redis.call('HGET', KEYS[2], 'reset_at') or 0)
+if reset_at <= now then
+  remaining = -1
+end
+if remaining == 0 then
+  wait = math.max(wait, reset_at - now)
+end
+if wait == 0 then
+  for i = 1, count do
+    tokens[i] = tokens[i] - 1
+  end
+  if remaining > 0 then
+    redis.call('HSET', KEYS[2], 'remaining', remaining - 1)
+  end
+end
+for i = 1, count do
+  redis.call('HSET', KEYS[1], 'tokens:' .. i, tostring(tokens[i]), 'updated:' .. i, tostring(now))
+end
+if count > 0 then
+  redis.call('EXPIRE', KEYS[1], math.ceil(longest * 2))
+end
+return tostring(wait)
+"""
+
+UPDATE_QUOTA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+redis.call('HSET', KEYS[1], 'remaining', ARGV[1], 'reset_at', tostring(now + tonumber(ARGV[2])))
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])) + 1)
+"""
+
+
+class RedisBucketStore:
+    """Bucket state in Redis, updated atomically by Lua scripts using the Redis clock"""
+
+    def __init__(self, redis, prefix: str = "linkedin_analyzer:ratelimit"):
+        self.redis = redis
+        self.prefix = prefix
+        self._acquire = redis.register_script(ACQUIRE_SCRIPT)
+        self._update_quota = redis.register_script(UPDATE_QUOTA_SCRIPT)
+
+    async def acquire(self, key: str, windows: Sequence[Tuple[int, float]]) -> float:
+        args = [len(windows)] + [value for window in windows for value in window]
+        wait = await self._acquire(keys=[f"{self.prefix}:{key}:buckets", f"{self.prefix}:{key}:quota"], args=args)
+        return float(wait)
+
+    async def update_quota(self, key: str, remaining: int, reset_seconds: float):
+        await self._update_quota(keys=[f"{self.prefix}:{key}:quota"], args=[remaining, reset_seconds])
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter with a per-process priority queue of waiting calls.
+
+    When the shared store fails, the limiter logs it and carries on with
+    per-process buckets, so an unreachable Redis never blocks API calls.
+    """
+
+    def __init__(self, name: str, windows: Sequence[Tuple[int, float]] = (), store=None, max_wait: float = 5.0,
+                 enabled: bool = True, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.windows = list(windows)
+        self.local_store = MemoryBucketStore()
+        self.store = store or self.local_store
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self.clock = clock
+        # (sequence, deadline, future, priority), served lowest current priority first
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.reported_quota: Dict[str, object] = {}
+        self.stats = {"calls": 0, "waited": 0, "timed_out": 0, "store_errors": 0,
+                      **{f"{label}_calls": 0 for label in PRIORITY_NAMES.values()}}
+
+    async def _try_acquire(self) -> float:
+        try:
+            return await self.store.acquire(self.name, self.windows)
+        except Exception as e:
+            if self.store is self.local_store:
+                raise
+            self.stats["store_errors"] += 1
+            logger.warning(f"Rate limit store unavailable, using per-process limits: {str(e)}")
+            return await self.local_store.acquire(self.name, self.windows)
+
+    async def acquire(self, priority: Priority = INTERACTIVE):
+        """Wait for a call slot; raises RateLimitTimeout if none is free within max_wait"""
+        if not self.enabled:
+            return
+        self.stats["calls"] += 1
+        self.stats[f"{PRIORITY_NAMES[current_priority(priority)]}_calls"] += 1
+        if not self._waiters:
+            wait = await self._try_acquire()
+            if wait == 0:
+                return
+            if wait > self.max_wait:
+                self.stats["timed_out"] += 1
+                raise RateLimitTimeout(f"{self.name} quota is exhausted for another {wait:.1f}s")
+
+        self.stats["waited"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((next(self._sequence), self.clock() + self.max_wait, future, priority))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise RateLimitTimeout(f"No {self.name} quota within {self.max_wait:g}s") from None
+        except RateLimitTimeout:
+            self.stats["timed_out"] += 1
+            raise
+
+    def _drop_finished(self):
+        self._waiters = [waiter for waiter in self._waiters if not waiter[2].done()]
+
+    def _pop_next(self) -> tuple:
+        # Priorities can change while calls wait, so pick by the current ones; the queue stays short
+        waiter = min(self._waiters, key=lambda waiter: (current_priority(waiter[3]), waiter[0]))
+        self._waiters.remove(waiter)
+        return waiter
+
+    async def _dispatch(self):
+        """Hand out tokens to queued calls in priority order until the queue is empty"""
+        while True:
+            self._drop_finished()
+            if not self._waiters:
+                return
+            try:
+                wait = await self._try_acquire()
+            except Exception as e:
+                for _, _, future, _ in self._waiters:
+                    if not future.done():
+                        future.set_exception(e)
+                self._waiters.clear()
+                return
+
+            if wait == 0:
+                self._drop_finished()
+                if self._waiters:
+                    self._pop_next()[2].set_result(None)
+                continue
+            # Calls whose deadline comes before the next token fail now rather than later
+            next_token = self.clock() + wait
+            for _, deadline, future, _ in self._waiters:
+                if deadline < next_token and not future.done():
+                    future.set_exception(RateLimitTimeout(f"No {self.name} quota for another {wait:.1f}s"))
+            await asyncio.sleep(wait)
+
+    async def observe_response(self, status_code: int, headers):
+        """Track the remaining quota from x-ratelimit-requests-* headers and Retry-After on 429s"""
+        if not self.enabled:
+            return
+        remaining = headers.get("x-ratelimit-requests-remaining")
+        reset = headers.get("x-ratelimit-requests-reset")
+        retry_after = headers.get("retry-after")
+        try:
+            if status_code == 429:
+                update = (0, float(retry_after or reset or 1))
+            elif remaining is not None and reset is not None:
+                update = (int(remaining), float(reset))
+            else:
+                return
+        except ValueError:
+            logger.warning(f"Unparseable rate limit headers from {self.name}: {dict(headers)}")
+            return
+        self.reported_quota = {"remaining": update[0], "reset_seconds": update[1],
+                               "limit": headers.get("x-ratelimit-requests-limit"), "at": time.time()}
+        try:
+            await self.store.update_quota(self.name, *update)
+        except Exception as e:
+            self.stats["store_errors"] += 1
+            logger.warning(f"Rate limit store unavailable, keeping reported quota locally: {str(e)}")
+            await self.local_store.update_quota(self.name, *update)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "store": type(self.store).__name__,
+            "windows": [f"{limit}/{seconds:g}s" for limit, seconds in self.windows],
+            "max_wait_seconds": self.max_wait,
+            "queued": sum(not waiter[2].done() for waiter in self._waiters),
+            "reported_quota": self.reported_quota,
+        }
@@ -0,0 +1,197 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from rate_limiter import (BACKGROUND, BATCH, INTERACTIVE, MemoryBucketStore, RateLimiter, RateLimitTimeout,
+                          RedisBucketStore, parse_windows)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_windows():
+    assert parse_windows("5/1, 10000/2592000") == [(5, 1.0), (10000, 2592000.0)]
+    assert parse_windows("") == []
+
+def test_memory_store_refills_each_window():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock)
+    windows = [(2, 1), (3, 60)]
+
+    async def run():
+        waits = [await store.acquire("api", windows) for _ in range(3)]
+        clock.now += 0.5
+        waits.append(await store.acquire("api", windows))
+        waits.append(await store.acquire("api", windows))
+        return waits
+
+    waits = asyncio.run(run())
+    assert waits[:2] == [0, 0] and waits[2] == pytest.approx(0.5)
+    # The per-second window has refilled, the per-minute one is spent until a token drips back
+    assert waits[3] == 0
+    assert waits[4] == pytest.approx(19.5)
+
+def test_memory_store_honours_reported_quota():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock)
+
+    async def run():
+        await store.update_quota("api", 1, 30)
+        waits = [await store.acquire("api", []) for _ in range(2)]
+        clock.now += 31
+        waits.append(await store.acquire("api", []))
+        return waits
+
+    assert asyncio.run(run()) == [0, 30, 0]
+
+def test_waiting_calls_go_out_in_priority_order():
+    limiter = RateLimiter("api", windows=[(1, 0.05)], max_wait=2)
+    order = []
+
+    async def call(priority):
+        await limiter.acquire(priority)
+        order.append(priority)
+
+    async def run():
+        await limiter.acquire(INTERACTIVE)
+        await asyncio.gather(call(BACKGROUND), call(BATCH), call(INTERACTIVE))
+
+    asyncio.run(run())
+    assert order == [INTERACTIVE, BATCH, BACKGROUND]
+    assert limiter.get_stats()["waited"] == 3
+
+def test_calls_give_up_after_max_wait():
+    limiter = RateLimiter("api", windows=[(1, 100)], max_wait=0.05)
+
+    async def run():
+        await limiter.acquire()
+        with pytest.raises(RateLimitTimeout):
+            await limiter.acquire()
+
+    asyncio.run(run())
+    assert limiter.get_stats()["timed_out"] == 1
+
+def test_retry_after_pauses_calls():
+    limiter = RateLimiter("api", max_wait=1)
+
+    async def run():
+        await limiter.observe_response(429, httpx.Headers({"retry-after": "30"}))
+        with pytest.raises(RateLimitTimeout):
+            await limiter.acquire()
+
+    asyncio.run(run())
+    assert limiter.get_stats()["reported_quota"]["remaining"] == 0
+
+def test_store_failures_fall_back_to_local_limits():
+    class BrokenStore:
+        async def acquire(self, key, windows):
+            raise ConnectionError("redis is down")
+
+        async def update_quota(self, key, remaining, reset_seconds):
+            raise ConnectionError("redis is down")
+
+    limiter = RateLimiter("api", windows=[(5, 1)], store=BrokenStore())
+
+    async def run():
+        await limiter.acquire()
+        await limiter.observe_response(200, {"x-ratelimit-requests-remaining": "3",
+                                             "x-ratelimit-requests-reset": "60"})
+
+    asyncio.run(run())
+    assert limiter.get_stats()["store_errors"] == 2
+
+def test_quota_headers_from_the_api_pause_profile_fetches(monkeypatch):
+    import server
+    from perf.fake_linkedin_api import StubConfig, create_app
+
+    limiter = RateLimiter("linkedin_api", max_wait=0.1)
+    monkeypatch.setattr(server.linkedin_client, "transport",
+                        httpx.ASGITransport(app=create_app(config=StubConfig(quota=2))))
+    monkeypatch.setattr(server.linkedin_client, "_client", None)
+    monkeypatch.setattr(server.linkedin_client, "rate_limiter", limiter)
+    monkeypatch.setattr(server.linkedin_client, "breaker", None)
+    before = REGISTRY.get_sample_value("linkedin_analyzer_profile_fallbacks_total", {"reason": "rate_limited"}) or 0
+
+    async def run():
+        results = [await server.load_linkedin_profile(f"user{i}") for i in range(3)]
+        await server.linkedin_client.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [cacheable for _, cacheable in results] == [True, True, False]
+    assert limiter.get_stats()["reported_quota"]["remaining"] == 0
+    assert REGISTRY.get_sample_value("linkedin_analyzer_profile_fallbacks_total",
+                                     {"reason": "rate_limited"}) == before + 1
+
+def test_limiters_sharing_a_store_share_buckets_and_reported_quota():
+    from memory_redis import MemoryRedis
+
+    clock = FakeClock()
+    redis = MemoryRedis(clock)
+    first = RateLimiter("api", windows=[(2, 60)], store=RedisBucketStore(redis), max_wait=0)
+    second = RateLimiter("api", windows=[(2, 60)], store=RedisBucketStore(redis), max_wait=0)
+
+    async def run():
+        await first.acquire()
+        await second.acquire()
+        with pytest.raises(RateLimitTimeout):
+            await first.acquire()
+        clock.now += 30
+        await second.acquire()
+        clock.now += 30
+        await second.observe_response(429, httpx.Headers({"retry-after": "5"}))
+        with pytest.raises(RateLimitTimeout):
+            await first.acquire()
+        clock.now += 5
+        await first.acquire()
+
+    asyncio.run(run())
+    assert first.get_stats()["store_errors"] == second.get_stats()["store_errors"] == 0
+    assert first.get_stats()["timed_out"] == 2
+
+@pytest.mark.skipif(not os.environ.get("REDIS_URL"), reason="needs a Redis server (REDIS_URL)")
+def test_redis_store_shares_buckets():
+    from redis.asyncio import from_url
+
+    async def run():
+        redis = from_url(os.environ["REDIS_URL"])
+        await redis.delete("test:ratelimit:api:buckets", "test:ratelimit:api:quota")
+        first, second = RedisBucketStore(redis, "test:ratelimit"), RedisBucketStore(redis, "test:ratelimit")
+        waits = [await first.acquire("api", [(2, 60)]), await second.acquire("api", [(2, 60)]),
+                 await first.acquire("api", [(2, 60)])]
+        await second.update_quota("api", 0, 5)
+        await redis.delete("test:ratelimit:api:buckets")
+        waits.append(await first.acquire("api", [(2, 60)]))
+        await redis.aclose()
+        return waits
+
+    waits = asyncio.run(run())
+    assert waits[:2] == [0, 0] and waits[2] > 0 and 0 < waits[3] <= 5
+
+def test_callable_priorities_are_read_when_tokens_are_handed_out():
+    limiter = RateLimiter("api", windows=[(1, 0.05)], max_wait=2)
+    raised = {"priority": BACKGROUND}
+    order = []
+
+    async def call(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    async def run():
+        await limiter.acquire(INTERACTIVE)
+        calls = asyncio.gather(call("batch", BATCH), call("raised", lambda: raised["priority"]))
+        await asyncio.sleep(0.01)
+        raised["priority"] = INTERACTIVE
+        await calls
+
+    asyncio.run(run())
+    assert order == ["raised", "batch"]
+    assert limiter.get_stats()["background_calls"] == 1
@@ -0,0 +1,159 @@
+"""
+Optional Redis tier shared by every worker and replica.
+
+Values are serialised with orjson and zlib-compressed above
+compress_min_bytes, behind a one-byte format marker. Any Redis error turns
+the tier off for retry_interval seconds, during which reads miss, writes
+are skipped and locks are not taken, so the API keeps working (uncached)
+while Redis is unavailable.
+"""
+import asyncio
+import logging
+import time
+import uuid
+import zlib
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+RAW = b"j"
+COMPRESSED = b"z"
+
+# Delete the lock only if this holder still owns it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def dumps(value: Any, compress_min_bytes: int = 1024) -> bytes:
+    data = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    if len(data) >= compress_min_bytes:
+        return COMPRESSED + zlib.compress(data, 1)
+    return RAW + data
+
+
+def loads(data: bytes) -> Any:
+    marker, payload = data[:1], data[1:]
+    if marker == COMPRESSED:
+        payload = zlib.decompress(payload)
+    elif marker != RAW:
+        raise ValueError(f"Unknown cache value format {marker!r}")
+    return orjson.loads(payload)
+
+
+class RedisCache:
+    """Shared key-value tier with per-key TTLs and a cross-worker lock; a no-op without a Redis client"""
+
+    def __init__(self, redis=None, prefix: str = "linkedin_analyzer:cache", enabled: bool = True,
+                 compress_min_bytes: int = 1024, retry_interval: float = 30.0, lock_ttl: float = 30.0,
+                 lock_wait: float = 10.0, clock: Callable[[], float] = time.monotonic):
+        self.redis = redis
+        self.prefix = prefix
+        self.enabled = enabled and redis is not None
+        self.compress_min_bytes = compress_min_bytes
+        self.retry_interval = retry_interval
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        self.clock = clock
+        self._down_until = 0.0
+        self._release_lock = redis.register_script(RELEASE_LOCK_SCRIPT) if redis is not None else None
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "bytes_written": 0, "errors": 0,
+                      "lock_waits": 0, "lock_timeouts": 0}
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and self.clock() >= self._down_until
+
+    def _failed(self, operation: str, error: Exception):
+        self.stats["errors"] += 1
+        if self.clock() >= self._down_until:
+            logger.warning(f"Redis cache {operation} failed, bypassing it for {self.retry_interval:g}s: {str(error)}")
+        self._down_until = self.clock() + self.retry_interval
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        if not self.available:
+            return None
+        try:
+            data = await self.redis.get(self._key(key))
+        except Exception as e:
+            self._failed("read", e)
+            return None
+        if data is None:
+            self.stats["misses"] += 1
+            return None
+        try:
+            value = loads(data)
+        except ValueError as e:
+            logger.warning(f"Dropping undecodable Redis cache entry {key}: {str(e)}")
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        if not self.available or ttl <= 0:
+            return
+        data = dumps(value, self.compress_min_bytes)
+        try:
+            await self.redis.set(self._key(key), data, px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            self._failed("write", e)
+            return
+        self.stats["sets"] += 1
+        self.stats["bytes_written"] += len(data)
+
+    async def delete(self, key: str):
+        if not self.available:
+            return
+        try:
+            await self.redis.delete(self._key(key))
+        except Exception as e:
+            self._failed("delete", e)
+
+    @asynccontextmanager
+    async def single_flight(self, key: str):
+        """
+        Hold a cross-worker lock on key while computing its value, waiting up
+        to lock_wait while another worker holds it. Yields whether the lock is
+        held; callers should check the cache again once inside.
+        """
+        lock_key, token = self._key(f"lock:{key}"), uuid.uuid4().hex
+        acquired = False
+        deadline = self.clock() + self.lock_wait
+        delay = 0.01
+        while self.available:
+            try:
+                acquired = bool(await self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000)))
+            except Exception as e:
+                self._failed("lock", e)
+                break
+            if acquired:
+                break
+            if self.clock() >= deadline:
+                self.stats["lock_timeouts"] += 1
+                break
+            if delay == 0.01:
+                self.stats["lock_waits"] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    await self._release_lock(keys=[lock_key], args=[token])
+                except Exception as e:
+                    # The lock expires after lock_ttl anyway
+                    self._failed("unlock", e)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "enabled": self.enabled, "available": self.available}
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from memory_redis import MemoryRedis
+from profile_cache import ProfileCache
+from redis_cache import COMPRESSED, RAW, RedisCache, dumps, loads
+from resume_cache import ResumeCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_values_round_trip_and_large_ones_are_compressed():
+    small = {"headline": "Engineer", "score": 7.5}
+    large = {"about": "Led a team that increased revenue " * 200, 1: [1, 2]}
+    assert dumps(small)[:1] == RAW and loads(dumps(small)) == small
+    encoded = dumps(large)
+    assert encoded[:1] == COMPRESSED and len(encoded) < len(large["about"]) / 10
+    assert loads(encoded) == {"about": large["about"], "1": [1, 2]}
+    with pytest.raises(ValueError):
+        loads(b"x{}")
+
+def test_entries_expire_after_their_ttl():
+    clock = FakeClock()
+    redis = MemoryRedis(clock)
+    cache = RedisCache(redis)
+
+    async def run():
+        await cache.set("a", {"value": 1}, ttl=10)
+        await cache.set("b", {"value": 2}, ttl=100)
+        clock.now += 11
+        return await cache.get("a"), await cache.get("b")
+
+    assert asyncio.run(run()) == (None, {"value": 2})
+    assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 1
+
+def test_unavailable_redis_degrades_to_no_cache():
+    clock = FakeClock()
+    redis = MemoryRedis()
+    cache = RedisCache(redis, retry_interval=30, clock=clock)
+
+    async def run():
+        await cache.set("a", 1, ttl=60)
+        redis.down = True
+        results = [await cache.get("a")]
+        await cache.set("b", 2, ttl=60)
+        async with cache.single_flight("b") as locked:
+            results.append(locked)
+        redis.down = False
+        # Still bypassed until retry_interval has passed
+        results.append(await cache.get("a"))
+        clock.now += 30
+        results.append(await cache.get("a"))
+        return results
+
+    assert asyncio.run(run()) == [None, False, None, 1]
+    assert cache.get_stats()["errors"] == 1
+
+def test_disabled_without_a_client():
+    cache = RedisCache(None)
+
+    async def run():
+        await cache.set("a", 1, ttl=60)
+        async with cache.single_flight("a") as locked:
+            return await cache.get("a"), locked
+
+    assert asyncio.run(run()) == (None, False)
+    assert not cache.available
+
+def test_lock_is_only_released_by_its_holder():
+    clock = FakeClock()
+    redis = MemoryRedis(clock)
+    first = RedisCache(redis, lock_ttl=5, lock_wait=0)
+    second = RedisCache(redis, lock_ttl=5, lock_wait=0)
+
+    async def run():
+        async with first.single_flight("k") as first_locked:
+            async with second.single_flight("k") as blocked:
+                pass
+            # The first holder overran its lock, which the second worker then took
+            clock.now += 6
+            async with second.single_flight("k") as second_locked:
+                pass
+            await redis.set("linkedin_analyzer:cache:lock:k", "someone-else")
+        return first_locked, blocked, second_locked, await redis.get("linkedin_analyzer:cache:lock:k")
+
+    assert asyncio.run(run()) == (True, False, True, b"someone-else")
+    assert second.get_stats()["lock_timeouts"] == 1
+
+def test_workers_load_each_profile_once():
+    redis = MemoryRedis()
+    workers = [ProfileCache(shared=RedisCache(redis)) for _ in range(3)]
+    loads_seen = []
+
+    async def loader():
+        loads_seen.append(1)
+        await asyncio.sleep(0.05)
+        return {"headline": "Engineer"}, True
+
+    async def run():
+        return await asyncio.gather(*(worker.get_or_load("johndoe", loader) for worker in workers))
+
+    assert asyncio.run(run()) == [{"headline": "Engineer"}] * 3
+    assert len(loads_seen) == 1
+    assert sum(worker.get_stats()["shared_hits"] for worker in workers) == 2
+
+def test_uncacheable_profiles_are_not_shared():
+    redis = MemoryRedis()
+    workers = [ProfileCache(shared=RedisCache(redis)) for _ in range(2)]
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return {"headline": "Mock"}, False
+
+    async def run():
+        for worker in workers:
+            await worker.get_or_load("johndoe", loader)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+def test_resume_results_are_shared_between_workers():
+    redis = MemoryRedis()
+    first, second = ResumeCache(shared=RedisCache(redis)), ResumeCache(shared=RedisCache(redis))
+
+    async def run():
+        await first.set_result("r:p:1", {"optimized_sections": {"headline": "New"}})
+        return await second.get_result("r:p:1")
+
+    assert asyncio.run(run()) == {"optimized_sections": {"headline": "New"}}
+    assert second.get_stats()["results"]["shared_hits"] == 1
+    assert 0 < redis.ttl("linkedin_analyzer:cache:resume_result:r:p:1") <= 7 * 86400
+
+def test_identical_profiles_reuse_a_shared_analysis(monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "shared_cache", RedisCache(MemoryRedis()))
+    monkeypatch.setattr(server.compute_pool, "kind", "inline")
+    calls = []
+    analyze = server.analyze_profile_incremental
+    monkeypatch.setattr(server, "analyze_profile_incremental",
+                        lambda *args: calls.append(1) or analyze(*args))
+    profile = server.generate_mock_profile_data("johndoe")
+
+    async def run():
+        return [await server.analyze_profile_shared(profile, None) for _ in range(2)]
+
+    (first, reused_first, hit_first), (second, reused_second, hit_second) = asyncio.run(run())
+    assert len(calls) == 1
+    assert first == second
+    assert (reused_first, hit_first) == (0, False) and (reused_second, hit_second) == (0, True)
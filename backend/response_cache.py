@@ -0,0 +1,67 @@
+import hashlib
+import json
+import time
+from typing import Callable, Hashable, Optional, Tuple
+
+from starlette.responses import Response
+
+from profile_cache import TTLCache
+
+
+def strong_etag(body: bytes) -> str:
+    """Strong ETag for an exact response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation, which uses the weak comparison (W/ prefixes are ignored)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Small in-process cache of serialized JSON bodies and their ETags.
+
+    Entries expire after ttl seconds; invalidate() drops an entry as soon as
+    the stored document it was built from changes.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60, clock: Callable[[], float] = time.time):
+        self.memory = TTLCache(maxsize, ttl, clock)
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        entry = self.memory.get(key)
+        self.stats["hits" if entry is not None else "misses"] += 1
+        return entry
+
+    def set(self, key: Hashable, value) -> Tuple[bytes, str]:
+        body = json.dumps(value, default=str).encode()
+        entry = (body, strong_etag(body))
+        self.memory.set(key, entry)
+        return entry
+
+    def invalidate(self, key: Hashable):
+        self.memory.pop(key)
+
+    def respond(self, entry: Tuple[bytes, str], if_none_match: Optional[str]) -> Response:
+        """200 with the cached body, or 304 when the client already has this representation"""
+        body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "size": len(self.memory)}
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+import server
+from response_cache import ResponseCache, etag_matches
+from write_behind import WriteBehindBuffer
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        for doc in self.docs:
+            if doc["profile_id"] == query["profile_id"]:
+                return {field: doc[field] for field in projection if projection[field] and field in doc}
+        return None
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+def test_stored_profile_is_served_with_etag_and_revalidated(monkeypatch):
+    profiles = FakeCollection([{
+        "profile_id": "p1", "linkedin_url": "https://www.linkedin.com/in/p1/", "profile_data": {"name": "P"},
+        "analysis_results": {"overall_score": 50}, "content_suggestions": {}, "created_at": "2024-01-01",
+        "_id": "object-id"
+    }])
+    monkeypatch.setattr(server, "profile_writes", WriteBehindBuffer(profiles, key="profile_id"))
+    monkeypatch.setattr(server, "response_cache", ResponseCache())
+    client = TestClient(server.app)
+
+    response = client.get("/api/profiles/p1")
+    assert response.status_code == 200
+    assert response.json()["analysis_results"] == {"overall_score": 50}
+    assert "_id" not in response.json()
+    etag = response.headers["etag"]
+
+    not_modified = client.get("/api/profiles/p1", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+    assert client.get("/api/profiles/p1", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert profiles.reads == 1
+
+    assert client.get("/api/profiles/missing").status_code == 404
+    assert client.get("/api/profiles/missing").status_code == 404
+    assert profiles.reads == 3
+
+def test_resume_analysis_etag_changes_after_invalidation(monkeypatch):
+    analyses = FakeCollection([{"profile_id": "p1", "optimized_sections": {"headline": "A"},
+                                "branding_plan": {}, "resume_text": "long text", "created_at": "2024-01-01"}])
+    monkeypatch.setattr(server, "db", SimpleNamespace(resume_analyses=analyses))
+    monkeypatch.setattr(server, "response_cache", ResponseCache())
+    client = TestClient(server.app)
+
+    first = client.get("/api/profiles/p1/resume-analysis")
+    assert "resume_text" not in first.json()
+
+    analyses.docs[0]["optimized_sections"] = {"headline": "B"}
+    assert client.get("/api/profiles/p1/resume-analysis").headers["etag"] == first.headers["etag"]
+    server.response_cache.invalidate(("resume-analysis", "p1"))
+    second = client.get("/api/profiles/p1/resume-analysis", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()["optimized_sections"] == {"headline": "B"}
+    assert second.headers["etag"] != first.headers["etag"]
+
+def test_stored_lookup_errors_are_reported_as_500(monkeypatch):
+    class BrokenCollection:
+        async def find_one(self, query, projection=None):
+            raise ConnectionError("mongo down")
+
+    monkeypatch.setattr(server, "profile_writes", WriteBehindBuffer(BrokenCollection(), key="profile_id"))
+    monkeypatch.setattr(server, "db", SimpleNamespace(resume_analyses=BrokenCollection()))
+    monkeypatch.setattr(server, "response_cache", ResponseCache())
+    client = TestClient(server.app)
+
+    profile = client.get("/api/profiles/p1")
+    resume = client.get("/api/profiles/p1/resume-analysis")
+    assert profile.status_code == 500 and "mongo down" in profile.json()["detail"]
+    assert resume.status_code == 500 and "mongo down" in resume.json()["detail"]
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from profile_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(value: Any) -> str:
+    """SHA-256 of a JSON-serialisable value, independent of dict key order"""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class _Tier:
+    """One cached kind of value: an in-process LRU in front of optional shared (Redis) and Mongo tiers"""
+
+    def __init__(self, name: str, collection, maxsize: int, ttl: float, clock: Callable[[], float], shared=None):
+        self.name = name
+        self.collection = collection
+        self.shared = shared
+        self.ttl = ttl
+        self.clock = clock
+        self.memory = TTLCache(maxsize, ttl, clock)
+        self.stats = {"hits": 0, "mongo_hits": 0, "misses": 0}
+        if shared is not None:
+            self.stats["shared_hits"] = 0
+
+    async def ensure_indexes(self):
+        if self.collection is None:
+            return
+        await self.collection.create_index("created_at", expireAfterSeconds=int(self.ttl), name="created_at_ttl")
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return value
+
+        if self.shared is not None:
+            value = await self.shared.get(f"resume_{self.name}:{key}")
+            if value is not None:
+                self.stats["shared_hits"] += 1
+                self.memory.set(key, value)
+                return value
+
+        if self.collection is not None:
+            try:
+                doc = await self.collection.find_one({"_id": key}, {"value": 1})
+            except Exception as e:
+                logger.warning(f"Resume cache read failed for {self.name} {key}: {str(e)}")
+                doc = None
+            if doc:
+                self.stats["mongo_hits"] += 1
+                self.memory.set(key, doc["value"])
+                return doc["value"]
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(f"resume_{self.name}:{key}", value, self.ttl)
+        if self.collection is None:
+            return
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"value": value, "created_at": datetime.fromtimestamp(self.clock(), timezone.utc)}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Resume cache write failed for {self.name} {key}: {str(e)}")
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "size": len(self.memory)}
+
+
+class ResumeCache:
+    """
+    Content-addressed cache for repeat resume uploads.
+
+    Extracted text is keyed by the upload's format and SHA-256, so an
+    identical file is never parsed twice. Optimisation output is keyed by
+    (resume hash, profile hash, scorer version); bumping the scorer version
+    makes every older result unreachable and the TTL index removes it.
+    """
+
+    def __init__(self, texts_collection=None, results_collection=None, maxsize: int = 256,
+                 ttl: float = 7 * 86400, clock: Callable[[], float] = time.time, shared=None):
+        self.texts = _Tier("text", texts_collection, maxsize, ttl, clock, shared)
+        self.results = _Tier("result", results_collection, maxsize, ttl, clock, shared)
+
+    async def ensure_indexes(self):
+        await self.texts.ensure_indexes()
+        await self.results.ensure_indexes()
+
+    @staticmethod
+    def text_key(file_format: str, resume_hash: str) -> str:
+        return f"{file_format}:{resume_hash}"
+
+    @staticmethod
+    def result_key(resume_hash: str, profile_hash: str, scorer_version: str) -> str:
+        return f"{resume_hash}:{profile_hash}:{scorer_version}"
+
+    async def get_text(self, key: str) -> Optional[str]:
+        return await self.texts.get(key)
+
+    async def set_text(self, key: str, text: str):
+        await self.texts.set(key, text)
+
+    async def get_result(self, key: str) -> Optional[dict]:
+        return await self.results.get(key)
+
+    async def set_result(self, key: str, result: dict):
+        await self.results.set(key, result)
+
+    def get_stats(self) -> dict:
+        return {"texts": self.texts.get_stats(), "results": self.results.get_stats()}
@@ -0,0 +1,89 @@
+import asyncio
+import io
+
+from starlette.datastructures import UploadFile
+
+import server
+from resume_cache import ResumeCache, content_hash
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+def test_result_key_changes_with_scorer_version():
+    assert ResumeCache.result_key("r", "p", "1") != ResumeCache.result_key("r", "p", "2")
+
+def test_results_survive_in_mongo_after_memory_eviction():
+    results = FakeCollection()
+    cache = ResumeCache(results_collection=results, maxsize=1)
+
+    async def run():
+        await cache.set_result("a", {"score": 1})
+        await cache.set_result("b", {"score": 2})
+        return await cache.get_result("a"), await cache.get_result("missing")
+
+    assert asyncio.run(run()) == ({"score": 1}, None)
+    assert cache.results.stats == {"hits": 0, "mongo_hits": 1, "misses": 1}
+
+def test_repeat_upload_reuses_extracted_text(monkeypatch):
+    monkeypatch.setattr(server, "resume_cache", ResumeCache())
+    parsed = []
+    original = server.parse_spooled_resume
+
+    async def counting_parse(filename, upload):
+        parsed.append(filename)
+        return await original(filename, upload)
+
+    monkeypatch.setattr(server, "parse_spooled_resume", counting_parse)
+
+    async def upload(content, filename):
+        return await server.read_resume(UploadFile(io.BytesIO(content), filename=filename))
+
+    async def run():
+        return [
+            await upload(b"Senior Engineer resume", "a.txt"),
+            await upload(b"Senior Engineer resume", "renamed.TXT"),
+            await upload(b"Different resume", "a.txt"),
+        ]
+
+    first, repeat, different = asyncio.run(run())
+    assert first == repeat
+    assert first[0] == "Senior Engineer resume"
+    assert different[1] != first[1]
+    assert parsed == ["a.txt", "a.txt"]
+
+def test_sample_text_fallback_is_not_cached(monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+
+    monkeypatch.setattr(server, "resume_cache", ResumeCache())
+    calls = []
+
+    async def crashing_then_working_pool(name, function, *args):
+        calls.append(name)
+        if len(calls) == 1:
+            raise BrokenProcessPool("worker died")
+        return "Senior Engineer with Python and AWS experience"
+
+    monkeypatch.setattr(server.compute_pool, "run", crashing_then_working_pool)
+
+    async def upload():
+        return await server.read_resume(UploadFile(io.BytesIO(b"%PDF-1.4 resume"), filename="cv.pdf"))
+
+    async def run():
+        return await upload(), await upload()
+
+    (fallback, _), (retried, _) = asyncio.run(run())
+    assert fallback == server.get_sample_resume_text()
+    assert retried == "Senior Engineer with Python and AWS experience"
+    assert calls == ["parse_resume", "parse_resume"]
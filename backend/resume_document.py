@@ -0,0 +1,74 @@
+import re
+from functools import cached_property
+from typing import Union
+
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+')
+
+
+class ResumeDocument:
+    """
+    Resume text prepared once for all optimisers.
+
+    The lowercased text and its sentence, line and paragraph splits are
+    computed lazily on first use and then shared. Splitting the lowercased
+    text yields the same pieces as lowercasing each piece, because case
+    folding never produces or removes the separators, so whichever is
+    cheaper is used.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._term_counts = {}
+        self._paragraph_sentences = {}
+
+    @classmethod
+    def of(cls, resume: Union["ResumeDocument", str]) -> "ResumeDocument":
+        return resume if isinstance(resume, cls) else cls(resume)
+
+    def __str__(self):
+        return self.text
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def sentences(self) -> list:
+        return SENTENCE_BOUNDARY.split(self.text)
+
+    @cached_property
+    def sentences_lower(self) -> list:
+        return [sentence.lower() for sentence in self.sentences]
+
+    @cached_property
+    def lines_lower(self) -> list:
+        return self.lower.split('\n')
+
+    @cached_property
+    def paragraphs(self) -> list:
+        return self.text.split('\n\n')
+
+    @cached_property
+    def paragraphs_lower(self) -> list:
+        return self.lower.split('\n\n')
+
+    def paragraph_sentences(self, index: int) -> list:
+        """(sentence, lowercased sentence) pairs for one paragraph, split on first use"""
+        sentences = self._paragraph_sentences.get(index)
+        if sentences is None:
+            sentences = self._paragraph_sentences[index] = [
+                (sentence, sentence.lower()) for sentence in SENTENCE_BOUNDARY.split(self.paragraphs[index])
+            ]
+        return sentences
+
+    @cached_property
+    def words(self) -> list:
+        return self.text.split()
+
+    def count(self, term: str) -> int:
+        """Case-insensitive count of non-overlapping occurrences, memoised per term"""
+        term = term.lower()
+        count = self._term_counts.get(term)
+        if count is None:
+            count = self._term_counts[term] = self.lower.count(term)
+        return count
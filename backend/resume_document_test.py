@@ -0,0 +1,45 @@
+import re
+
+import server
+from resume_document import ResumeDocument
+
+RESUME = """JANE DOE
+Senior Engineer, ACME Corp
+
+Led the platform team! Increased uptime to 99.99%? Reduced cost.
+Project: Atlas migration
+
+Skills: Python, JavaScript, python tooling"""
+
+
+def test_splits_match_plain_string_operations():
+    doc = ResumeDocument(RESUME)
+
+    assert doc.lower == RESUME.lower()
+    assert doc.sentences == re.split(r'[.!?]+', RESUME)
+    assert doc.sentences_lower == re.split(r'[.!?]+', RESUME.lower())
+    assert doc.lines_lower == RESUME.lower().split('\n')
+    assert doc.paragraphs == RESUME.split('\n\n')
+    assert doc.paragraphs_lower == [paragraph.lower() for paragraph in RESUME.split('\n\n')]
+    assert doc.paragraph_sentences(2) == [
+        (sentence, sentence.lower()) for sentence in re.split(r'[.!?]+', RESUME.split('\n\n')[2])
+    ]
+
+def test_count_is_case_insensitive_and_memoised():
+    doc = ResumeDocument(RESUME)
+
+    assert doc.count("Python") == RESUME.lower().count("python") == 2
+    assert doc.count("PYTHON") == 2
+    assert doc._term_counts == {"python": 2}
+
+def test_of_reuses_existing_document():
+    doc = ResumeDocument(RESUME)
+    assert ResumeDocument.of(doc) is doc
+    assert ResumeDocument.of(RESUME).text == RESUME
+
+def test_optimisers_accept_documents_and_strings_alike():
+    profile = server.generate_mock_profile_data("janedoe")
+    doc = ResumeDocument(RESUME)
+
+    assert server.optimize_linkedin_sections(profile, RESUME) == server.optimize_linkedin_sections(profile, doc)
+    assert server.optimize_skills(profile["skills"], doc) == server.optimize_skills(profile["skills"], RESUME)
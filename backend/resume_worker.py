@@ -0,0 +1,39 @@
+"""
+Standalone resume job worker.
+
+Runs the server's lifespan (database, compute pool, LinkedIn client and
+RESUME_JOB_WORKERS job workers) without serving HTTP, until SIGINT or
+SIGTERM. With the same REDIS_URL as the API it takes jobs enqueued by any
+API replica; set RESUME_JOB_WORKERS=0 on the API to leave all resume
+processing to these workers. Profiles an API replica has not yet written
+out of its write-behind buffer (PROFILE_WRITE_BEHIND) are not visible here,
+so a job for one fails its attempt and is retried after
+RESUME_JOB_RETRY_DELAY seconds (times the attempt number).
+
+    cd backend && REDIS_URL=redis://localhost:6379/0 python resume_worker.py
+"""
+import asyncio
+import logging
+import os
+import signal
+
+logger = logging.getLogger("resume_worker")
+
+
+async def main():
+    import server
+
+    if server.redis_client is None:
+        logger.warning("REDIS_URL is not set, this worker only sees jobs enqueued in its own process")
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    async with server.app.router.lifespan_context(server.app):
+        logger.info(f"Resume worker {os.getpid()} running {server.resume_job_workers.concurrency} job workers")
+        await stop.wait()
+    logger.info(f"Resume worker {os.getpid()} stopped: {server.resume_job_workers.get_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
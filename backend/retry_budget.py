@@ -0,0 +1,52 @@
+import time
+from typing import Callable
+
+
+class RetryBudget:
+    """
+    Token bucket shared by every retry and hedged request to one upstream.
+
+    Each original request deposits `ratio` tokens and each extra request
+    spends one, so over time extra requests stay within ratio of the
+    original traffic. The bucket holds at most max_tokens, which bounds the
+    burst of extra requests after a quiet period. min_per_second tokens are
+    added over time so a low-traffic process can still retry occasionally.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0, min_per_second: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.min_per_second = min_per_second
+        self.clock = clock
+        self.tokens = max_tokens
+        self._refilled_at = clock()
+        self.stats = {"requests": 0, "spent": 0, "exhausted": 0}
+
+    def _add(self, tokens: float):
+        self.tokens = min(self.max_tokens, self.tokens + tokens)
+
+    def _refill(self):
+        now = self.clock()
+        if self.min_per_second:
+            self._add((now - self._refilled_at) * self.min_per_second)
+        self._refilled_at = now
+
+    def deposit(self):
+        """Count an original request"""
+        self.stats["requests"] += 1
+        self._add(self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take a token for an extra request, or refuse when the budget is used up"""
+        self._refill()
+        if self.tokens < 1:
+            self.stats["exhausted"] += 1
+            return False
+        self.tokens -= 1
+        self.stats["spent"] += 1
+        return True
+
+    def get_stats(self) -> dict:
+        self._refill()
+        return {**self.stats, "tokens": round(self.tokens, 3), "ratio": self.ratio, "max_tokens": self.max_tokens}
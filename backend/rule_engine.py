@@ -0,0 +1,503 @@
+import hashlib
+import logging
+import operator
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("completeness", "relevance", "impact", "keywords")
+
+# Sections analyze_profile scores, in the order it adds them
+SECTIONS = ("headline", "about", "experience", "education", "skills",
+            "certifications", "recommendations", "visuals", "featured", "activity")
+
+COMPARISONS = {
+    "below": operator.lt,
+    "at_most": operator.le,
+    "above": operator.gt,
+    "at_least": operator.ge,
+    "equals": operator.eq,
+}
+
+FEATURE_KINDS = {
+    "length": set(),
+    "word_count": set(),
+    "count": set(),
+    "flag": {"key"},
+    "contains_any": {"values"},
+    "keyword_count": {"keywords", "multiply"},
+    "keyword_any": {"keywords"},
+    "count_items": {"field", "contains_any", "keywords", "min_length", "require_fields"},
+}
+REQUIRED_FEATURE_PARAMS = {"flag": {"key"}, "contains_any": {"values"}, "keyword_count": {"keywords"},
+                           "keyword_any": {"keywords"}}
+
+OPERATOR_SOURCE = {"below": "<", "at_most": "<=", "above": ">", "at_least": ">=", "equals": "=="}
+
+
+class RuleError(ValueError):
+    """Raised when scoring rules do not validate; the message names the offending path"""
+
+
+def _check_keys(spec, allowed, path: str, required=()):
+    if not isinstance(spec, dict):
+        raise RuleError(f"{path}: expected a mapping, got {type(spec).__name__}")
+    unknown = set(spec) - set(allowed)
+    if unknown:
+        raise RuleError(f"{path}: unknown keys {sorted(unknown)}")
+    missing = set(required) - set(spec)
+    if missing:
+        raise RuleError(f"{path}: missing keys {sorted(missing)}")
+
+
+def _check_number(value, path: str):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RuleError(f"{path}: expected a number, got {value!r}")
+
+
+def _check_strings(values, path: str):
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise RuleError(f"{path}: expected a list of strings")
+
+
+class Operand:
+    """A feature, category or score value, optionally divided, multiplied and capped"""
+
+    __slots__ = ("subject", "name", "divide", "multiply", "cap")
+
+    def __init__(self, subject: str, name: Optional[str], divide=None, multiply=None, cap=None):
+        self.subject = subject
+        self.name = name
+        self.divide = divide
+        self.multiply = multiply
+        self.cap = cap
+
+    def source(self) -> str:
+        """Python expression for the value, applying divide, multiply and cap in that order"""
+        if self.subject == "category":
+            expression = f"c_{self.name}"
+        elif self.subject == "score":
+            expression = "score"
+        else:
+            expression = f"f_{self.name}"
+        if self.divide is not None:
+            expression = f"({expression} / {self.divide!r})"
+        if self.multiply is not None:
+            expression = f"({expression} * {self.multiply!r})"
+        if self.cap is not None:
+            expression = f"min({self.cap!r}, {expression})"
+        return expression
+
+
+class Condition:
+    """A comparison of an operand against a number or another operand, a truth test, or a conjunction"""
+
+    __slots__ = ("subject", "op", "operand", "parts")
+
+    def __init__(self, subject: Optional[Operand], op: Optional[str] = None, operand=None, parts=None):
+        self.subject = subject
+        self.op = op
+        self.operand = operand
+        self.parts = parts
+
+    def source(self) -> str:
+        if self.parts is not None:
+            return "(" + " and ".join(part.source() for part in self.parts) + ")"
+        if self.op is None:
+            return self.subject.source()
+        operand = self.operand.source() if isinstance(self.operand, Operand) else repr(self.operand)
+        return f"({self.subject.source()} {OPERATOR_SOURCE[self.op]} {operand})"
+
+
+class Rule:
+    """
+    One scoring step.
+
+    cases is a list of (condition, points, feedback). The first case whose
+    condition holds applies, falling back to otherwise. A condition of None
+    always holds. points is a number, an Operand or None (leave the category
+    as it is).
+    """
+
+    __slots__ = ("category", "add", "cases", "otherwise")
+
+    def __init__(self, category: Optional[str], add: bool, cases: list, otherwise: Optional[tuple]):
+        self.category = category
+        self.add = add
+        self.cases = cases
+        self.otherwise = otherwise
+
+    def source(self, indent: str) -> List[str]:
+        branches = list(self.cases) + ([self.otherwise] if self.otherwise is not None else [])
+        lines = []
+        for index, (condition, points, feedback) in enumerate(branches):
+            body = []
+            if points is not None:
+                value = points.source() if isinstance(points, Operand) else repr(points)
+                target = f"c_{self.category}"
+                body.append(f"{target} = {target} + {value}" if self.add else f"{target} = {value}")
+            if feedback is not None:
+                body.append(f"feedback.append({feedback!r})")
+            if condition is None:
+                if index == 0:
+                    lines.extend(indent + line for line in body)
+                else:
+                    lines.append(f"{indent}else:")
+                    lines.extend(f"{indent}    {line}" for line in body or ["pass"])
+                break
+            lines.append(f"{indent}{'if' if index == 0 else 'elif'} {condition.source()}:")
+            lines.extend(f"{indent}    {line}" for line in body or ["pass"])
+        return lines
+
+
+class CompiledSection:
+    """Features, guard, rules and final assessment of one section, ready to evaluate"""
+
+    def __init__(self, name: str, spec: dict):
+        self.name = name
+        self.feature_specs: Dict[str, dict] = {}
+        self.namespace: Dict[str, Any] = {}
+        self._feature_lines: List[str] = []
+        self._compile_features(spec.get("features") or {}, f"sections.{name}.features")
+
+        self.empty: Optional[Tuple[Condition, str]] = None
+        if "empty" in spec:
+            path = f"sections.{name}.empty"
+            _check_keys(spec["empty"], {"when", "feedback"}, path, required={"when", "feedback"})
+            when = self._condition(spec["empty"]["when"], f"{path}.when", subjects=("feature",))
+            self.empty = (when, str(spec["empty"]["feedback"]))
+
+        rules = spec.get("rules") or []
+        if not isinstance(rules, list):
+            raise RuleError(f"sections.{name}.rules: expected a list")
+        self.rules = [self._rule(rule, f"sections.{name}.rules[{index}]") for index, rule in enumerate(rules)]
+
+        self.assessment: Optional[Rule] = None
+        if "assessment" in spec:
+            path = f"sections.{name}.assessment"
+            _check_keys(spec["assessment"], {"cases", "otherwise"}, path, required={"cases"})
+            self.assessment = self._rule(spec["assessment"], path, score_only=True)
+
+        self._generate()
+
+    # Features
+
+    def _compile_features(self, features: dict, path: str):
+        if not isinstance(features, dict):
+            raise RuleError(f"{path}: expected a mapping")
+        keyword_features = []
+        item_features = []
+        keywords: List[str] = []
+        for feature, spec in features.items():
+            feature_path = f"{path}.{feature}"
+            if not isinstance(feature, str) or not feature.isidentifier():
+                raise RuleError(f"{feature_path}: feature names must be identifiers")
+            if not isinstance(spec, dict) or spec.get("kind") not in FEATURE_KINDS:
+                raise RuleError(f"{feature_path}: kind must be one of {sorted(FEATURE_KINDS)}")
+            kind = spec["kind"]
+            _check_keys(spec, FEATURE_KINDS[kind] | {"kind"}, feature_path,
+                        required=REQUIRED_FEATURE_PARAMS.get(kind, ()))
+            self.feature_specs[feature] = spec
+
+            if kind in ("keyword_count", "keyword_any"):
+                _check_strings(spec["keywords"], f"{feature_path}.keywords")
+                if "multiply" in spec:
+                    _check_number(spec["multiply"], f"{feature_path}.multiply")
+                start = len(keywords)
+                keywords.extend(spec["keywords"])
+                keyword_features.append((feature, kind, spec.get("multiply"), range(start, len(keywords))))
+            elif kind in ("length", "count"):
+                self._feature_lines.append(f"f_{feature} = len(value) if value else 0")
+            elif kind == "word_count":
+                self._feature_lines.append(f"f_{feature} = len(value.split()) if value else 0")
+            elif kind == "flag":
+                self._feature_lines.append(f"f_{feature} = bool(value.get({spec['key']!r}, False)) if value else False")
+            elif kind == "contains_any":
+                _check_strings(spec["values"], f"{feature_path}.values")
+                tests = " or ".join(f"{needle!r} in value" for needle in spec["values"]) or "False"
+                self._feature_lines.append(f"f_{feature} = bool(value) and ({tests})")
+            else:
+                item_features.append((feature, spec, feature_path))
+
+        if item_features:
+            self._feature_lines += self._count_items_lines(item_features)
+        if keywords:
+            # Every keyword feature of the section is answered by one matcher pass over the input.
+            # Lists (skills) are matched one item per line, so no keyword spans two items.
+            self.namespace["_matcher"] = KeywordMatcher(keywords)
+            self._feature_lines += [
+                "if value:",
+                "    text = value.lower() if isinstance(value, str) else '\\n'.join(item.lower() for item in value)",
+            ]
+            if len(keyword_features) == 1:
+                # A single feature can stop at the first hit or count without building a set
+                feature, kind, multiply, _ = keyword_features[0]
+                if kind == "keyword_any":
+                    self._feature_lines += [f"    f_{feature} = _matcher.search(text, folded=True)",
+                                            "else:", f"    f_{feature} = False"]
+                else:
+                    scale = "" if multiply is None else f" * {multiply!r}"
+                    self._feature_lines += [f"    f_{feature} = _matcher.count(text, folded=True){scale}",
+                                            "else:", f"    f_{feature} = 0"]
+                return
+
+            self._feature_lines += [
+                "    found = _matcher.found_positions(text, folded=True)",
+                "else:",
+                "    found = set()",
+            ]
+            for feature, kind, multiply, positions in keyword_features:
+                self.namespace[f"_positions_{feature}"] = frozenset(positions)
+                if kind == "keyword_any":
+                    self._feature_lines.append(f"f_{feature} = not found.isdisjoint(_positions_{feature})")
+                elif multiply is None:
+                    self._feature_lines.append(f"f_{feature} = len(found & _positions_{feature})")
+                else:
+                    self._feature_lines.append(f"f_{feature} = len(found & _positions_{feature}) * {multiply!r}")
+
+    def _count_items_lines(self, item_features: list) -> List[str]:
+        """One loop over the input list that counts the items passing each count_items feature"""
+        fields: Dict[str, str] = {}
+        conditions = []
+        for feature, spec, path in item_features:
+            tests = []
+            if "require_fields" in spec:
+                _check_strings(spec["require_fields"], f"{path}.require_fields")
+                tests += [f"item.get({key!r})" for key in spec["require_fields"]]
+            if "field" in spec:
+                if not isinstance(spec["field"], str):
+                    raise RuleError(f"{path}.field: expected a string")
+                variable = fields.setdefault(spec["field"], f"v_{len(fields)}")
+                # The field must be present and non-empty before any other test looks at it
+                tests.append(variable)
+                if "contains_any" in spec:
+                    _check_strings(spec["contains_any"], f"{path}.contains_any")
+                    tests.append("(" + " or ".join(f"{needle!r} in {variable}" for needle in spec["contains_any"]) + ")")
+                if "keywords" in spec:
+                    _check_strings(spec["keywords"], f"{path}.keywords")
+                    self.namespace[f"_matcher_{feature}"] = KeywordMatcher(spec["keywords"])
+                    tests.append(f"_matcher_{feature}.search({variable})")
+                if "min_length" in spec:
+                    _check_number(spec["min_length"], f"{path}.min_length")
+                    tests.append(f"len({variable}) >= {spec['min_length']!r}")
+            elif any(key in spec for key in ("contains_any", "keywords", "min_length")):
+                raise RuleError(f"{path}: contains_any, keywords and min_length need a field")
+            conditions.append((feature, " and ".join(tests) or "True"))
+
+        lines = [" = ".join(f"f_{feature}" for feature, _ in conditions) + " = 0", "for item in value or ():"]
+        lines += [f"    {variable} = item.get({field!r})" for field, variable in fields.items()]
+        for feature, condition in conditions:
+            lines += [f"    if {condition}:", f"        f_{feature} += 1"]
+        return lines
+
+    # Rules
+
+    def _operand(self, spec: dict, path: str, allowed_subjects=("feature", "category")) -> Operand:
+        subjects = [subject for subject in ("feature", "category", "score") if subject in spec]
+        if len(subjects) != 1 or subjects[0] not in allowed_subjects:
+            raise RuleError(f"{path}: name exactly one of {list(allowed_subjects)}")
+        subject = subjects[0]
+        name = spec[subject]
+        if subject == "feature" and name not in self.feature_specs:
+            raise RuleError(f"{path}: unknown feature {name!r}")
+        if subject == "category" and name not in CATEGORIES:
+            raise RuleError(f"{path}: unknown category {name!r}")
+        for key in ("divide", "multiply", "cap"):
+            if key in spec:
+                _check_number(spec[key], f"{path}.{key}")
+        if spec.get("divide") == 0:
+            raise RuleError(f"{path}.divide: must not be zero")
+        return Operand(subject, None if subject == "score" else name,
+                       spec.get("divide"), spec.get("multiply"), spec.get("cap"))
+
+    def _condition(self, spec, path: str, subjects=("feature", "category")) -> Condition:
+        if isinstance(spec, dict) and "all" in spec:
+            _check_keys(spec, {"all"}, path)
+            if not isinstance(spec["all"], list) or not spec["all"]:
+                raise RuleError(f"{path}.all: expected a non-empty list")
+            return Condition(None, parts=[
+                self._condition(part, f"{path}.all[{index}]", subjects) for index, part in enumerate(spec["all"])
+            ])
+
+        _check_keys(spec, set(subjects) | set(COMPARISONS), path)
+        ops = [op for op in COMPARISONS if op in spec]
+        if len(ops) > 1:
+            raise RuleError(f"{path}: use one of {list(COMPARISONS)} per condition")
+        subject = self._operand({key: spec[key] for key in subjects if key in spec}, path, subjects)
+        if not ops:
+            if subject.subject == "score":
+                raise RuleError(f"{path}: a score condition needs a comparison")
+            return Condition(subject)
+
+        op = ops[0]
+        operand = spec[op]
+        if isinstance(operand, dict):
+            _check_keys(operand, {"feature", "category", "divide", "multiply"}, f"{path}.{op}")
+            operand_subjects = tuple(kind for kind in subjects if kind != "score") or ("feature",)
+            operand = self._operand(operand, f"{path}.{op}", operand_subjects)
+        else:
+            _check_number(operand, f"{path}.{op}")
+        return Condition(subject, op, operand)
+
+    def _points(self, spec, path: str):
+        if isinstance(spec, dict):
+            _check_keys(spec, {"feature", "category", "divide", "multiply", "cap"}, path)
+            return self._operand(spec, path)
+        _check_number(spec, path)
+        return spec
+
+    def _outcome(self, spec: dict, path: str, category: Optional[str]) -> Tuple[Any, Optional[str]]:
+        points = self._points(spec["points"], f"{path}.points") if "points" in spec else None
+        if points is not None and category is None:
+            raise RuleError(f"{path}: points need a category")
+        feedback = spec.get("feedback")
+        if feedback is not None and not isinstance(feedback, str):
+            raise RuleError(f"{path}.feedback: expected a string")
+        return points, feedback
+
+    def _rule(self, spec: dict, path: str, score_only: bool = False) -> Rule:
+        _check_keys(spec, {"category", "add", "cases", "otherwise", "points", "feedback"}, path)
+        category = spec.get("category")
+        if category is not None and category not in CATEGORIES:
+            raise RuleError(f"{path}.category: expected one of {list(CATEGORIES)}")
+        if "cases" in spec and ("points" in spec or "feedback" in spec):
+            raise RuleError(f"{path}: give either cases/otherwise or points/feedback")
+        if "cases" not in spec and "otherwise" in spec:
+            raise RuleError(f"{path}: otherwise needs cases")
+
+        if "cases" not in spec:
+            if "points" not in spec and "feedback" not in spec:
+                raise RuleError(f"{path}: a rule needs cases, points or feedback")
+            return Rule(category, bool(spec.get("add")), [(None, *self._outcome(spec, path, category))], None)
+
+        if not isinstance(spec["cases"], list) or not spec["cases"]:
+            raise RuleError(f"{path}.cases: expected a non-empty list")
+        cases = []
+        for index, case in enumerate(spec["cases"]):
+            case_path = f"{path}.cases[{index}]"
+            _check_keys(case, {"when", "points", "feedback"}, case_path, required={"when"})
+            condition = self._condition(case["when"], f"{case_path}.when",
+                                        ("score",) if score_only else ("feature", "category"))
+            cases.append((condition, *self._outcome(case, case_path, category)))
+        otherwise = None
+        if "otherwise" in spec:
+            _check_keys(spec["otherwise"], {"points", "feedback"}, f"{path}.otherwise")
+            otherwise = (None, *self._outcome(spec["otherwise"], f"{path}.otherwise", category))
+        return Rule(category, bool(spec.get("add")), cases, otherwise)
+
+    def _generate(self):
+        """
+        Compile the section into two Python functions: extract(value) returns
+        the feature dict, evaluate(value) returns (score, feedback,
+        category_scores). The rules become straight-line if/elif chains over
+        local variables, the same shape as hand-written scoring code.
+        """
+        body = [f"    {line}" for line in self._feature_lines]
+        names = ", ".join(f"{feature!r}: f_{feature}" for feature in self.feature_specs)
+        lines = ["def extract(value):", *body, f"    return {{{names}}}", "", "def evaluate(value):", *body]
+        if self.empty is not None:
+            condition, message = self.empty
+            zeros = ", ".join(f"{category!r}: 0" for category in CATEGORIES)
+            lines += [f"    if {condition.source()}:", f"        return 0, [{message!r}], {{{zeros}}}"]
+        lines.append("    " + " = ".join(f"c_{category}" for category in CATEGORIES) + " = 0")
+        lines.append("    feedback = []")
+        for rule in self.rules:
+            lines += rule.source("    ")
+        # Same additions, in the same order, as sum(category_scores.values())
+        lines.append("    score = sum((" + ", ".join(f"c_{category}" for category in CATEGORIES) + "))")
+        if self.assessment is not None:
+            lines += self.assessment.source("    ")
+        scores = ", ".join(f"{category!r}: c_{category}" for category in CATEGORIES)
+        lines.append(f"    return min(100, score), feedback, {{{scores}}}")
+
+        self.source = "\n".join(lines) + "\n"
+        exec(compile(self.source, f"<scoring rules: {self.name}>", "exec"), self.namespace)
+        self.extract = self.namespace["extract"]
+        self.evaluate = self.namespace["evaluate"]
+
+
+def compile_rules(data: dict, expected_sections=SECTIONS) -> Dict[str, CompiledSection]:
+    """Validate parsed rules and compile every section; the sections must be exactly expected_sections"""
+    _check_keys(data, {"version", "sections"}, "rules", required={"sections"})
+    sections = data["sections"]
+    if not isinstance(sections, dict) or not sections:
+        raise RuleError("sections: expected a non-empty mapping")
+    _check_keys(sections, expected_sections, "sections", required=expected_sections)
+    compiled = {}
+    for name, spec in sections.items():
+        _check_keys(spec, {"features", "empty", "rules", "assessment"}, f"sections.{name}")
+        compiled[name] = CompiledSection(name, spec)
+    return compiled
+
+
+class RuleEngine:
+    """
+    Scoring rules loaded from a YAML file.
+
+    The file's modification time is checked at most once every
+    reload_interval seconds, from whichever process evaluates rules, so
+    edits reach every worker without a restart. A file that fails to
+    parse or validate, including one that does not define exactly
+    expected_sections, is logged and the previous rules stay in effect.
+    """
+
+    def __init__(self, path, reload_interval: Optional[float] = 5.0, clock: Callable[[], float] = time.monotonic,
+                 expected_sections=SECTIONS):
+        self.path = os.fspath(path)
+        self.reload_interval = reload_interval
+        self.clock = clock
+        self.expected_sections = expected_sections
+        self.version: Optional[str] = None
+        self.sections: Dict[str, CompiledSection] = {}
+        self._mtime_ns: Optional[int] = None
+        self._next_check = 0.0
+        self.reload()
+
+    def reload(self):
+        """Load and compile the rules file, raising RuleError or OSError if it is unusable"""
+        with open(self.path, "rb") as f:
+            content = f.read()
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        try:
+            data = yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            raise RuleError(f"{self.path}: {e}") from e
+        self.sections = compile_rules(data, self.expected_sections)
+        self.version = hashlib.sha256(content).hexdigest()[:12]
+        self._mtime_ns = mtime_ns
+        self._next_check = self.clock() + (self.reload_interval or 0)
+
+    def check_for_changes(self):
+        self._next_check = self.clock() + self.reload_interval
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            logger.error(f"Cannot stat scoring rules {self.path}: {str(e)}")
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        try:
+            self.reload()
+            logger.info(f"Reloaded scoring rules {self.path} (version {self.version})")
+        except (RuleError, OSError) as e:
+            # Remember the broken file so it is not re-parsed on every check
+            self._mtime_ns = mtime_ns
+            logger.error(f"Keeping previous scoring rules, {self.path} is invalid: {str(e)}")
+
+    def current(self) -> Dict[str, CompiledSection]:
+        """The compiled sections, after picking up any change to the rules file"""
+        if self.reload_interval is not None and self.clock() >= self._next_check:
+            self.check_for_changes()
+        return self.sections
+
+    def section(self, name: str) -> CompiledSection:
+        return self.current()[name]
+
+    def evaluate(self, name: str, value) -> Tuple[Any, list, dict]:
+        return self.section(name).evaluate(value)
@@ -0,0 +1,152 @@
+import os
+import re
+
+import pytest
+import yaml
+
+import server
+from batch_scoring import score_profiles
+from rule_engine import RuleEngine, RuleError, compile_rules
+
+SKILLS_RULES = """
+version: 1
+sections:
+  skills:
+    features:
+      count: {kind: count}
+      data: {kind: keyword_any, keywords: [sql, python]}
+    empty:
+      when: {feature: count, equals: 0}
+      feedback: Empty.
+    rules:
+      - category: completeness
+        cases:
+          - when: {feature: count, below: LIMIT}
+            points: 5
+            feedback: Too few.
+        otherwise:
+          points: 25
+      - category: keywords
+        cases:
+          - when: {all: [{feature: data}, {feature: count, at_least: 2}]}
+            points: {feature: count, multiply: 4, cap: 20}
+      - feedback: Keep skills current.
+    assessment:
+      cases:
+        - when: {score: true, below: 30}
+          feedback: Weak.
+      otherwise:
+        feedback: Strong.
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_rules(path, limit, mtime_ns):
+    path.write_text(SKILLS_RULES.replace("LIMIT", str(limit)))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_custom_rules_evaluate_in_order():
+    skills = compile_rules(yaml.safe_load(SKILLS_RULES.replace("LIMIT", "3")), ("skills",))["skills"]
+    assert skills.evaluate([]) == (0, ["Empty."], {"completeness": 0, "relevance": 0, "impact": 0, "keywords": 0})
+    assert skills.evaluate(["SQL", "Go"]) == (
+        13, ["Too few.", "Keep skills current.", "Weak."],
+        {"completeness": 5, "relevance": 0, "impact": 0, "keywords": 8}
+    )
+    assert skills.evaluate(["Python"] * 9)[0] == 45
+    assert skills.extract(["Go"]) == {"count": 1, "data": False}
+
+def test_rules_are_reloaded_when_the_file_changes(tmp_path):
+    path = tmp_path / "rules.yaml"
+    write_rules(path, 3, 1_000_000_000)
+    clock = FakeClock()
+    engine = RuleEngine(path, reload_interval=5, clock=clock, expected_sections=("skills",))
+    first_version = engine.version
+    assert engine.evaluate("skills", ["a", "b", "c"])[2]["completeness"] == 25
+
+    write_rules(path, 5, 2_000_000_000)
+    assert engine.evaluate("skills", ["a", "b", "c"])[2]["completeness"] == 25
+    clock.now += 5
+    assert engine.evaluate("skills", ["a", "b", "c"])[2]["completeness"] == 5
+    assert engine.version != first_version
+
+def test_invalid_rules_file_keeps_previous_rules(tmp_path):
+    path = tmp_path / "rules.yaml"
+    write_rules(path, 3, 1_000_000_000)
+    clock = FakeClock()
+    engine = RuleEngine(path, reload_interval=1, clock=clock, expected_sections=("skills",))
+
+    path.write_text("sections: {skills: {rules: [{category: fame, points: 1}]}}")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    clock.now += 1
+    assert engine.evaluate("skills", ["a"])[2]["completeness"] == 5
+
+    with pytest.raises(RuleError):
+        engine.reload()
+
+@pytest.mark.parametrize("rules, message", [
+    ("sections: {s: {features: {n: {kind: size}}}}", "kind must be one of"),
+    ("sections: {s: {features: {n-1: {kind: count}}}}", "identifiers"),
+    ("sections: {s: {rules: [{category: impact, points: {feature: missing}}]}}", "unknown feature 'missing'"),
+    ("sections: {s: {rules: [{points: 3}]}}", "points need a category"),
+    ("sections: {s: {rules: [{category: impact, points: 3, colour: red}]}}", "unknown keys ['colour']"),
+    ("sections: {s: {rules: [{category: impact, cases: [{when: {score: true, below: 3}}]}]}}", "unknown keys ['score']"),
+    ("sections: {s: {features: {n: {kind: count}}, rules: [{category: impact, points: {feature: n, divide: 0}}]}}",
+     "must not be zero"),
+    ("sections: {s: {features: {n: {kind: count}}, empty: {when: {feature: m, equals: 0}, feedback: Empty.}}}",
+     "sections.s.empty.when: unknown feature 'm'"),
+    ("sections: {s: {rules: [{category: impact, cases: [{when: {feature: n, above: 1}, points: 3}]}]}}",
+     "sections.s.rules[0].cases[0].when: unknown feature 'n'"),
+    ("sections: {s: {}, t: {}}", "sections: unknown keys ['t']"),
+])
+def test_invalid_rules_are_rejected_with_their_path(rules, message):
+    with pytest.raises(RuleError, match=re.escape(message)):
+        compile_rules(yaml.safe_load(rules), ("s",))
+
+def test_default_rules_cover_every_section():
+    assert set(server.scoring_rules.sections) == {
+        "headline", "about", "experience", "education", "skills",
+        "certifications", "recommendations", "visuals", "featured", "activity"
+    }
+    assert "def evaluate(value):" in server.scoring_rules.sections["headline"].source
+
+def test_rules_missing_or_misnaming_a_section_are_not_swapped_in(tmp_path):
+    path = tmp_path / "rules.yaml"
+    default_rules = (server.ROOT_DIR / "scoring_rules.yaml").read_text()
+    path.write_text(default_rules)
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    clock = FakeClock()
+    engine = RuleEngine(path, reload_interval=1, clock=clock)
+    expected = engine.evaluate("headline", "Senior Python Engineer")
+
+    without_activity = yaml.safe_load(default_rules)
+    del without_activity["sections"]["activity"]
+    with pytest.raises(RuleError, match=re.escape("sections: missing keys ['activity']")):
+        compile_rules(without_activity)
+
+    path.write_text(default_rules.replace("\n  headline:\n", "\n  headlnie:\n"))
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    clock.now += 1
+    with pytest.raises(RuleError, match=re.escape("sections: unknown keys ['headlnie']")):
+        engine.reload()
+    assert engine.evaluate("headline", "Senior Python Engineer") == expected
+    assert set(engine.sections) == set(server.scoring_rules.sections)
+
+def test_batch_scorer_follows_custom_rules(tmp_path):
+    path = tmp_path / "rules.yaml"
+    default_rules = (server.ROOT_DIR / "scoring_rules.yaml").read_text()
+    path.write_text(default_rules.replace("when: {feature: count, below: 5}", "when: {feature: count, below: 7}"))
+    engine = RuleEngine(path, reload_interval=None)
+
+    profiles = [{"skills": ["Python"] * count} for count in range(1, 10)]
+    batch = score_profiles(profiles, engine)
+    for index, profile in enumerate(profiles):
+        expected = engine.evaluate("skills", profile["skills"])
+        assert float(batch["sections"]["skills"]["score"][index]) == expected[0]
+    assert engine.evaluate("skills", ["Python"] * 6) != server.analyze_skills(["Python"] * 6)
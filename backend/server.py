@@ -1,19 +1,47 @@
-from fastapi import FastAPI, HTTPException, Body, File, UploadFile
+from fastapi import FastAPI, HTTPException, Body, File, Header, Query, UploadFile
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 import uvicorn
+import asyncio
 import os
 import logging
 from pathlib import Path
-import httpx
 import json
+import hashlib
+import orjson
 from pydantic import BaseModel
 import uuid
 import io
 import PyPDF2
-import re
-from typing import Optional
+from typing import Optional, Set, Tuple
+from contextlib import asynccontextmanager
+from linkedin_client import LinkedInClient
+from circuit_breaker import AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+from retry_budget import RetryBudget
+from rate_limiter import (BACKGROUND, BATCH, MemoryBucketStore, Priority, RateLimiter, RateLimitTimeout,
+                          RedisBucketStore, current_priority, parse_windows, request_priority)
+from redis.asyncio import from_url as redis_from_url
+from redis_cache import RedisCache
+from memory_redis import MemoryRedis
+from job_queue import FINISHED, JobContext, JobQueue, JobWorkerPool, PermanentJobError, job_summary
+from profile_cache import ProfileCache, in_background_refresh
+from singleflight import SingleFlight, current_call
+from keyword_matcher import KeywordMatcher
+from resume_document import ResumeDocument
+from compute_pool import ComputePool, ComputeOverloaded
+from db_indexes import (PREVIOUS_SECTIONS_PROJECTION, PROFILE_FOR_RESUME_PROJECTION,
+                        STORED_PROFILE_PROJECTION, STORED_RESUME_ANALYSIS_PROJECTION,
+                        ensure_indexes)
+from resume_cache import ResumeCache, content_hash
+from response_cache import ResponseCache
+from rule_engine import RuleEngine
+from write_behind import WriteBehindBuffer
+from metrics import (InFlightMiddleware, MONGO_SECONDS, PARSE_RESUME_SECONDS, PROFILE_FALLBACKS, STAGE_SECONDS,
+                     mark_worker_exited, metrics_response, observe, record_circuit_transition, resume_file_type)
+from upload_spool import SpooledUpload, UploadSizeLimitMiddleware, UploadTooLarge
+from urllib.parse import unquote
 
 # /backend 
 ROOT_DIR = Path(__file__).parent
@@ -24,16 +52,6 @@ mongo_url = os.environ.get('MONGO_URL')
 client = AsyncIOMotorClient(mongo_url)
 db = client.get_database(os.environ.get('DB_NAME', 'linkedin_analyzer'))
 
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -44,12 +62,237 @@ logger = logging.getLogger(__name__)
 # LinkedIn API Configuration
 LINKEDIN_API_HOST = "linkedin-data-api.p.rapidapi.com"
 LINKEDIN_API_KEY = "e44d54a7damshf20519bc6b0ebffp14daaajsn8adfb44c57d1"
-LINKEDIN_API_URL = f"https://{LINKEDIN_API_HOST}"
+# Point at a local stand-in (e.g. perf.fake_linkedin_api) for load tests
+LINKEDIN_API_URL = os.environ.get('LINKEDIN_API_URL', f"https://{LINKEDIN_API_HOST}")
+
+# Shared state between uvicorn workers (caches, outbound rate limits); per-process when unset
+REDIS_URL = os.environ.get('REDIS_URL')
+redis_client = redis_from_url(REDIS_URL) if REDIS_URL else None
+
+# Profiles, analyses and resume results shared by every worker and replica through Redis
+shared_cache = RedisCache(
+    redis_client,
+    enabled=os.environ.get('SHARED_CACHE_ENABLED', 'true').lower() == 'true',
+    compress_min_bytes=int(os.environ.get('SHARED_CACHE_COMPRESS_MIN_BYTES', '1024')),
+    retry_interval=float(os.environ.get('SHARED_CACHE_RETRY_INTERVAL', '30')),
+    lock_ttl=float(os.environ.get('SHARED_CACHE_LOCK_TTL', '30')),
+    lock_wait=float(os.environ.get('SHARED_CACHE_LOCK_WAIT', '10')),
+)
+ANALYSIS_CACHE_TTL = float(os.environ.get('ANALYSIS_CACHE_TTL', '86400'))
+
+# Sections whose scoring costs more than fingerprinting them, and the combined
+# size (about characters plus 20 per skill) from which a profile looks up its
+# previous analysis to reuse them
+INCREMENTAL_SECTIONS = ("about", "skills")
+INCREMENTAL_MIN_CHARS = int(os.environ.get('INCREMENTAL_ANALYSIS_MIN_CHARS', '4000'))
+
+# Outbound calls wait for the plan's quota windows (e.g. "5/1,10000/2592000": 5 per
+# second, 10000 per 30 days) and for the quota reported in the API's response headers
+linkedin_rate_limiter = RateLimiter(
+    "linkedin_api",
+    windows=parse_windows(os.environ.get('LINKEDIN_RATE_LIMITS', '')),
+    store=RedisBucketStore(redis_client) if redis_client is not None else MemoryBucketStore(),
+    max_wait=float(os.environ.get('LINKEDIN_RATE_LIMIT_MAX_WAIT', '5')),
+    enabled=os.environ.get('LINKEDIN_RATE_LIMIT_ENABLED', 'true').lower() == 'true',
+)
+
+# Short-circuit to mock data while the LinkedIn API is failing or slow
+linkedin_breaker = CircuitBreaker(
+    "linkedin_api",
+    enabled=os.environ.get('LINKEDIN_BREAKER_ENABLED', 'true').lower() == 'true',
+    window=int(os.environ.get('LINKEDIN_BREAKER_WINDOW', '20')),
+    min_calls=int(os.environ.get('LINKEDIN_BREAKER_MIN_CALLS', '10')),
+    failure_rate=float(os.environ.get('LINKEDIN_BREAKER_FAILURE_RATE', '0.5')),
+    slow_call_seconds=float(os.environ.get('LINKEDIN_BREAKER_SLOW_CALL_SECONDS', '5')),
+    slow_call_rate=float(os.environ.get('LINKEDIN_BREAKER_SLOW_CALL_RATE', '0.8')),
+    open_seconds=float(os.environ.get('LINKEDIN_BREAKER_OPEN_SECONDS', '30')),
+    half_open_calls=int(os.environ.get('LINKEDIN_BREAKER_HALF_OPEN_CALLS', '3')),
+    on_transition=record_circuit_transition,
+)
+
+# Read timeout follows observed API latency, capped at LINKEDIN_READ_TIMEOUT
+linkedin_read_timeouts = AdaptiveTimeout(
+    maximum=float(os.environ.get('LINKEDIN_READ_TIMEOUT', '10')),
+    minimum=float(os.environ.get('LINKEDIN_MIN_READ_TIMEOUT', '1')),
+    percentile=float(os.environ.get('LINKEDIN_TIMEOUT_PERCENTILE', '0.99')),
+    multiplier=float(os.environ.get('LINKEDIN_TIMEOUT_MULTIPLIER', '2')),
+    enabled=os.environ.get('LINKEDIN_ADAPTIVE_TIMEOUT', 'true').lower() == 'true',
+)
+
+# Retries and hedged calls together add at most LINKEDIN_RETRY_BUDGET_RATIO extra load
+linkedin_retry_budget = RetryBudget(
+    ratio=float(os.environ.get('LINKEDIN_RETRY_BUDGET_RATIO', '0.1')),
+    max_tokens=float(os.environ.get('LINKEDIN_RETRY_BUDGET_BURST', '10')),
+    min_per_second=float(os.environ.get('LINKEDIN_RETRY_BUDGET_MIN_PER_SECOND', '0.1')),
+)
+
+# Shared connection pool for all outbound LinkedIn API calls
+linkedin_client = LinkedInClient(
+    base_url=LINKEDIN_API_URL,
+    headers={
+        "x-rapidapi-host": LINKEDIN_API_HOST,
+        "x-rapidapi-key": LINKEDIN_API_KEY
+    },
+    max_connections=int(os.environ.get('LINKEDIN_MAX_CONNECTIONS', '100')),
+    max_keepalive_connections=int(os.environ.get('LINKEDIN_MAX_KEEPALIVE_CONNECTIONS', '20')),
+    keepalive_expiry=float(os.environ.get('LINKEDIN_KEEPALIVE_EXPIRY', '30')),
+    http2=os.environ.get('LINKEDIN_HTTP2', 'false').lower() == 'true',
+    connect_timeout=float(os.environ.get('LINKEDIN_CONNECT_TIMEOUT', '3')),
+    read_timeout=float(os.environ.get('LINKEDIN_READ_TIMEOUT', '10')),
+    warmup=os.environ.get('LINKEDIN_WARMUP', 'true').lower() == 'true',
+    breaker=linkedin_breaker,
+    read_timeouts=linkedin_read_timeouts,
+    retry_attempts=int(os.environ.get('LINKEDIN_RETRY_ATTEMPTS', '2')),
+    retry_backoff=float(os.environ.get('LINKEDIN_RETRY_BACKOFF', '0.2')),
+    retry_max_backoff=float(os.environ.get('LINKEDIN_RETRY_MAX_BACKOFF', '2')),
+    hedging=os.environ.get('LINKEDIN_HEDGING', 'false').lower() == 'true',
+    hedge_percentile=float(os.environ.get('LINKEDIN_HEDGE_PERCENTILE', '0.95')),
+    retry_budget=linkedin_retry_budget,
+    rate_limiter=linkedin_rate_limiter,
+)
+
+# Mapped profile data cache (in-process LRU backed by a Mongo TTL collection)
+profile_cache = ProfileCache(
+    collection=db.profile_cache if os.environ.get('PROFILE_CACHE_MONGO', 'true').lower() == 'true' else None,
+    maxsize=int(os.environ.get('PROFILE_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('PROFILE_CACHE_TTL', '3600')),
+    stale_ttl=float(os.environ.get('PROFILE_CACHE_STALE_TTL', '86400')),
+    shared=shared_cache,
+)
+
+# Batch analysis limits
+BATCH_MAX_URLS = int(os.environ.get('BATCH_MAX_URLS', '500'))
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '8'))
+BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', '32'))
+
+# Concurrent fetch-and-analyze calls for the same username share one task
+profile_flights = SingleFlight()
+
+def warm_compute_worker():
+    """Run each analysis stage once so a new compute worker starts with everything loaded"""
+    profile_data = generate_mock_profile_data("warmup")
+    analyze_profile(profile_data)
+    optimize_linkedin_sections(profile_data, get_sample_resume_text())
+
+# CPU-bound stages run off the event loop (process, thread or inline)
+compute_pool = ComputePool(
+    kind=os.environ.get('COMPUTE_EXECUTOR', 'process'),
+    max_workers=int(os.environ.get('COMPUTE_WORKERS', '0')) or None,
+    max_queue=int(os.environ.get('COMPUTE_MAX_QUEUE', '64')),
+    initializer=warm_compute_worker,
+    mp_context=os.environ.get('COMPUTE_MP_CONTEXT', 'spawn'),
+)
+
+# Resume uploads are spooled in memory up to UPLOAD_MEMORY_BYTES, then to disk
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_MEMORY_BYTES = int(os.environ.get('UPLOAD_MEMORY_BYTES', str(1024 * 1024)))
+UPLOAD_MAX_PDF_PAGES = int(os.environ.get('UPLOAD_MAX_PDF_PAGES', '50'))
+# Allowance for the multipart framing and the profile_id field around the file
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+# Section scoring rules, re-read by every worker when the file changes
+scoring_rules = RuleEngine(
+    os.environ.get('SCORING_RULES_PATH', str(ROOT_DIR / 'scoring_rules.yaml')),
+    reload_interval=float(os.environ.get('SCORING_RULES_RELOAD_INTERVAL', '5')),
+)
+
+# Bump when analysis or optimisation output changes so cached results are recomputed
+SCORER_VERSION = "1"
+
+# Repeat uploads of the same file reuse its extracted text and optimisation results
+resume_cache = ResumeCache(
+    texts_collection=db.resume_texts if os.environ.get('RESUME_CACHE_MONGO', 'true').lower() == 'true' else None,
+    results_collection=db.resume_optimizations if os.environ.get('RESUME_CACHE_MONGO', 'true').lower() == 'true' else None,
+    maxsize=int(os.environ.get('RESUME_CACHE_SIZE', '256')),
+    ttl=float(os.environ.get('RESUME_CACHE_TTL', str(7 * 86400))),
+    shared=shared_cache,
+)
+
+# Opt-in write-behind persistence of profile analyses, off the request path
+profile_writes = WriteBehindBuffer(
+    db.profile_analyses,
+    key="profile_id",
+    enabled=os.environ.get('PROFILE_WRITE_BEHIND', 'false').lower() == 'true',
+    max_batch=int(os.environ.get('PROFILE_WRITE_BEHIND_BATCH', '100')),
+    flush_interval=float(os.environ.get('PROFILE_WRITE_BEHIND_INTERVAL', '0.5')),
+    max_queue=int(os.environ.get('PROFILE_WRITE_BEHIND_MAX_QUEUE', '1000')),
+)
+
+# Serialized bodies and ETags of the GET endpoints for stored analyses
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get('RESPONSE_CACHE_SIZE', '512')),
+    ttl=float(os.environ.get('RESPONSE_CACHE_TTL', '30')),
+)
+
+# Resume uploads with ?async=true are processed by job workers. With REDIS_URL the queue is shared,
+# so workers can also run on their own (python resume_worker.py); without it, jobs stay in this process
+resume_jobs = JobQueue(
+    redis_client if redis_client is not None else MemoryRedis(),
+    visibility_timeout=float(os.environ.get('RESUME_JOB_VISIBILITY_TIMEOUT', '300')),
+    max_attempts=int(os.environ.get('RESUME_JOB_MAX_ATTEMPTS', '3')),
+    retry_delay=float(os.environ.get('RESUME_JOB_RETRY_DELAY', '5')),
+    result_ttl=float(os.environ.get('RESUME_JOB_RESULT_TTL', '86400')),
+)
+resume_job_workers = JobWorkerPool(
+    resume_jobs,
+    {"resume": lambda context: run_resume_job(context)},
+    concurrency=int(os.environ.get('RESUME_JOB_WORKERS', '2')),
+    poll_interval=float(os.environ.get('RESUME_JOB_POLL_INTERVAL', '0.2')),
+)
+JOB_EVENTS_POLL_INTERVAL = float(os.environ.get('JOB_EVENTS_POLL_INTERVAL', '0.5'))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await linkedin_client.start()
+    await compute_pool.start()
+    await profile_writes.start()
+    resume_job_workers.start()
+    try:
+        await profile_cache.ensure_indexes()
+        await resume_cache.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not create cache indexes: {str(e)}")
+    try:
+        await ensure_indexes(db)
+    except Exception as e:
+        logger.warning(f"Could not create analysis indexes: {str(e)}")
+    yield
+    await resume_job_workers.close()
+    await asyncio.gather(*batch_writes)
+    await profile_writes.close()
+    await linkedin_client.close()
+    compute_pool.shutdown()
+    client.close()
+    if redis_client is not None:
+        await redis_client.aclose()
+    mark_worker_exited()
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_credentials=True,
+    allow_origins=["*"],
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.add_middleware(InFlightMiddleware, router=app.router)
+
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=["/api/upload-resume"],
+    max_bytes=UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD,
+)
 
 # Models
 class ProfileRequest(BaseModel):
     linkedin_url: str
 
+class BatchProfileRequest(BaseModel):
+    linkedin_urls: list[str]
+    concurrency: Optional[int] = None
+
 class ResumeUploadRequest(BaseModel):
     profile_id: str
 
@@ -71,82 +314,416 @@ class ResumeAnalysis(BaseModel):
 async def root():
     return {"message": "LinkedIn Profile Analyzer API"}
 
+def extract_linkedin_username(linkedin_url: str) -> Optional[str]:
+    """Extract the canonical (decoded, lowercase) username from a LinkedIn profile URL"""
+    if "linkedin.com/in/" not in linkedin_url:
+        return None
+    username = linkedin_url.split("linkedin.com/in/")[1].split("/")[0].split("?")[0]
+    return unquote(username).strip().lower() or None
+
+def outbound_priority() -> Priority:
+    """
+    Rate limiter priority of the current call: interactive, batch or background
+    refresh. Inside a coalesced fetch it follows the most urgent caller waiting
+    on the fetch, including callers that join while it waits for quota.
+    """
+    if in_background_refresh.get():
+        return BACKGROUND
+    call = current_call.get()
+    if call is not None and call.priority is not None:
+        return lambda: call.priority
+    return request_priority.get()
+
+async def load_linkedin_profile(username: str):
+    """Fetch and map a profile from the LinkedIn API, falling back to mock data"""
+    try:
+        logger.info(f"Attempting to fetch LinkedIn profile data for: {username}")
+        
+        with observe(STAGE_SECONDS, stage="rapidapi_fetch"):
+            response = await linkedin_client.get_profile_details(username, outbound_priority())
+        
+        if response.status_code == 200:
+            logger.info("Successfully fetched profile data from LinkedIn API")
+            api_profile_data = response.json()
+            
+            if isinstance(api_profile_data, dict):
+                # Map API response to our profile data structure
+                try:
+                    return map_api_response_to_profile_data(api_profile_data, username, fallback=False), True
+                except Exception as e:
+                    logger.error(f"Error mapping API response: {str(e)}")
+                    reason = "mapping_error"
+            else:
+                logger.warning("LinkedIn API returned an unexpected payload")
+                reason = "unexpected_payload"
+        else:
+            logger.warning(f"LinkedIn API returned status code: {response.status_code}")
+            logger.warning(f"API Response: {response.text}")
+            reason = "http_status"
+            
+    except CircuitOpenError:
+        # Skip the logging below, the breaker already logged why it opened
+        PROFILE_FALLBACKS.labels(reason="circuit_open").inc()
+        return generate_mock_profile_data(username), False
+    except RateLimitTimeout as e:
+        logger.warning(f"LinkedIn API quota unavailable for {username}: {str(e)}")
+        PROFILE_FALLBACKS.labels(reason="rate_limited").inc()
+        return generate_mock_profile_data(username), False
+    except Exception as api_error:
+        logger.error(f"Error fetching from LinkedIn API: {str(api_error)}")
+        reason = "api_error"
+    
+    logger.warning("Falling back to mock data")
+    PROFILE_FALLBACKS.labels(reason=reason).inc()
+    return generate_mock_profile_data(username), False
+
+async def get_linkedin_profile(username: str) -> dict:
+    """Return mapped profile data, served from the profile cache when possible"""
+    return await profile_cache.get_or_load(username, lambda: load_linkedin_profile(username))
+
+async def find_previous_sections(username: str) -> Optional[dict]:
+    """Section results of the latest analysis of this username, queued or stored, for incremental re-analysis"""
+    pending = profile_writes.latest_pending("username", username, "created_at")
+    if pending is not None:
+        return pending["analysis_results"].get("sections")
+    try:
+        with observe(MONGO_SECONDS, collection="profile_analyses", operation="find"):
+            previous = await db.profile_analyses.find_one(
+                {"username": username}, PREVIOUS_SECTIONS_PROJECTION, sort=[("created_at", -1)]
+            )
+    except Exception as e:
+        logger.warning(f"Could not load previous analysis of {username}: {str(e)}")
+        return None
+    return previous["analysis_results"].get("sections") if previous else None
+
+async def fetch_and_analyze_profile(username: str):
+    """
+    Fetch a profile and analyze it, sharing the work between concurrent callers.
+    Returns (profile_data, analysis_results, sections reused from the last stored
+    analysis, whether the whole analysis came from the shared cache).
+    """
+    async def fetch_and_analyze():
+        profile_data = await get_linkedin_profile(username)
+        analysis_results, reused, shared_hit = await analyze_profile_shared(profile_data, username)
+        return profile_data, analysis_results, reused, shared_hit
+
+    return await profile_flights.do(username, fetch_and_analyze, current_priority(outbound_priority()))
+
+async def analyze_profile_here(profile_data: dict, username: Optional[str]):
+    # The lookup costs a database round trip, which only large sections save
+    previous_sections = None
+    if username and incremental_worthwhile(profile_data):
+        previous_sections = await find_previous_sections(username)
+    with observe(STAGE_SECONDS, stage="analyze_profile"):
+        return await compute_pool.run("analyze_profile", analyze_profile_incremental, profile_data, previous_sections)
+
+async def analyze_profile_shared(profile_data: dict, username: Optional[str]):
+    """
+    Analyze a profile, reusing an analysis of identical data cached by any worker
+    in the shared tier. Returns (analysis, sections reused incrementally, shared
+    cache hit); a shared hit reuses no sections in the incremental sense.
+    """
+    if not shared_cache.available:
+        return (*await analyze_profile_here(profile_data, username), False)
+    scoring_rules.current()
+    key = f"analysis:{SCORER_VERSION}:{scoring_rules.version}:{content_hash(profile_data)}"
+    cached = await shared_cache.get(key)
+    if cached is None:
+        async with shared_cache.single_flight(key):
+            cached = await shared_cache.get(key)
+            if cached is None:
+                analysis_results, reused = await analyze_profile_here(profile_data, username)
+                await shared_cache.set(key, analysis_results, ANALYSIS_CACHE_TTL)
+                return analysis_results, reused, False
+    return cached, 0, True
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
+@app.get("/api/compute/stats")
+async def compute_stats():
+    return compute_pool.get_stats()
+
+@app.get("/api/persistence/stats")
+async def persistence_stats():
+    return {"profile_analyses": profile_writes.get_stats()}
+
+@app.get("/api/upstream/stats")
+async def upstream_stats():
+    return {
+        "linkedin_api": {
+            "circuit_breaker": linkedin_breaker.get_stats(),
+            "read_timeout": linkedin_read_timeouts.get_stats(),
+            "requests": linkedin_client.get_stats(),
+            "rate_limiter": linkedin_rate_limiter.get_stats()
+        }
+    }
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return {
+        "profile_cache": profile_cache.get_stats(),
+        "resume_cache": resume_cache.get_stats(),
+        "response_cache": response_cache.get_stats(),
+        "shared_cache": shared_cache.get_stats(),
+        "single_flight": profile_flights.get_stats()
+    }
+
 @app.post("/api/fetch-profile")
 async def fetch_profile(request: ProfileRequest):
     # Extract username from LinkedIn URL
-    if "linkedin.com/in/" in request.linkedin_url:
-        username = request.linkedin_url.split("linkedin.com/in/")[1].split("/")[0].split("?")[0]
+    username = extract_linkedin_username(request.linkedin_url)
+    if username:
         logger.info(f"Extracted username: {username} from URL: {request.linkedin_url}")
     else:
         logger.warning(f"Invalid LinkedIn URL format: {request.linkedin_url}")
         raise HTTPException(status_code=400, detail="Invalid LinkedIn URL format")
         
     try:
-        # Attempt to fetch profile data from LinkedIn API
-        headers = {
-            "x-rapidapi-host": LINKEDIN_API_HOST,
-            "x-rapidapi-key": LINKEDIN_API_KEY
-        }
-        
-        async with httpx.AsyncClient() as client:
-            # Try to fetch using profile-details endpoint
-            try:
-                logger.info(f"Attempting to fetch LinkedIn profile data for: {username}")
-                api_url = f"{LINKEDIN_API_URL}/profile-details?linkedin_id={username}"
-                logger.info(f"API URL: {api_url}")
-                
-                response = await client.get(api_url, headers=headers)
-                
-                if response.status_code == 200:
-                    logger.info("Successfully fetched profile data from LinkedIn API")
-                    api_profile_data = response.json()
-                    
-                    # Map API response to our profile data structure
-                    profile_data = map_api_response_to_profile_data(api_profile_data, username)
-                else:
-                    logger.warning(f"LinkedIn API returned status code: {response.status_code}")
-                    logger.warning(f"API Response: {response.text}")
-                    logger.warning("Falling back to mock data")
-                    profile_data = generate_mock_profile_data(username)
-                    
-            except Exception as api_error:
-                logger.error(f"Error fetching from LinkedIn API: {str(api_error)}")
-                logger.warning("Falling back to mock data")
-                profile_data = generate_mock_profile_data(username)
-        
-        # Analyze the profile
-        analysis_results = analyze_profile(profile_data)
+        # Fetch and analyze the profile
+        profile_data, analysis_results, reused_sections, shared_cache_hit = await fetch_and_analyze_profile(username)
         
         # Generate content suggestions
-        content_suggestions = generate_content_suggestions(profile_data, analysis_results)
+        with observe(STAGE_SECONDS, stage="generate_content_suggestions"):
+            content_suggestions = generate_content_suggestions(profile_data, analysis_results)
         
         # Store results in database
         profile_analysis = {
             "profile_id": str(uuid.uuid4()),
             "linkedin_url": request.linkedin_url,
+            "username": username,
             "profile_data": profile_data,
             "analysis_results": analysis_results,
             "content_suggestions": content_suggestions,
             "created_at": str(datetime.now())
         }
         
-        await db.profile_analyses.insert_one(profile_analysis)
+        with observe(MONGO_SECONDS, collection="profile_analyses", operation="insert"):
+            await profile_writes.insert(profile_analysis)
         
         return {
             "profile_id": profile_analysis["profile_id"],
             "profile_data": profile_data,
             "analysis_results": analysis_results,
-            "content_suggestions": content_suggestions
+            "content_suggestions": content_suggestions,
+            "reused_sections": reused_sections,
+            "shared_cache_hit": shared_cache_hit
         }
             
+    except ComputeOverloaded as e:
+        logger.warning(f"Rejecting profile analysis: {str(e)}")
+        raise HTTPException(status_code=503, detail="Server is busy, please retry shortly")
     except Exception as e:
         logger.error(f"Error processing LinkedIn profile: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing LinkedIn profile: {str(e)}")
 
+@app.get("/api/profiles/{profile_id}")
+async def get_profile_analysis(profile_id: str, if_none_match: Optional[str] = Header(None)):
+    """Stored profile analysis, without fetching or analysing anything"""
+    key = ("profile", profile_id)
+    try:
+        entry = response_cache.get(key)
+        if entry is None:
+            with observe(MONGO_SECONDS, collection="profile_analyses", operation="find"):
+                profile_analysis = await profile_writes.find_one({"profile_id": profile_id}, STORED_PROFILE_PROJECTION)
+            if not profile_analysis:
+                raise HTTPException(status_code=404, detail="Profile not found")
+            entry = response_cache.set(key, profile_analysis)
+        return response_cache.respond(entry, if_none_match)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving profile analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving profile analysis: {str(e)}")
+
+@app.get("/api/profiles/{profile_id}/resume-analysis")
+async def get_resume_analysis(profile_id: str, if_none_match: Optional[str] = Header(None)):
+    """Latest stored resume analysis for a profile"""
+    key = ("resume-analysis", profile_id)
+    try:
+        entry = response_cache.get(key)
+        if entry is None:
+            with observe(MONGO_SECONDS, collection="resume_analyses", operation="find"):
+                resume_analysis = await db.resume_analyses.find_one(
+                    {"profile_id": profile_id}, STORED_RESUME_ANALYSIS_PROJECTION
+                )
+            if not resume_analysis:
+                raise HTTPException(status_code=404, detail="Resume analysis not found")
+            entry = response_cache.set(key, resume_analysis)
+        return response_cache.respond(entry, if_none_match)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving resume analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving resume analysis: {str(e)}")
+
+@app.post("/api/fetch-profiles")
+async def fetch_profiles(request: BatchProfileRequest):
+    """Analyze many profiles, streaming one NDJSON line per profile as it completes"""
+    if not request.linkedin_urls:
+        raise HTTPException(status_code=400, detail="No LinkedIn URLs provided")
+    if len(request.linkedin_urls) > BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"Too many LinkedIn URLs (maximum is {BATCH_MAX_URLS})")
+    
+    concurrency = max(1, min(request.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    
+    return StreamingResponse(
+        stream_profile_analyses(request.linkedin_urls, concurrency),
+        media_type="application/x-ndjson"
+    )
+
+# Bulk writes of streamed batches whose client went away mid-stream
+batch_writes: Set[asyncio.Task] = set()
+
+async def persist_profile_analyses(profile_analyses) -> Optional[str]:
+    """Write a streamed batch with a single bulk write, returning the error if it failed"""
+    try:
+        with observe(MONGO_SECONDS, collection="profile_analyses", operation="insert_many"):
+            await db.profile_analyses.insert_many(profile_analyses, ordered=False)
+        return None
+    except Exception as e:
+        logger.error(f"Error persisting batch of profile analyses: {str(e)}")
+        return f"Error persisting profile analyses: {str(e)}"
+    finally:
+        profile_writes.release(profile_analyses)
+
+async def stream_profile_analyses(linkedin_urls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def analyze_one(index, linkedin_url):
+        # Each task has its own context, so this only affects this profile's API calls
+        request_priority.set(BATCH)
+        result = {"index": index, "linkedin_url": linkedin_url}
+        username = extract_linkedin_username(linkedin_url)
+        if not username:
+            result["error"] = "Invalid LinkedIn URL format"
+            return result, None
+        
+        try:
+            async with semaphore:
+                profile_data, analysis_results, reused_sections, shared_cache_hit = \
+                    await fetch_and_analyze_profile(username)
+                with observe(STAGE_SECONDS, stage="generate_content_suggestions"):
+                    content_suggestions = generate_content_suggestions(profile_data, analysis_results)
+        except Exception as e:
+            logger.error(f"Error processing LinkedIn profile {linkedin_url}: {str(e)}")
+            result["error"] = f"Error processing LinkedIn profile: {str(e)}"
+            return result, None
+        
+        profile_analysis = {
+            "profile_id": str(uuid.uuid4()),
+            "linkedin_url": linkedin_url,
+            "username": username,
+            "profile_data": profile_data,
+            "analysis_results": analysis_results,
+            "content_suggestions": content_suggestions,
+            "created_at": str(datetime.now())
+        }
+        result.update({
+            "profile_id": profile_analysis["profile_id"],
+            "profile_data": profile_data,
+            "analysis_results": analysis_results,
+            "content_suggestions": content_suggestions,
+            "reused_sections": reused_sections,
+            "shared_cache_hit": shared_cache_hit
+        })
+        return result, profile_analysis
+    
+    tasks = [asyncio.create_task(analyze_one(index, url)) for index, url in enumerate(linkedin_urls)]
+    profile_analyses = []
+    errors = 0
+    streamed = False
+    try:
+        for next_completed in asyncio.as_completed(tasks):
+            result, profile_analysis = await next_completed
+            if profile_analysis is None:
+                errors += 1
+            else:
+                # Readable by profile_id as soon as the client has it, until the batch is written
+                profile_writes.hold(profile_analysis)
+                profile_analyses.append(profile_analysis)
+            yield json.dumps(result, default=str) + "\n"
+        streamed = True
+    finally:
+        # Stop outstanding work if the client went away mid-stream
+        for task in tasks:
+            task.cancel()
+        # but still write the profiles it was sent
+        if not streamed and profile_analyses:
+            write = asyncio.create_task(persist_profile_analyses(profile_analyses))
+            batch_writes.add(write)
+            write.add_done_callback(batch_writes.discard)
+    
+    # Persist the whole batch with a single bulk write
+    summary = {"total": len(linkedin_urls), "succeeded": len(profile_analyses), "failed": errors, "persisted": 0}
+    if profile_analyses:
+        error = await persist_profile_analyses(profile_analyses)
+        if error is None:
+            summary["persisted"] = len(profile_analyses)
+        else:
+            summary["error"] = error
+    
+    yield json.dumps({"summary": summary}) + "\n"
+
+def profile_section_inputs(profile_data):
+    """(section, input) pairs that analyze_profile scores, in order; sections without input are left out"""
+    inputs = []
+    if "headline" in profile_data:
+        inputs.append(("headline", profile_data["headline"]))
+    
+    # In some APIs the about section is called "summary"
+    about_text = profile_data.get("about", profile_data.get("summary", ""))
+    if about_text:
+        inputs.append(("about", about_text))
+    
+    for section in ["experience", "education", "skills"]:
+        if section in profile_data:
+            inputs.append((section, profile_data[section]))
+    
+    inputs.append(("certifications", profile_data.get("certifications", [])))
+    inputs.append(("recommendations", profile_data.get("recommendations", [])))
+    inputs.append(("visuals", {
+        "has_profile_image": profile_data.get("has_profile_image", False),
+        "has_banner": profile_data.get("has_banner", False)
+    }))
+    inputs.append(("featured", profile_data.get("featured", [])))
+    inputs.append(("activity", profile_data.get("activity", [])))
+    return inputs
+
+def incremental_worthwhile(profile_data) -> bool:
+    """
+    Whether reusing earlier section results can beat re-scoring: only the
+    text-heavy INCREMENTAL_SECTIONS score slower than they fingerprint, and
+    only once they are large enough to pay for looking up the last analysis.
+    """
+    about = profile_data.get("about", profile_data.get("summary", ""))
+    skills = profile_data.get("skills", [])
+    size = (len(about) if isinstance(about, str) else 0) + 20 * (len(skills) if isinstance(skills, list) else 0)
+    return size >= INCREMENTAL_MIN_CHARS
+
+def section_fingerprint(section, section_input, rules_version):
+    """Fingerprint of a section's input under one version of the scoring rules"""
+    digest = hashlib.blake2b(f"{rules_version}:{section}:".encode(), digest_size=8)
+    digest.update(orjson.dumps(section_input, option=orjson.OPT_SORT_KEYS, default=str))
+    return digest.hexdigest()
+
 def analyze_profile(profile_data):
     """
     Analyze LinkedIn profile data and provide comprehensive feedback
     """
+    return analyze_profile_incremental(profile_data)[0]
+
+def analyze_profile_incremental(profile_data, previous_sections=None):
+    """
+    analyze_profile that reuses the results in previous_sections (the "sections"
+    of an earlier analysis) whose fingerprint still matches, re-scoring only the
+    sections that changed. Only INCREMENTAL_SECTIONS of profiles that pass
+    incremental_worthwhile() are fingerprinted; everything else is re-scored.
+    Returns (analysis, number of sections reused).
+    """
     analysis = {
         "overall_score": 0,
         "score_categories": {
@@ -158,99 +735,34 @@ def analyze_profile(profile_data):
         "sections": {}
     }
     
-    # Analyze headline
-    if "headline" in profile_data:
-        headline_score, headline_feedback, headline_category_scores = analyze_headline(profile_data["headline"])
-        analysis["sections"]["headline"] = {
-            "score": headline_score,
-            "feedback": headline_feedback,
-            "category_scores": headline_category_scores
-        }
-    
-    # Analyze about section (in some APIs it's called "summary")
-    about_text = profile_data.get("about", profile_data.get("summary", ""))
-    if about_text:
-        about_score, about_feedback, about_category_scores = analyze_about(about_text)
-        analysis["sections"]["about"] = {
-            "score": about_score,
-            "feedback": about_feedback,
-            "category_scores": about_category_scores
-        }
-    
-    # Analyze experience
-    if "experience" in profile_data:
-        exp_score, exp_feedback, exp_category_scores = analyze_experience(profile_data["experience"])
-        analysis["sections"]["experience"] = {
-            "score": exp_score,
-            "feedback": exp_feedback,
-            "category_scores": exp_category_scores
-        }
-    
-    # Analyze education
-    if "education" in profile_data:
-        edu_score, edu_feedback, edu_category_scores = analyze_education(profile_data["education"])
-        analysis["sections"]["education"] = {
-            "score": edu_score,
-            "feedback": edu_feedback,
-            "category_scores": edu_category_scores
-        }
-    
-    # Analyze skills
-    if "skills" in profile_data:
-        skills_score, skills_feedback, skills_category_scores = analyze_skills(profile_data["skills"])
-        analysis["sections"]["skills"] = {
-            "score": skills_score,
-            "feedback": skills_feedback,
-            "category_scores": skills_category_scores
+    # Score each changed section with the current scoring rules
+    sections = scoring_rules.current()
+    rules_version = scoring_rules.version
+    previous_sections = previous_sections or {}
+    incremental = incremental_worthwhile(profile_data)
+    reused = 0
+    for section, section_input in profile_section_inputs(profile_data):
+        fingerprint = None
+        if incremental and section in INCREMENTAL_SECTIONS:
+            fingerprint = section_fingerprint(section, section_input, rules_version)
+            previous = previous_sections.get(section)
+            if previous is not None and previous.get("fingerprint") == fingerprint:
+                analysis["sections"][section] = {
+                    "score": previous["score"],
+                    "feedback": previous["feedback"],
+                    "category_scores": previous["category_scores"],
+                    "fingerprint": fingerprint
+                }
+                reused += 1
+                continue
+        score, feedback, category_scores = sections[section].evaluate(section_input)
+        analysis["sections"][section] = {
+            "score": score,
+            "feedback": feedback,
+            "category_scores": category_scores
         }
-    
-    # Analyze certifications
-    certifications = profile_data.get("certifications", [])
-    cert_score, cert_feedback, cert_category_scores = analyze_certifications(certifications)
-    analysis["sections"]["certifications"] = {
-        "score": cert_score,
-        "feedback": cert_feedback,
-        "category_scores": cert_category_scores
-    }
-    
-    # Analyze recommendations
-    recommendations = profile_data.get("recommendations", [])
-    rec_score, rec_feedback, rec_category_scores = analyze_recommendations(recommendations)
-    analysis["sections"]["recommendations"] = {
-        "score": rec_score,
-        "feedback": rec_feedback,
-        "category_scores": rec_category_scores
-    }
-    
-    # Analyze visuals (profile picture and banner)
-    visuals = {
-        "has_profile_image": profile_data.get("has_profile_image", False),
-        "has_banner": profile_data.get("has_banner", False)
-    }
-    visuals_score, visuals_feedback, visuals_category_scores = analyze_visuals(visuals)
-    analysis["sections"]["visuals"] = {
-        "score": visuals_score,
-        "feedback": visuals_feedback,
-        "category_scores": visuals_category_scores
-    }
-    
-    # Analyze featured section
-    featured = profile_data.get("featured", [])
-    featured_score, featured_feedback, featured_category_scores = analyze_featured(featured)
-    analysis["sections"]["featured"] = {
-        "score": featured_score,
-        "feedback": featured_feedback,
-        "category_scores": featured_category_scores
-    }
-    
-    # Analyze activity
-    activity = profile_data.get("activity", [])
-    activity_score, activity_feedback, activity_category_scores = analyze_activity(activity)
-    analysis["sections"]["activity"] = {
-        "score": activity_score,
-        "feedback": activity_feedback,
-        "category_scores": activity_category_scores
-    }
+        if fingerprint is not None:
+            analysis["sections"][section]["fingerprint"] = fingerprint
     
     # Calculate category scores by averaging across all sections
     for category in ["completeness", "relevance", "impact", "keywords"]:
@@ -267,608 +779,47 @@ def analyze_profile(profile_data):
     # Provide overall recommendations
     analysis["overall_recommendations"] = generate_overall_recommendations(analysis)
     
-    return analysis
+    return analysis, reused
 
 def analyze_headline(headline):
     """Analyze the headline section"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    # Assess completeness (25 points)
-    if headline and len(headline) > 10:
-        category_scores["completeness"] = 15
-        if len(headline) > 30:
-            category_scores["completeness"] = 25
-    else:
-        feedback.append("Your headline is too short. Add more relevant information.")
-    
-    # Assess keywords (25 points)
-    keyword_count = 0
-    keywords = ["leader", "expert", "specialist", "manager", "developer", 
-                "engineer", "professional", "consultant", "strategist"]
-    
-    for keyword in keywords:
-        if headline and keyword.lower() in headline.lower():
-            keyword_count += 1
-    
-    if keyword_count > 0:
-        category_scores["keywords"] = min(25, keyword_count * 8)
-    else:
-        feedback.append("Consider adding industry-relevant keywords to your headline.")
-    
-    # Assess impact (25 points)
-    if headline and any(char in headline for char in "|•★✓✔"):
-        category_scores["impact"] = 25
-        feedback.append("Good use of special characters to make your headline stand out.")
-    else:
-        category_scores["impact"] = 10
-        feedback.append("Consider using separators (|, •) to structure your headline and make it more scannable.")
-    
-    # Assess relevance (25 points) - placeholder for now
-    category_scores["relevance"] = min(25, (category_scores["keywords"] / 25) * 25)
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    # Final assessment
-    if score < 25:
-        feedback.append("Your headline needs significant improvement to attract attention.")
-    elif score < 50:
-        feedback.append("Your headline is basic and could be more compelling.")
-    elif score < 75:
-        feedback.append("Your headline is good but has room for improvement.")
-    else:
-        feedback.append("Your headline is excellent and likely to catch attention.")
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("headline", headline)
 
 def analyze_about(about):
     """Analyze the about section"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    # Assess completeness (25 points) - check length
-    if about:
-        if len(about) < 50:
-            category_scores["completeness"] = 5
-            feedback.append("Your about section is too short. Aim for at least 200-300 characters.")
-        elif len(about) < 200:
-            category_scores["completeness"] = 10
-            feedback.append("Your about section is on the shorter side. Consider expanding it.")
-        elif len(about) < 1000:
-            category_scores["completeness"] = 20
-            feedback.append("Your about section has a good length.")
-        else:
-            category_scores["completeness"] = 25
-            feedback.append("Your about section is comprehensive, but ensure it remains focused and relevant.")
-    else:
-        feedback.append("You don't have an about section. This is a crucial part of your profile.")
-    
-    # Assess impact (25 points) - check for storytelling elements
-    storytelling_indicators = ["journey", "passion", "learned", "discovered", "built", 
-                               "created", "led", "achieved", "mission", "vision"]
-    
-    storytelling_score = 0
-    if about:
-        for indicator in storytelling_indicators:
-            if indicator.lower() in about.lower():
-                storytelling_score += 3
-    
-    category_scores["impact"] = min(25, storytelling_score)
-    
-    if storytelling_score < 15:
-        feedback.append("Your about section could benefit from more storytelling elements to engage readers.")
-    else:
-        feedback.append("Good use of storytelling in your about section.")
-    
-    # Assess keywords (25 points) - Check for industry-relevant terms and professional vocabulary
-    # This is a placeholder - in a real implementation, we would check against industry-specific terms
-    if about:
-        keyword_density = min(25, len(about.split()) / 20)  # Simple placeholder calculation
-        category_scores["keywords"] = keyword_density
-    
-    # Assess relevance (25 points) - Check for personal brand alignment and first-person narrative
-    if about and ("I am" in about or "I have" in about or "I " in about):
-        category_scores["relevance"] = 20
-        feedback.append("Good use of first-person narrative in your about section.")
-    else:
-        category_scores["relevance"] = 5
-        feedback.append("Consider using first-person narrative for a more personal touch.")
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    # Final assessment
-    if score < 25:
-        feedback.append("Your about section needs significant improvement.")
-    elif score < 50:
-        feedback.append("Your about section is basic and could be more compelling.")
-    elif score < 75:
-        feedback.append("Your about section is good but has room for improvement.")
-    else:
-        feedback.append("Your about section is excellent and likely to engage readers.")
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("about", about)
 
 def analyze_experience(experience):
     """Analyze the experience section"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    if not experience or len(experience) == 0:
-        feedback.append("Your experience section is empty. This is a crucial part of your profile.")
-        return 0, feedback, category_scores
-    
-    # Assess completeness (25 points)
-    num_experiences = len(experience)
-    if num_experiences < 2:
-        category_scores["completeness"] = 5
-        feedback.append("Consider adding more professional experiences to showcase your career progression.")
-    elif num_experiences < 4:
-        category_scores["completeness"] = 15
-        feedback.append("You have a good number of experiences listed.")
-    else:
-        category_scores["completeness"] = 25
-        feedback.append("You have a comprehensive list of experiences. Ensure they're all relevant.")
-    
-    # Check description quality for keyword and impact scoring
-    descriptions_with_bullets = 0
-    descriptions_with_achievements = 0
-    
-    achievement_indicators = ["achieved", "increased", "reduced", "improved", "led", 
-                             "managed", "created", "developed", "implemented", "launched"]
-    
-    for exp in experience:
-        description = exp.get("description", "")
-        
-        if description and ("•" in description or "-" in description or "*" in description):
-            descriptions_with_bullets += 1
-        
-        for indicator in achievement_indicators:
-            if description and indicator.lower() in description.lower():
-                descriptions_with_achievements += 1
-                break
-    
-    # Assess impact (25 points)
-    if descriptions_with_achievements >= num_experiences / 2:
-        category_scores["impact"] = 25
-        feedback.append("Good focus on achievements in your experience descriptions.")
-    else:
-        category_scores["impact"] = 10
-        feedback.append("Focus more on achievements rather than responsibilities in your descriptions.")
-    
-    # Assess keywords (25 points) 
-    if descriptions_with_bullets >= num_experiences / 2:
-        category_scores["keywords"] = 20
-        feedback.append("Good use of bullet points in your experience descriptions.")
-    else:
-        category_scores["keywords"] = 10
-        feedback.append("Consider using bullet points to make your experience descriptions more readable.")
-    
-    # Assess relevance (25 points)
-    # Without a target role, we'll use a basic assessment based on descriptions and duration
-    has_gaps = False  # This would require parsing dates and checking for gaps
-    
-    if has_gaps:
-        category_scores["relevance"] = 10
-        feedback.append("There appear to be gaps in your employment history. Consider explaining these.")
-    else:
-        category_scores["relevance"] = 20
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    # Final assessment
-    if score < 30:
-        feedback.append("Your experience section needs significant improvement.")
-    elif score < 60:
-        feedback.append("Your experience section is basic and could be more compelling.")
-    elif score < 80:
-        feedback.append("Your experience section is good but has room for improvement.")
-    else:
-        feedback.append("Your experience section is excellent and effectively showcases your professional journey.")
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("experience", experience)
 
 def analyze_education(education):
     """Analyze the education section"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    if not education or len(education) == 0:
-        feedback.append("Your education section is empty. Consider adding your educational background.")
-        return 0, feedback, category_scores
-    
-    # Assess completeness (25 points)
-    complete_entries = 0
-    for edu in education:
-        if all(key in edu and edu[key] for key in ["school", "degree", "field_of_study", "start_date", "end_date"]):
-            complete_entries += 1
-    
-    if complete_entries == len(education):
-        category_scores["completeness"] = 25
-        feedback.append("Your education entries are complete with all relevant information.")
-    else:
-        category_scores["completeness"] = 12
-        feedback.append("Some of your education entries are missing information. Consider completing them.")
-    
-    # Assess impact (25 points) - Check for descriptions/activities
-    entries_with_description = 0
-    for edu in education:
-        if "description" in edu and edu["description"] and len(edu["description"]) > 50:
-            entries_with_description += 1
-    
-    if entries_with_description > 0:
-        category_scores["impact"] = 25
-        feedback.append("Good job including details about your educational activities and achievements.")
-    else:
-        category_scores["impact"] = 10
-        feedback.append("Consider adding descriptions to your education entries highlighting relevant coursework, achievements, or activities.")
-    
-    # Assess relevance (25 points) - Check for recency and continuous learning
-    has_recent_education = False
-    # This would require parsing dates
-    
-    if has_recent_education:
-        category_scores["relevance"] = 25
-        feedback.append("Your commitment to continuous learning is evident from your recent education.")
-    else:
-        category_scores["relevance"] = 15
-        feedback.append("Consider adding recent courses or certifications to demonstrate continuous learning.")
-    
-    # Assess keywords (25 points) - Check for education-related keywords
-    # Simplified approach for now
-    category_scores["keywords"] = 15
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    # Final assessment
-    if score < 30:
-        feedback.append("Your education section needs improvement.")
-    elif score < 60:
-        feedback.append("Your education section is adequate but could be enhanced.")
-    elif score < 80:
-        feedback.append("Your education section is good with minor room for improvement.")
-    else:
-        feedback.append("Your education section is excellent and effectively showcases your academic background.")
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("education", education)
 
 def analyze_skills(skills):
     """Analyze the skills section"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    if not skills or len(skills) == 0:
-        feedback.append("Your skills section is empty. Adding relevant skills is crucial for discoverability.")
-        return 0, feedback, category_scores
-    
-    # Assess completeness (25 points) - based on number of skills
-    num_skills = len(skills)
-    if num_skills < 5:
-        category_scores["completeness"] = 5
-        feedback.append("Consider adding more skills to your profile. Aim for at least 15-20 relevant skills.")
-    elif num_skills < 10:
-        category_scores["completeness"] = 12
-        feedback.append("You have a good start with your skills, but adding more would improve visibility.")
-    elif num_skills < 20:
-        category_scores["completeness"] = 20
-        feedback.append("You have a good number of skills listed.")
-    else:
-        category_scores["completeness"] = 25
-        feedback.append("You have an impressive list of skills. Ensure they're all relevant and current.")
-    
-    # Assess keywords (25 points) - check for skill categories and industry relevance
-    technical_skills = ["programming", "coding", "software", "development", "engineering"]
-    soft_skills = ["leadership", "communication", "teamwork", "collaboration", "problem-solving"]
-    domain_skills = ["marketing", "sales", "finance", "hr", "design", "product"]
-    
-    has_technical = any(any(tech in skill.lower() for tech in technical_skills) for skill in skills)
-    has_soft = any(any(soft in skill.lower() for soft in soft_skills) for skill in skills)
-    has_domain = any(any(domain in skill.lower() for domain in domain_skills) for skill in skills)
-    
-    keyword_score = 0
-    if has_technical:
-        keyword_score += 8
-    if has_soft:
-        keyword_score += 8
-    if has_domain:
-        keyword_score += 9
-    
-    category_scores["keywords"] = keyword_score
-    
-    if keyword_score < 8:
-        feedback.append("Try to include a more diverse set of skills across different categories.")
-    elif keyword_score < 17:
-        feedback.append("You have skills in a couple of categories. Consider adding more diverse skills.")
-    else:
-        feedback.append("Great job showcasing a diverse range of skills across different categories.")
-    
-    # Assess relevance (25 points) 
-    # Since we don't have the target role, we'll use a placeholder approach
-    # In a full implementation, we'd compare skills against a target role's requirements
-    category_scores["relevance"] = min(25, num_skills / 20 * 25)  # Placeholder: more skills = more likely to be relevant
-    
-    # Assess impact (25 points)
-    # For skills, "impact" is less applicable, so we'll focus on endorsements and skill arrangement
-    # This is a placeholder since we don't have endorsement data
-    category_scores["impact"] = min(25, num_skills / 25 * 25)  # Placeholder
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    # Final assessment
-    if score < 30:
-        feedback.append("Your skills section needs significant improvement.")
-    elif score < 60:
-        feedback.append("Your skills section is basic and could be more comprehensive.")
-    elif score < 80:
-        feedback.append("Your skills section is good but could be more strategic.")
-    else:
-        feedback.append("Your skills section is excellent and strategically positions you in your field.")
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("skills", skills)
 
 def analyze_certifications(certifications):
     """Analyze certifications section"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    if not certifications or len(certifications) == 0:
-        feedback.append("You don't have any certifications listed. Consider adding relevant certifications to demonstrate your expertise.")
-        return 0, feedback, category_scores
-    
-    # Assess completeness (25 points)
-    num_certs = len(certifications)
-    if num_certs == 1:
-        category_scores["completeness"] = 10
-        feedback.append("You have one certification listed. Consider adding more if applicable.")
-    elif num_certs <= 3:
-        category_scores["completeness"] = 20
-        feedback.append("You have a good number of certifications listed.")
-    else:
-        category_scores["completeness"] = 25
-        feedback.append("You have an impressive list of certifications.")
-    
-    # Assess relevance (25 points) - placeholder calculation
-    category_scores["relevance"] = 15  # Default middle value
-    
-    # Assess impact (25 points) - placeholder calculation
-    category_scores["impact"] = 15  # Default middle value
-    
-    # Assess keywords (25 points) - placeholder calculation
-    category_scores["keywords"] = 15  # Default middle value
-    
-    # Add general feedback
-    feedback.append("Make sure your certifications are current and from reputable organizations.")
-    feedback.append("Consider highlighting your most prestigious or relevant certifications in your featured section.")
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("certifications", certifications)
 
 def analyze_recommendations(recommendations):
     """Analyze recommendations section"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    if not recommendations or len(recommendations) == 0:
-        feedback.append("You don't have any recommendations. Request recommendations from colleagues, managers, or clients to boost credibility.")
-        return 0, feedback, category_scores
-    
-    # Assess completeness (25 points)
-    num_recs = len(recommendations)
-    if num_recs == 1:
-        category_scores["completeness"] = 10
-        feedback.append("You have one recommendation. Try to get 3-5 quality recommendations.")
-    elif num_recs <= 3:
-        category_scores["completeness"] = 20
-        feedback.append("You have a good number of recommendations.")
-    else:
-        category_scores["completeness"] = 25
-        feedback.append("You have an impressive number of recommendations.")
-    
-    # Assess impact (25 points) - placeholder calculation
-    category_scores["impact"] = min(25, num_recs * 5)  # Each recommendation adds "impact"
-    
-    # Assess relevance (25 points) - placeholder calculation
-    category_scores["relevance"] = 15  # Default middle value
-    
-    # Assess keywords (25 points) - placeholder calculation
-    category_scores["keywords"] = 15  # Default middle value
-    
-    # Add general feedback
-    feedback.append("Aim for recommendations that highlight specific skills and accomplishments.")
-    feedback.append("Request recommendations from diverse sources: supervisors, peers, and subordinates.")
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("recommendations", recommendations)
 
 def analyze_visuals(visuals):
     """Analyze profile and banner images"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    has_profile = visuals.get("has_profile_image", False)
-    has_banner = visuals.get("has_banner", False)
-    
-    # Assess completeness (25 points)
-    if has_profile and has_banner:
-        category_scores["completeness"] = 25
-        feedback.append("Great job having both a profile picture and banner image.")
-    elif has_profile:
-        category_scores["completeness"] = 15
-        feedback.append("You have a profile picture but no banner image. Adding a banner can enhance your profile's visual appeal.")
-    elif has_banner:
-        category_scores["completeness"] = 10
-        feedback.append("You have a banner image but no profile picture. A professional profile picture is essential.")
-    else:
-        category_scores["completeness"] = 0
-        feedback.append("You're missing both profile picture and banner image. These visuals are crucial for a complete profile.")
-    
-    # Assess impact (25 points)
-    # Without seeing the actual images, we'll use placeholder values
-    if has_profile:
-        category_scores["impact"] = 15
-        feedback.append("Ensure your profile picture is professional, clear, and friendly.")
-    else:
-        category_scores["impact"] = 0
-    
-    if has_banner:
-        category_scores["impact"] += 10
-        feedback.append("Make sure your banner image reflects your personal brand and professional identity.")
-    
-    # Relevance and keywords don't apply as strongly to visuals
-    category_scores["relevance"] = has_profile * 15 + has_banner * 10  # Simple calculation
-    category_scores["keywords"] = 0  # Not applicable to images
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("visuals", visuals)
 
 def analyze_featured(featured):
     """Analyze featured section"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    if not featured or len(featured) == 0:
-        feedback.append("Your featured section is empty. Add articles, posts, or projects to showcase your expertise.")
-        return 0, feedback, category_scores
-    
-    # Assess completeness (25 points)
-    num_featured = len(featured)
-    if num_featured == 1:
-        category_scores["completeness"] = 10
-        feedback.append("You have one item in your featured section. Consider adding 3-5 items for a more comprehensive showcase.")
-    elif num_featured <= 3:
-        category_scores["completeness"] = 20
-        feedback.append("You have a good number of items in your featured section.")
-    else:
-        category_scores["completeness"] = 25
-        feedback.append("Your featured section has an impressive number of items.")
-    
-    # Assess impact (25 points) - placeholder calculation
-    category_scores["impact"] = min(25, num_featured * 5)  # Each featured item adds "impact"
-    
-    # Assess relevance (25 points) - placeholder calculation
-    category_scores["relevance"] = 15  # Default middle value
-    
-    # Assess keywords (25 points) - placeholder calculation
-    category_scores["keywords"] = 15  # Default middle value
-    
-    # Add general feedback
-    feedback.append("Include a diverse mix of content types in your featured section (articles, posts, projects, etc.).")
-    feedback.append("Regularly update your featured content to show your latest work and thinking.")
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("featured", featured)
 
 def analyze_activity(activity):
     """Analyze recent LinkedIn activity"""
-    score = 0
-    feedback = []
-    category_scores = {
-        "completeness": 0,
-        "relevance": 0,
-        "impact": 0,
-        "keywords": 0
-    }
-    
-    if not activity or len(activity) == 0:
-        feedback.append("You don't have any recent activity. Regular posting and engagement is crucial for visibility.")
-        return 0, feedback, category_scores
-    
-    # Assess completeness (25 points)
-    num_activity = len(activity)
-    if num_activity == 1:
-        category_scores["completeness"] = 10
-        feedback.append("You have very limited recent activity. Aim for at least weekly posting or engagement.")
-    elif num_activity <= 3:
-        category_scores["completeness"] = 20
-        feedback.append("You have some recent activity, which is good. Consider increasing frequency for better visibility.")
-    else:
-        category_scores["completeness"] = 25
-        feedback.append("You're actively engaging on LinkedIn, which is excellent for visibility.")
-    
-    # Assess impact (25 points) - placeholder calculation
-    category_scores["impact"] = min(25, num_activity * 6)  # Each activity adds "impact"
-    
-    # Assess relevance (25 points) - placeholder calculation
-    category_scores["relevance"] = 15  # Default middle value
-    
-    # Assess keywords (25 points) - placeholder calculation
-    category_scores["keywords"] = 15  # Default middle value
-    
-    # Add general feedback
-    feedback.append("Focus on creating original content rather than just sharing others' posts.")
-    feedback.append("Engage with your network by commenting thoughtfully on others' posts.")
-    feedback.append("Consistency is key - establish a regular posting schedule.")
-    
-    # Calculate overall score
-    score = sum(category_scores.values())
-    
-    return min(100, score), feedback, category_scores
+    return scoring_rules.evaluate("activity", activity)
 
 def generate_mock_profile_data(username):
     """Generate mock LinkedIn profile data for demonstration purposes"""
@@ -1007,133 +958,117 @@ def generate_content_suggestions(profile_data, analysis_results):
 
 # Helper functions for resume analysis and optimization
 
+COMMON_TITLES = KeywordMatcher([
+    "Software Engineer", "Product Manager", "Marketing Specialist", "Data Scientist",
+    "Project Manager", "UX Designer", "Sales Executive", "Financial Analyst",
+    "Operations Manager", "Content Writer", "HR Specialist", "Business Analyst"
+])
+
 def extract_job_titles(text):
     """Extract potential job titles from text"""
-    common_titles = [
-        "Software Engineer", "Product Manager", "Marketing Specialist", "Data Scientist",
-        "Project Manager", "UX Designer", "Sales Executive", "Financial Analyst",
-        "Operations Manager", "Content Writer", "HR Specialist", "Business Analyst"
-    ]
-    
-    found_titles = []
-    for title in common_titles:
-        if title.lower() in text.lower():
-            found_titles.append(title)
+    found_titles = COMMON_TITLES.found(ResumeDocument.of(text).lower, folded=True)
     
     return found_titles[:3]  # Return top 3
 
+KEY_QUALIFICATIONS = KeywordMatcher([
+    "Leadership", "Problem Solving", "Communication", "Project Management",
+    "Software Development", "Data Analysis", "Digital Marketing", "Customer Service",
+    "Strategic Planning", "Design Thinking", "Sales", "Financial Planning"
+])
+
 def extract_key_qualifications(text):
     """Extract key qualifications from text"""
-    qualifications = [
-        "Leadership", "Problem Solving", "Communication", "Project Management",
-        "Software Development", "Data Analysis", "Digital Marketing", "Customer Service",
-        "Strategic Planning", "Design Thinking", "Sales", "Financial Planning"
-    ]
-    
-    found_qualifications = []
-    for qual in qualifications:
-        if qual.lower() in text.lower():
-            found_qualifications.append(qual)
+    found_qualifications = KEY_QUALIFICATIONS.found(ResumeDocument.of(text).lower, folded=True)
     
     return found_qualifications[:5]  # Return top 5
 
+CAREER_HIGHLIGHT_INDICATORS = KeywordMatcher([
+    "led", "managed", "created", "developed", "implemented",
+    "increased", "improved", "reduced", "achieved", "awarded"
+])
+
 def extract_career_highlights(text):
     """Extract career highlights from text"""
     # For demo purposes, we'll look for sentences with achievement indicators
-    achievement_indicators = [
-        "led", "managed", "created", "developed", "implemented",
-        "increased", "improved", "reduced", "achieved", "awarded"
-    ]
-    
-    sentences = re.split(r'[.!?]+', text)
+    doc = ResumeDocument.of(text)
     highlights = []
     
-    for sentence in sentences:
+    for sentence, sentence_lower in zip(doc.sentences, doc.sentences_lower):
         sentence = sentence.strip()
-        if sentence and any(indicator in sentence.lower() for indicator in achievement_indicators):
+        if sentence and CAREER_HIGHLIGHT_INDICATORS.search(sentence_lower, folded=True):
             if len(sentence) > 10 and len(sentence) < 150:  # Reasonable length
                 highlights.append(sentence)
     
     return highlights[:5]  # Return top 5
 
+PROFESSIONAL_TRAITS = KeywordMatcher([
+    "detail-oriented", "analytical", "creative", "innovative", "strategic",
+    "collaborative", "team player", "self-motivated", "organized", "adaptable",
+    "proactive", "resourceful", "passionate", "dedicated", "results-driven"
+])
+
 def extract_professional_traits(text):
     """Extract professional personality traits from text"""
-    traits = [
-        "detail-oriented", "analytical", "creative", "innovative", "strategic",
-        "collaborative", "team player", "self-motivated", "organized", "adaptable",
-        "proactive", "resourceful", "passionate", "dedicated", "results-driven"
-    ]
-    
-    found_traits = []
-    for trait in traits:
-        if trait.lower() in text.lower():
-            found_traits.append(trait)
+    found_traits = PROFESSIONAL_TRAITS.found(ResumeDocument.of(text).lower, folded=True)
     
     return found_traits[:5]  # Return top 5
 
+ROLE_ACHIEVEMENT_INDICATORS = KeywordMatcher(["increased", "decreased", "improved", "achieved", "delivered", "led", "managed"])
+
 def extract_achievements_for_role(text, role, company):
     """Extract achievements related to a specific role"""
-    # Find paragraphs that might contain the role and company
-    paragraphs = text.split('\n\n')
-    relevant_paragraphs = []
-    
-    for para in paragraphs:
-        if role in para.lower() or company in para.lower():
-            relevant_paragraphs.append(para)
-    
-    # Look for achievement indicators in relevant paragraphs
+    doc = ResumeDocument.of(text)
     achievements = []
-    indicators = ["increased", "decreased", "improved", "achieved", "delivered", "led", "managed"]
     
-    for para in relevant_paragraphs:
-        sentences = re.split(r'[.!?]+', para)
-        for sentence in sentences:
+    # Find paragraphs that might contain the role and company
+    for index, para_lower in enumerate(doc.paragraphs_lower):
+        if not (role in para_lower or company in para_lower):
+            continue
+        
+        # Look for achievement indicators in relevant paragraphs
+        for sentence, sentence_lower in doc.paragraph_sentences(index):
             sentence = sentence.strip()
-            if sentence and any(indicator in sentence.lower() for indicator in indicators):
+            if sentence and ROLE_ACHIEVEMENT_INDICATORS.search(sentence_lower, folded=True):
                 if len(sentence) > 10 and len(sentence) < 200:  # Reasonable length
                     achievements.append(sentence)
     
     return achievements[:5]  # Return top 5
 
+COMMON_SKILLS = KeywordMatcher([
+    "Python", "JavaScript", "React", "Project Management", "Data Analysis",
+    "Marketing", "Sales", "Leadership", "Communication", "Design",
+    "SQL", "Excel", "Social Media", "Customer Service", "Consulting",
+    "Java", "C++", "Problem Solving", "Strategic Planning", "Agile",
+    "UX/UI Design", "Product Management", "Content Creation", "SEO",
+    "Financial Analysis", "Machine Learning", "Negotiation", "Public Speaking"
+])
+
 def extract_skills(text):
     """Extract skills from text"""
-    common_skills = [
-        "Python", "JavaScript", "React", "Project Management", "Data Analysis",
-        "Marketing", "Sales", "Leadership", "Communication", "Design",
-        "SQL", "Excel", "Social Media", "Customer Service", "Consulting",
-        "Java", "C++", "Problem Solving", "Strategic Planning", "Agile",
-        "UX/UI Design", "Product Management", "Content Creation", "SEO",
-        "Financial Analysis", "Machine Learning", "Negotiation", "Public Speaking"
-    ]
-    
-    found_skills = []
-    for skill in common_skills:
-        if skill.lower() in text.lower():
-            found_skills.append(skill)
-    
-    return found_skills
+    return COMMON_SKILLS.found(ResumeDocument.of(text).lower, folded=True)
+
+PROJECT_INDICATORS = KeywordMatcher(["project:", "projects:", "project -", "project name:", "developed:", "implemented:"])
 
 def extract_projects(text):
     """Extract projects from text"""
-    # Look for project indicators
-    project_indicators = ["project:", "projects:", "project -", "project name:", "developed:", "implemented:"]
-    
+    # Look for project indicators, skipping the line scan when the text has none
     projects = []
-    lines = text.split('\n')
+    doc = ResumeDocument.of(text)
+    lines = doc.lines_lower if PROJECT_INDICATORS.search(doc.lower, folded=True) else []
     
     for line in lines:
-        if any(indicator in line.lower() for indicator in project_indicators):
+        if PROJECT_INDICATORS.search(line, folded=True):
             # Extract project name
-            for indicator in project_indicators:
-                if indicator in line.lower():
-                    project_part = line.lower().split(indicator)[1].strip()
+            for indicator in PROJECT_INDICATORS.keywords:
+                if indicator in line:
+                    project_part = line.split(indicator)[1].strip()
                     project_name = project_part.split(",")[0].split("-")[0].split(".")[0].strip()
                     if project_name and 3 < len(project_name) < 50:
                         projects.append(project_name.title())
     
     # If no projects found with indicators, look for capitalized noun phrases
-    if not projects:
-        words = text.split()
+    if not projects and "Project" in doc.text:
+        words = doc.words
         for i in range(len(words) - 1):
             if words[i] == "Project" and i+1 < len(words) and words[i+1][0].isupper():
                 project_name = words[i+1]
@@ -1143,20 +1078,21 @@ def extract_projects(text):
     
     return list(set(projects))  # Remove duplicates
 
+PUBLICATION_INDICATORS = KeywordMatcher(["publication:", "published:", "article:", "journal:", "conference:", "presented:"])
+
 def extract_publications(text):
     """Extract publications or presentations from text"""
-    # Look for publication indicators
-    publication_indicators = ["publication:", "published:", "article:", "journal:", "conference:", "presented:"]
-    
+    # Look for publication indicators, skipping the line scan when the text has none
     publications = []
-    lines = text.split('\n')
+    doc = ResumeDocument.of(text)
+    lines = doc.lines_lower if PUBLICATION_INDICATORS.search(doc.lower, folded=True) else []
     
     for line in lines:
-        if any(indicator in line.lower() for indicator in publication_indicators):
+        if PUBLICATION_INDICATORS.search(line, folded=True):
             # Extract publication name
-            for indicator in publication_indicators:
-                if indicator in line.lower():
-                    pub_part = line.lower().split(indicator)[1].strip()
+            for indicator in PUBLICATION_INDICATORS.keywords:
+                if indicator in line:
+                    pub_part = line.split(indicator)[1].strip()
                     pub_name = pub_part.split(",")[0].split("-")[0].split(".")[0].strip()
                     if pub_name and 3 < len(pub_name) < 100:
                         publications.append(pub_name.title())
@@ -1166,13 +1102,13 @@ def extract_publications(text):
 # Missing import
 from datetime import datetime
 
-def optimize_headline(current_headline, resume_text):
+def optimize_headline(current_headline, resume):
     """Optimize LinkedIn headline based on resume content"""
     # Extract job titles from resume
-    job_titles = extract_job_titles(resume_text)
+    job_titles = extract_job_titles(resume)
     
     # Extract key skills or qualifications
-    key_qualifications = extract_key_qualifications(resume_text)
+    key_qualifications = extract_key_qualifications(resume)
     
     # Generate improved headline options
     options = []
@@ -1188,13 +1124,13 @@ def optimize_headline(current_headline, resume_text):
         "alternatives": options[1:3] if len(options) > 1 else []
     }
 
-def optimize_summary(current_summary, resume_text):
+def optimize_summary(current_summary, resume):
     """Optimize LinkedIn summary based on resume content"""
     # Extract career highlights
-    highlights = extract_career_highlights(resume_text)
+    highlights = extract_career_highlights(resume)
     
     # Extract professional personality traits
-    traits = extract_professional_traits(resume_text)
+    traits = extract_professional_traits(resume)
     
     # Generate improved summary
     optimized = ""
@@ -1221,8 +1157,10 @@ def optimize_summary(current_summary, resume_text):
         "optimized": optimized if optimized else current_summary
     }
 
-def optimize_experience(current_experience, resume_text):
+def optimize_experience(current_experience, resume):
     """Optimize LinkedIn experience based on resume content"""
+    resume = ResumeDocument.of(resume)
+    
     # For demo purposes, we'll focus on enhancing descriptions with achievements
     enhanced_experience = []
     
@@ -1235,7 +1173,7 @@ def optimize_experience(current_experience, resume_text):
         company = exp.get("company", "").lower()
         
         # Search resume for achievements related to this role
-        achievements = extract_achievements_for_role(resume_text, role_title, company)
+        achievements = extract_achievements_for_role(resume, role_title, company)
         
         # Enhanced description with achievements
         enhanced_desc = current_desc
@@ -1262,10 +1200,12 @@ def optimize_experience(current_experience, resume_text):
         "optimized": enhanced_experience
     }
 
-def optimize_skills(current_skills, resume_text):
+def optimize_skills(current_skills, resume):
     """Optimize LinkedIn skills based on resume content"""
+    resume = ResumeDocument.of(resume)
+    
     # Extract skills from resume
-    resume_skills = extract_skills(resume_text)
+    resume_skills = extract_skills(resume)
     
     # Identify missing skills (in resume but not in LinkedIn)
     current_skills_lower = [skill.lower() for skill in current_skills]
@@ -1275,7 +1215,7 @@ def optimize_skills(current_skills, resume_text):
     prioritized_skills = []
     for skill in current_skills:
         # Check how many times the skill appears in the resume
-        count = resume_text.lower().count(skill.lower())
+        count = resume.count(skill)
         prioritized_skills.append((skill, count))
     
     # Sort by count (emphasis in resume)
@@ -1287,12 +1227,13 @@ def optimize_skills(current_skills, resume_text):
         "prioritized": [skill for skill, _ in prioritized_skills[:15]]  # Top 15 prioritized skills
     }
 
-def generate_featured_suggestions(profile_data, resume_text):
+def generate_featured_suggestions(profile_data, resume):
     """Generate suggestions for LinkedIn featured section"""
+    resume = ResumeDocument.of(resume)
     suggestions = []
     
     # Extract projects from resume
-    projects = extract_projects(resume_text)
+    projects = extract_projects(resume)
     if projects:
         for project in projects[:3]:
             suggestions.append({
@@ -1302,7 +1243,7 @@ def generate_featured_suggestions(profile_data, resume_text):
             })
     
     # Extract publications or presentations
-    publications = extract_publications(resume_text)
+    publications = extract_publications(resume)
     if publications:
         for pub in publications[:2]:
             suggestions.append({
@@ -1437,95 +1378,245 @@ def generate_branding_plan(optimized_sections, analysis_results):
         "posting_schedule": "2-3 posts per week, with daily engagement"
     }
 
-@app.post("/api/upload-resume")
-async def upload_resume(profile_id: str = Body(...), file: UploadFile = File(...)):
-    try:
-        # Check if profile exists
-        profile = await db.profile_analyses.find_one({"profile_id": profile_id})
-        if not profile:
-            raise HTTPException(status_code=404, detail="Profile not found")
-        
-        # Read and parse the resume
-        resume_text = await parse_resume(file)
-        if not resume_text:
-            raise HTTPException(status_code=400, detail="Could not extract text from resume")
-        
+async def find_profile_for_resume(profile_id: str) -> Optional[dict]:
+    with observe(MONGO_SECONDS, collection="profile_analyses", operation="find"):
+        return await profile_writes.find_one({"profile_id": profile_id}, PROFILE_FOR_RESUME_PROJECTION)
+
+async def optimize_and_store_resume(profile_id: str, profile: dict, resume_text: str, resume_hash: str) -> dict:
+    """Optimise the profile's sections against a resume, store the resume analysis and return the response body"""
+    result_key = ResumeCache.result_key(
+        resume_hash,
+        content_hash({"profile_data": profile["profile_data"], "analysis_results": profile["analysis_results"]}),
+        SCORER_VERSION
+    )
+    cached = await resume_cache.get_result(result_key)
+    if cached is not None:
+        optimized_sections = cached["optimized_sections"]
+        branding_plan = cached["branding_plan"]
+    else:
         # Optimize LinkedIn sections based on resume
-        optimized_sections = optimize_linkedin_sections(profile["profile_data"], resume_text)
+        with observe(STAGE_SECONDS, stage="optimize_linkedin_sections"):
+            optimized_sections = await compute_pool.run(
+                "optimize_linkedin_sections", optimize_linkedin_sections, profile["profile_data"], resume_text
+            )
         
         # Generate personal branding plan
         branding_plan = generate_branding_plan(optimized_sections, profile["analysis_results"])
-        
-        # Store results
-        resume_analysis = {
-            "profile_id": profile_id,
-            "resume_text": resume_text,
+        await resume_cache.set_result(result_key, {
             "optimized_sections": optimized_sections,
-            "branding_plan": branding_plan,
-            "created_at": str(datetime.now())
-        }
-        
-        # Insert or update in database
+            "branding_plan": branding_plan
+        })
+    
+    # Store results
+    resume_analysis = {
+        "profile_id": profile_id,
+        "resume_text": resume_text,
+        "optimized_sections": optimized_sections,
+        "branding_plan": branding_plan,
+        "created_at": str(datetime.now())
+    }
+    
+    # Insert or update in database
+    with observe(MONGO_SECONDS, collection="resume_analyses", operation="upsert"):
         await db.resume_analyses.update_one(
             {"profile_id": profile_id},
             {"$set": resume_analysis},
             upsert=True
         )
+    response_cache.invalidate(("resume-analysis", profile_id))
+    
+    return {
+        "profile_id": profile_id,
+        "optimized_sections": optimized_sections,
+        "branding_plan": branding_plan
+    }
+
+@app.post("/api/upload-resume")
+async def upload_resume(profile_id: str = Body(...), file: UploadFile = File(...),
+                        respond_async: bool = Query(False, alias="async")):
+    try:
+        # Check if profile exists
+        profile = await find_profile_for_resume(profile_id)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
         
-        return {
-            "profile_id": profile_id,
-            "optimized_sections": optimized_sections,
-            "branding_plan": branding_plan
-        }
+        if respond_async:
+            return await enqueue_resume_job(profile_id, file)
         
+        # Read and parse the resume
+        resume_text, resume_hash = await read_resume(file)
+        if not resume_text:
+            raise HTTPException(status_code=400, detail="Could not extract text from resume")
+        
+        return await optimize_and_store_resume(profile_id, profile, resume_text, resume_hash)
+        
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ComputeOverloaded as e:
+        logger.warning(f"Rejecting resume processing: {str(e)}")
+        raise HTTPException(status_code=503, detail="Server is busy, please retry shortly")
     except Exception as e:
         logger.error(f"Error processing resume: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
+@app.get("/api/jobs/stats")
+async def job_stats():
+    return {"resume": {"queue": await resume_jobs.get_stats(), "workers": resume_job_workers.get_stats()}}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await resume_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_summary(job)
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events with the job's state on every change, ending once it has finished"""
+    job = await resume_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        current, last, idle = job, None, 0.0
+        while True:
+            summary = job_summary(current)
+            if summary != last:
+                yield f"event: {summary['status']}\ndata: {json.dumps(summary, default=str)}\n\n"
+                last, idle = summary, 0.0
+            if current["status"] in FINISHED:
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+            idle += JOB_EVENTS_POLL_INTERVAL
+            if idle >= 15:
+                # Keep proxies from closing a quiet stream
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            current = await resume_jobs.get(job_id)
+            if current is None:
+                return
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def extract_pdf_text(source, max_pages: int = UPLOAD_MAX_PDF_PAGES) -> str:
+    """Extract the text of every page of a PDF given as bytes or a file path"""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    if len(pdf_reader.pages) > max_pages:
+        raise UploadTooLarge(f"PDF has more than {max_pages} pages")
+    parts = []
+    for page in pdf_reader.pages:
+        parts.append(page.extract_text())
+        parts.append("\n")
+    return "".join(parts)
+
 async def parse_resume(file: UploadFile) -> str:
     """Extract text from uploaded resume file"""
-    content = await file.read()
-    
-    if file.filename.lower().endswith('.pdf'):
+    resume_text, _ = await read_resume(file)
+    return resume_text
+
+async def read_resume(file: UploadFile):
+    """Spool an upload and return (text, SHA-256 of the file), reusing the text of identical uploads"""
+    filename = file.filename.lower()
+    with SpooledUpload(UPLOAD_MAX_BYTES, UPLOAD_MEMORY_BYTES, suffix=Path(filename).suffix) as upload:
+        await upload.copy_from(file)
+        return await extract_resume_text(filename, upload), upload.sha256
+
+async def read_resume_bytes(filename: str, content: bytes):
+    """read_resume for an upload stored with a resume job"""
+    filename = filename.lower()
+    with SpooledUpload(UPLOAD_MAX_BYTES, UPLOAD_MEMORY_BYTES, suffix=Path(filename).suffix) as upload:
+        upload.write(content)
+        return await extract_resume_text(filename, upload), upload.sha256
+
+async def extract_resume_text(filename: str, upload: SpooledUpload) -> str:
+    file_format = Path(filename).suffix
+    text_key = ResumeCache.text_key(file_format, upload.sha256)
+    text = await resume_cache.get_text(text_key)
+    if text is None:
+        with observe(PARSE_RESUME_SECONDS, file_type=resume_file_type(file_format)):
+            text, extracted = await parse_spooled_resume(filename, upload)
+        # A sample-text fallback (e.g. after a crashed worker) must not stand in for this file later
+        if text and extracted:
+            await resume_cache.set_text(text_key, text)
+    return text
+
+async def enqueue_resume_job(profile_id: str, file: UploadFile):
+    """Store the upload with a new resume job and answer 202 with where to follow it"""
+    with SpooledUpload(UPLOAD_MAX_BYTES, UPLOAD_MEMORY_BYTES, suffix=Path(file.filename).suffix) as upload:
+        await upload.copy_from(file)
+        content = upload.read()
+    job = await resume_jobs.enqueue("resume", {"profile_id": profile_id, "filename": file.filename}, content)
+    status_url = f"/api/jobs/{job['job_id']}"
+    return JSONResponse(
+        status_code=202,
+        content={**job_summary(job), "status_url": status_url, "events_url": f"{status_url}/events"},
+        headers={"Location": status_url}
+    )
+
+async def run_resume_job(context: JobContext) -> dict:
+    """Resume job handler: the synchronous upload_resume pipeline, timed per stage"""
+    profile_id = context.payload["profile_id"]
+    with context.stage("load_profile"):
+        profile = await find_profile_for_resume(profile_id)
+    if not profile:
+        # upload_resume found the profile, so it is most likely still queued in the write-behind
+        # buffer of another process: fail the attempt and let it be retried after the delay
+        raise LookupError("Profile not found")
+    if context.upload is None:
+        raise PermanentJobError("The uploaded resume has expired")
+    try:
+        with context.stage("parse_resume"):
+            resume_text, resume_hash = await read_resume_bytes(context.payload["filename"], context.upload)
+    except UploadTooLarge as e:
+        raise PermanentJobError(str(e))
+    if not resume_text:
+        raise PermanentJobError("Could not extract text from resume")
+    with context.stage("optimize_and_store"):
+        return await optimize_and_store_resume(profile_id, profile, resume_text, resume_hash)
+
+async def parse_spooled_resume(filename: str, upload: SpooledUpload) -> Tuple[str, bool]:
+    """Return (text, extracted); extracted is False when the sample resume stood in for the upload"""
+    if filename.endswith('.pdf'):
         # Parse PDF
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+            text = await compute_pool.run("parse_resume", extract_pdf_text, upload.source(), UPLOAD_MAX_PDF_PAGES)
             
             # If PDF extraction fails, try fallback method
             if not text or len(text.strip()) < 10:
                 logger.warning("PDF text extraction produced minimal content, using fallback method")
                 # Simple fallback - treat as text
                 try:
-                    text = content.decode('utf-8', errors='ignore')
+                    text = upload.read().decode('utf-8', errors='ignore')
                 except:
                     # If decode fails, use sample text for demonstration
                     logger.warning("Fallback extraction failed, using sample text")
-                    text = get_sample_resume_text()
+                    return get_sample_resume_text(), False
             
-            return text
+            return text, True
+        except (ComputeOverloaded, UploadTooLarge):
+            raise
         except Exception as e:
             logger.error(f"Error parsing PDF: {str(e)}")
             # Return sample text for demonstration purposes
-            return get_sample_resume_text()
-    elif file.filename.lower().endswith(('.doc', '.docx')):
+            return get_sample_resume_text(), False
+    elif filename.endswith(('.doc', '.docx')):
         # For demo purposes, we'll use a simple extraction
         try:
-            return content.decode('utf-8', errors='ignore')
+            return upload.read().decode('utf-8', errors='ignore'), True
         except:
             logger.warning("Error decoding DOC/DOCX file, using sample text")
-            return get_sample_resume_text()
-    elif file.filename.lower().endswith('.txt'):
+            return get_sample_resume_text(), False
+    elif filename.endswith('.txt'):
         try:
-            return content.decode('utf-8', errors='ignore')
+            return upload.read().decode('utf-8', errors='ignore'), True
         except:
             logger.warning("Error decoding TXT file, using sample text")
-            return get_sample_resume_text()
+            return get_sample_resume_text(), False
     else:
-        logger.error(f"Unsupported file format: {file.filename}")
-        return get_sample_resume_text()
+        logger.error(f"Unsupported file format: {filename}")
+        return get_sample_resume_text(), False
         
 def get_sample_resume_text() -> str:
     """Return sample resume text for demonstration purposes"""
@@ -1562,22 +1653,24 @@ Risk Management, Stakeholder Engagement, Climate Change Solutions, Sustainable D
 
 def optimize_linkedin_sections(profile_data: dict, resume_text: str) -> dict:
     """Optimize LinkedIn sections based on resume content"""
+    # Normalise and split the resume once for all optimisers
+    resume = ResumeDocument.of(resume_text)
+    
     optimized_sections = {
-        "headline": optimize_headline(profile_data.get("headline", ""), resume_text),
-        "summary": optimize_summary(profile_data.get("summary", profile_data.get("about", "")), resume_text),
-        "experience": optimize_experience(profile_data.get("experience", []), resume_text),
-        "skills": optimize_skills(profile_data.get("skills", []), resume_text),
-        "featured": generate_featured_suggestions(profile_data, resume_text)
+        "headline": optimize_headline(profile_data.get("headline", ""), resume),
+        "summary": optimize_summary(profile_data.get("summary", profile_data.get("about", "")), resume),
+        "experience": optimize_experience(profile_data.get("experience", []), resume),
+        "skills": optimize_skills(profile_data.get("skills", []), resume),
+        "featured": generate_featured_suggestions(profile_data, resume)
     }
     
     return optimized_sections
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
-
-def map_api_response_to_profile_data(api_response, username):
-    """Map LinkedIn API response to our profile data structure"""
+def map_api_response_to_profile_data(api_response, username, fallback=True):
+    """
+    Map LinkedIn API response to our profile data structure. A response that
+    cannot be mapped gives mock data, or raises with fallback=False.
+    """
     try:
         profile_data = {
             "public_identifier": username,
@@ -1629,10 +1722,9 @@ def map_api_response_to_profile_data(api_response, username):
         return profile_data
 
     except Exception as e:
+        if not fallback:
+            raise
         logger.error(f"Error mapping API response: {str(e)}")
         # Fall back to mock data if mapping fails
-        return generate_mock_profile_data(username)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+        PROFILE_FALLBACKS.labels(reason="mapping_error").inc()
+        return generate_mock_profile_data(username)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("task", "waiters", "priority")
+
+    def __init__(self, priority: Optional[int]):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.priority = priority
+
+
+# The call whose shared task is running, so the work can read the priority of its waiters
+current_call: ContextVar[Optional[_Call]] = ContextVar("singleflight_current_call", default=None)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one shared task.
+
+    The work runs in its own task, so a cancelled caller (e.g. a client that
+    disconnected) does not cancel it for the others. It is only cancelled once
+    every caller waiting on it has gone away. Exceptions are propagated to all
+    callers and nothing is remembered once the call completes.
+
+    Callers may pass a priority (lower is more urgent); the call keeps the
+    most urgent one among its callers, which the work can read through
+    current_call while it runs.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], priority: Optional[int] = None) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(priority)
+            token = current_call.set(call)
+            try:
+                call.task = asyncio.create_task(fn())
+            finally:
+                current_call.reset(token)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            if priority is not None and (call.priority is None or priority < call.priority):
+                call.priority = priority
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is waiting for the result anymore
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if call.task.done() and not call.task.cancelled():
+            # Mark the exception as retrieved when every waiter was cancelled
+            call.task.exception()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "in_flight": len(self._calls)}
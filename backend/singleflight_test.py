@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from rate_limiter import BATCH, INTERACTIVE, current_priority, request_priority
+from singleflight import SingleFlight, current_call
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"score": 42}
+
+    async def run():
+        return await asyncio.gather(*[flights.do("jane", work) for _ in range(20)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flights.stats == {"leaders": 1, "coalesced": 19}
+    assert len(flights) == 0
+
+def test_errors_propagate_to_every_caller_and_are_not_remembered():
+    flights = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def run():
+        results = await asyncio.gather(*[flights.do("jane", failing) for _ in range(5)],
+                                       return_exceptions=True)
+        retry = await asyncio.gather(flights.do("jane", failing), return_exceptions=True)
+        return results, retry
+
+    results, retry = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert isinstance(retry[0], ValueError)
+    assert len(attempts) == 2
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(flights.do("jane", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("jane", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == "done"
+
+def test_work_is_cancelled_when_every_caller_is_gone():
+    flights = SingleFlight()
+    started = []
+    cancelled = []
+
+    async def work():
+        started.append(1)
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def run():
+        callers = [asyncio.create_task(flights.do("jane", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return len(flights)
+
+    assert asyncio.run(run()) == 0
+    assert started == [1]
+    assert cancelled == [1]
+
+def test_call_keeps_the_most_urgent_callers_priority():
+    flights = SingleFlight()
+    seen = []
+
+    async def work():
+        await asyncio.sleep(0.02)
+        seen.append(current_call.get().priority)
+
+    async def run():
+        leader = asyncio.create_task(flights.do("jane", work, priority=2))
+        await asyncio.sleep(0.005)
+        await asyncio.gather(flights.do("jane", work, priority=0), flights.do("jane", work, priority=1), leader)
+
+    asyncio.run(run())
+    assert seen == [0]
+    assert current_call.get() is None
+
+@pytest.fixture
+def coalescing_server(monkeypatch):
+    import httpx
+
+    import server
+    from perf.memory_store import use_memory_store
+
+    monkeypatch.setattr(server, "db", server.db)
+    monkeypatch.setattr(server.profile_writes, "collection", server.profile_writes.collection)
+    monkeypatch.setattr(server.profile_cache, "collection", server.profile_cache.collection)
+    monkeypatch.setattr(server.compute_pool, "kind", "inline")
+    use_memory_store(server)
+    priorities = []
+
+    async def get_profile_details(username, priority=INTERACTIVE):
+        # Long enough for the other callers to join before the priority is read
+        await asyncio.sleep(0.05)
+        priorities.append(current_priority(priority))
+        return httpx.Response(503)
+
+    monkeypatch.setattr(server.linkedin_client, "get_profile_details", get_profile_details)
+    return server, priorities
+
+def test_interactive_callers_raise_the_priority_of_a_batch_fetch(coalescing_server):
+    server, priorities = coalescing_server
+
+    async def batch_fetch(username):
+        request_priority.set(BATCH)
+        return await server.fetch_and_analyze_profile(username)
+
+    async def run():
+        await asyncio.create_task(batch_fetch("batch-only"))
+        batch = asyncio.create_task(batch_fetch("joined"))
+        await asyncio.sleep(0.01)
+        await server.fetch_and_analyze_profile("joined")
+        await batch
+
+    asyncio.run(run())
+    assert priorities == [BATCH, INTERACTIVE]
+
+def test_coalesced_callers_store_their_own_url(coalescing_server):
+    server, _ = coalescing_server
+    urls = ["https://www.linkedin.com/in/jane-doe/", "http://linkedin.com/in/Jane-Doe"]
+
+    async def run():
+        responses = await asyncio.gather(*[server.fetch_profile(server.ProfileRequest(linkedin_url=url))
+                                           for url in urls])
+        return [await server.db.profile_analyses.find_one({"profile_id": response["profile_id"]},
+                                                          {"_id": 0, "linkedin_url": 1, "username": 1})
+                for response in responses]
+
+    stored = asyncio.run(run())
+    assert stored == [{"linkedin_url": url, "username": "jane-doe"} for url in urls]
+    assert server.profile_flights.stats["coalesced"] >= 1
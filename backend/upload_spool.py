@@ -0,0 +1,136 @@
+import hashlib
+import os
+import tempfile
+from typing import Iterable, Optional, Union
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured size or page limit"""
+
+
+class SpooledUpload:
+    """
+    Upload body copied chunk by chunk, in memory up to memory_bytes and in a
+    temporary file beyond that.
+
+    Copying stops with UploadTooLarge as soon as more than max_bytes have been
+    read, so an oversize upload is never held in full. A spooled file is
+    handed to workers by path, which keeps large bodies out of the pickled
+    arguments of a process pool.
+    """
+
+    def __init__(self, max_bytes: int, memory_bytes: int, suffix: str = ""):
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.suffix = suffix
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._buffer: Optional[bytearray] = bytearray()
+        self._file = None
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._file.name if self._file is not None else None
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {self.max_bytes} byte limit")
+        self._digest.update(chunk)
+
+        if self._file is None and self.size > self.memory_bytes:
+            self._file = tempfile.NamedTemporaryFile(prefix="upload-", suffix=self.suffix, delete=False)
+            self._file.write(self._buffer)
+            self._buffer = None
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer += chunk
+
+    async def copy_from(self, upload, chunk_size: int = CHUNK_SIZE) -> "SpooledUpload":
+        """Read an UploadFile (or anything with an async read(size)) until EOF"""
+        declared = getattr(upload, "size", None)
+        if declared is not None and declared > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {self.max_bytes} byte limit")
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            self.write(chunk)
+        if self._file is not None:
+            self._file.flush()
+        return self
+
+    def source(self) -> Union[bytes, str]:
+        """The spooled bytes, or the temporary file path once spilled to disk"""
+        return self.path if self._file is not None else bytes(self._buffer)
+
+    def read(self) -> bytes:
+        if self._file is None:
+            return bytes(self._buffer)
+        with open(self._file.name, "rb") as spooled:
+            return spooled.read()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._file.name)
+            except FileNotFoundError:
+                pass
+            self._file = None
+        self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects request bodies larger than max_bytes on the given paths with 413.
+
+    A declared Content-Length is checked before the endpoint runs. Chunked
+    bodies are counted while FastAPI reads them, and reading stops with 413
+    as soon as the limit is passed instead of parsing the whole form first.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                response = JSONResponse(status_code=413, content={"detail": "Request body is too large"})
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail="Request body is too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,67 @@
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile as StarletteUploadFile
+
+import server
+from perf.pdf import text_to_pdf
+from upload_spool import SpooledUpload, UploadSizeLimitMiddleware, UploadTooLarge
+
+
+def make_upload(content: bytes, filename: str = "resume.txt", size=None):
+    return StarletteUploadFile(io.BytesIO(content), filename=filename, size=size)
+
+def test_small_upload_stays_in_memory():
+    with SpooledUpload(max_bytes=100, memory_bytes=50) as upload:
+        asyncio.run(upload.copy_from(make_upload(b"x" * 40), chunk_size=16))
+        assert upload.path is None
+        assert upload.source() == b"x" * 40
+
+def test_large_upload_spills_to_disk_and_is_removed_on_close():
+    with SpooledUpload(max_bytes=1000, memory_bytes=50, suffix=".pdf") as upload:
+        asyncio.run(upload.copy_from(make_upload(b"abc" * 100), chunk_size=16))
+        path = upload.source()
+        assert path == upload.path and path.endswith(".pdf")
+        assert upload.read() == b"abc" * 100
+    assert not os.path.exists(path)
+
+def test_oversize_upload_stops_reading_early():
+    source = make_upload(b"y" * 10_000)
+    with SpooledUpload(max_bytes=100, memory_bytes=50) as upload:
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(upload.copy_from(source, chunk_size=32))
+        assert upload.size <= 100 + 32
+    with SpooledUpload(max_bytes=100, memory_bytes=50) as upload:
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(upload.copy_from(make_upload(b"", size=10_000)))
+
+def test_extract_pdf_text_joins_pages_and_enforces_page_limit():
+    pdf = text_to_pdf("\n".join(f"Line {number}" for number in range(30)), lines_per_page=10)
+    text = server.extract_pdf_text(pdf, max_pages=3)
+    assert text.count("\n") >= 3 and "Line 0" in text and "Line 29" in text
+    with pytest.raises(UploadTooLarge):
+        server.extract_pdf_text(pdf, max_pages=2)
+
+def test_middleware_rejects_large_bodies_with_413():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, paths=["/upload"], max_bytes=1000)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    test_client = TestClient(app)
+    assert test_client.post("/upload", files={"file": ("a.txt", b"z" * 100)}).json() == {"size": 100}
+    assert test_client.post("/upload", files={"file": ("a.txt", b"z" * 5000)}).status_code == 413
+
+    def chunked_body():
+        for _ in range(50):
+            yield b"z" * 100
+
+    response = test_client.post("/upload", content=chunked_body(),
+                                headers={"content-type": "multipart/form-data; boundary=x"})
+    assert response.status_code == 413
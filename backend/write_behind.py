@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+
+def _project(doc: dict, projection: Optional[dict]) -> dict:
+    """Apply a Mongo inclusion projection (plus an optional _id: 0) to an in-memory document"""
+    if not projection:
+        return dict(doc)
+    fields = [field for field, include in projection.items() if include and field != "_id"]
+    result = {field: doc[field] for field in fields if field in doc}
+    if projection.get("_id", 1) and "_id" in doc:
+        result["_id"] = doc["_id"]
+    return result
+
+
+class WriteBehindBuffer:
+    """
+    Optional write-behind persistence for one collection.
+
+    When enabled, insert() puts the document on a bounded queue and returns
+    immediately. A background task writes the queue out with
+    insert_many(ordered=False) once max_batch documents are waiting or
+    flush_interval seconds after the first one arrived. When the queue is
+    full, insert() waits for the flusher to make room (backpressure) rather
+    than growing without bound. Queued documents stay visible to find_one()
+    by key until they are written, and close() drains the queue.
+
+    hold() gives the same read-your-writes to documents a caller writes
+    itself (a streamed batch written in one bulk write), until release().
+
+    When disabled, insert() and find_one() go straight to the collection.
+    """
+
+    def __init__(self, collection, key: str, enabled: bool = False, max_batch: int = 100,
+                 flush_interval: float = 0.5, max_queue: int = 1000, max_retries: int = 3):
+        self.collection = collection
+        self.key = key
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        # Queued or in-flight documents by key, for read-your-writes
+        self._pending: Dict[Any, dict] = {}
+        self.stats = {"queued": 0, "flushed": 0, "batches": 0, "failed": 0, "backpressure_waits": 0}
+
+    async def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._closed = False
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def insert(self, doc: dict):
+        if not self.enabled or self._task is None or self._closed:
+            await self.collection.insert_one(doc)
+            return
+        if self._queue.full():
+            self.stats["backpressure_waits"] += 1
+        self._pending[doc[self.key]] = doc
+        try:
+            await self._queue.put(doc)
+        except BaseException:
+            self._pending.pop(doc[self.key], None)
+            raise
+        self.stats["queued"] += 1
+
+    async def find_one(self, filter: dict, projection: Optional[dict] = None):
+        """find_one that also sees documents which are still queued, when filtering by key alone"""
+        if self._pending and set(filter) == {self.key}:
+            doc = self._pending.get(filter[self.key])
+            if doc is not None:
+                return _project(doc, projection)
+        return await self.collection.find_one(filter, projection)
+
+    def hold(self, doc: dict):
+        """Serve doc from find_one() and latest_pending() until release(), whether or not the buffer is enabled"""
+        self._pending[doc[self.key]] = doc
+
+    def release(self, docs: List[dict]):
+        for doc in docs:
+            if self._pending.get(doc[self.key]) is doc:
+                del self._pending[doc[self.key]]
+
+    def latest_pending(self, field: str, value: Any, sort_field: str) -> Optional[dict]:
+        """The queued document with field == value and the highest sort_field, or None; do not modify it"""
+        matches = [doc for doc in self._pending.values() if doc.get(field) == value]
+        return max(matches, key=lambda doc: doc.get(sort_field, "")) if matches else None
+
+    async def close(self, timeout: float = 10.0):
+        """Stop queueing and write out everything already queued"""
+        if self._task is None:
+            return
+        self._closed = True
+        await self._queue.put(None)
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Write-behind drain timed out with {len(self._pending)} documents unwritten")
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                try:
+                    doc = self._queue.get_nowait() if remaining <= 0 else \
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if doc is None:
+                    stop = True
+                    break
+                batch.append(doc)
+            await self._flush(batch)
+            if stop:
+                return
+
+    async def _flush(self, batch: List[dict]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                self.stats["flushed"] += len(batch)
+                break
+            except BulkWriteError as e:
+                # Unordered: everything except the reported documents was written
+                failed = len(e.details.get("writeErrors", []))
+                self.stats["flushed"] += len(batch) - failed
+                self.stats["failed"] += failed
+                logger.error(f"Write-behind flush rejected {failed} of {len(batch)} documents: {str(e)}")
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.stats["failed"] += len(batch)
+                    logger.error(f"Write-behind flush of {len(batch)} documents failed: {str(e)}")
+                    break
+                logger.warning(f"Write-behind flush failed, retrying: {str(e)}")
+                await asyncio.sleep(self.flush_interval * (attempt + 1))
+        self.stats["batches"] += 1
+        self.release(batch)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+        }
@@ -0,0 +1,148 @@
+import asyncio
+import json
+
+from pymongo.errors import BulkWriteError
+
+import server
+from write_behind import WriteBehindBuffer
+
+
+class FakeCollection:
+    def __init__(self, fail_times=0, write_errors=0):
+        self.docs = []
+        self.batches = []
+        self.fail_times = fail_times
+        self.write_errors = write_errors
+        self.release = None
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        assert ordered is False
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("primary stepped down")
+        self.batches.append(len(docs))
+        if self.write_errors:
+            errors = [{"index": i, "code": 11000} for i in range(self.write_errors)]
+            self.docs.extend(docs[self.write_errors:])
+            raise BulkWriteError({"writeErrors": errors})
+        self.docs.extend(docs)
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if all(doc.get(field) == value for field, value in query.items()):
+                return doc
+        return None
+
+
+def analysis(i):
+    return {"profile_id": f"p{i}", "profile_data": {"name": i}, "analysis_results": {}, "content_suggestions": []}
+
+def test_disabled_buffer_writes_through():
+    collection = FakeCollection()
+    buffer = WriteBehindBuffer(collection, key="profile_id")
+
+    async def run():
+        await buffer.start()
+        await buffer.insert(analysis(1))
+        return await buffer.find_one({"profile_id": "p1"})
+
+    assert asyncio.run(run())["profile_data"] == {"name": 1}
+    assert collection.batches == []
+
+def test_batches_flush_on_size_and_time_and_reads_see_queued_documents():
+    collection = FakeCollection()
+    buffer = WriteBehindBuffer(collection, key="profile_id", enabled=True, max_batch=3, flush_interval=0.05)
+
+    async def run():
+        await buffer.start()
+        for i in range(4):
+            await buffer.insert(analysis(i))
+        queued = await buffer.find_one({"profile_id": "p3"}, {"_id": 0, "profile_data": 1})
+        await asyncio.sleep(0.2)
+        return queued
+
+    assert asyncio.run(run()) == {"profile_data": {"name": 3}}
+    assert collection.batches == [3, 1]
+    assert buffer.get_stats()["pending"] == 0
+
+def test_full_queue_applies_backpressure_and_close_drains():
+    collection = FakeCollection()
+    buffer = WriteBehindBuffer(collection, key="profile_id", enabled=True, max_batch=2, flush_interval=10,
+                               max_queue=2)
+
+    async def run():
+        collection.release = asyncio.Event()
+        await buffer.start()
+        inserts = [asyncio.create_task(buffer.insert(analysis(i))) for i in range(6)]
+        await asyncio.sleep(0.05)
+        blocked = sum(not task.done() for task in inserts)
+        collection.release.set()
+        await asyncio.gather(*inserts)
+        await buffer.close()
+        return blocked
+
+    assert asyncio.run(run()) > 0
+    assert buffer.get_stats()["backpressure_waits"] > 0
+    assert sorted(doc["profile_id"] for doc in collection.docs) == [f"p{i}" for i in range(6)]
+
+def test_failed_flushes_are_retried_and_write_errors_counted():
+    collection = FakeCollection(fail_times=1)
+    buffer = WriteBehindBuffer(collection, key="profile_id", enabled=True, flush_interval=0.01)
+
+    async def run():
+        await buffer.start()
+        await buffer.insert(analysis(1))
+        await buffer.close()
+
+    asyncio.run(run())
+    assert [doc["profile_id"] for doc in collection.docs] == ["p1"]
+
+    collection = FakeCollection(write_errors=1)
+    buffer = WriteBehindBuffer(collection, key="profile_id", enabled=True, flush_interval=0.01)
+
+    async def run_with_duplicate():
+        await buffer.start()
+        await buffer.insert(analysis(1))
+        await buffer.insert(analysis(2))
+        await buffer.close()
+
+    asyncio.run(run_with_duplicate())
+    assert buffer.get_stats()["failed"] == 1
+    assert buffer.get_stats()["flushed"] == 1
+
+def test_streamed_profiles_are_readable_before_the_batch_is_written(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(server, "db", type("Database", (), {"profile_analyses": collection})())
+    monkeypatch.setattr(server, "profile_writes", WriteBehindBuffer(collection, key="profile_id"))
+
+    async def fetch_and_analyze_profile(username):
+        profile_data = server.generate_mock_profile_data(username)
+        return profile_data, server.analyze_profile(profile_data), 0, False
+
+    monkeypatch.setattr(server, "fetch_and_analyze_profile", fetch_and_analyze_profile)
+    urls = [f"https://www.linkedin.com/in/user{i}/" for i in range(3)]
+
+    async def run():
+        # A client reading the whole stream: one bulk write at the end
+        lines = [json.loads(line) async for line in server.stream_profile_analyses(urls, 1)]
+        complete = (lines[-1]["summary"], list(collection.batches))
+
+        # A client that reads one line and disconnects
+        stream = server.stream_profile_analyses(urls, 1)
+        first = json.loads(await stream.__anext__())
+        readable = await server.profile_writes.find_one({"profile_id": first["profile_id"]})
+        written_before_close = len(collection.docs)
+        await stream.aclose()
+        await asyncio.gather(*server.batch_writes)
+        return complete, first, readable, written_before_close
+
+    (summary, batches), first, readable, written_before_close = asyncio.run(run())
+    assert summary == {"total": 3, "succeeded": 3, "failed": 0, "persisted": 3} and batches == [3]
+    assert readable["profile_data"] == first["profile_data"] and written_before_close == 3
+    assert collection.batches == [3, 1] and collection.docs[-1]["profile_id"] == first["profile_id"]
+    assert server.profile_writes.get_stats()["pending"] == 0